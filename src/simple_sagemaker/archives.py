@@ -0,0 +1,310 @@
+import fnmatch
+import logging
+import os
+import shutil
+import subprocess
+import tarfile
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+
+def getPigzPath():
+    """Get the path of pigz (multi-threaded gzip), or None if it isn't available"""
+    return shutil.which("pigz")
+
+
+def _memberName(name):
+    return name[2:] if name.startswith("./") else name
+
+
+def matchesMembers(name, members):
+    """Whether an archive member name matches any of the `members` filter items. An item matches the
+    member itself, everything under it (if it's a directory) or is a glob pattern, e.g. "metrics.json",
+    "checkpoints" or "*.json".
+    """
+    if members is None:
+        return True
+    name = _memberName(name)
+    for member in members:
+        member = _memberName(member).rstrip("/")
+        if (
+            name == member
+            or name.startswith(member + "/")
+            or fnmatch.fnmatch(name, member)
+        ):
+            return True
+    return False
+
+
+def isSafeMember(member, path):
+    """Whether an archive member is extracted inside `path`, i.e. isn't absolute, doesn't escape using
+    "..", and isn't a link pointing outside of it
+    """
+    base_path = os.path.realpath(path)
+
+    def isInside(target):
+        target = os.path.realpath(os.path.join(base_path, target))
+        return os.path.commonpath([base_path, target]) == base_path
+
+    if os.path.isabs(member.name) or not isInside(member.name):
+        return False
+    if member.issym():
+        return isInside(os.path.join(os.path.dirname(member.name), member.linkname))
+    if member.islnk():
+        return isInside(member.linkname)
+    return member.isfile() or member.isdir()
+
+
+class CountingReader:
+    """A file-like wrapper of a readable stream, reporting the number of bytes read to a callback
+
+    :param fileobj: The stream to be wrapped
+    :param callback: Called with the number of bytes of every read
+    :type callback: callable, optional
+    """
+
+    def __init__(self, fileobj, callback=None):
+        self.fileobj = fileobj
+        self.callback = callback
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.bytes_read += len(data)
+        if self.callback and data:
+            self.callback(len(data))
+        return data
+
+
+class GzipStreamReader:
+    """A file-like, decompressing reader of a gzip stream. Checkpoints of the number of compressed
+    bytes consumed to produce the uncompressed ones are kept in `checkpoints`, as
+    (compressed offset, uncompressed offset) tuples.
+
+    :param fileobj: A readable stream of the gzip data
+    :param chunk_size: Number of compressed bytes to read at once, defaults to 64KB
+    :type chunk_size: int, optional
+    """
+
+    def __init__(self, fileobj, chunk_size=2**16):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.compressed_pos = 0
+        self.uncompressed_pos = 0
+        self.checkpoints = [(0, 0)]
+        self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        self._out = b""
+        self._offset = 0
+
+    def _fill(self):
+        data = self.fileobj.read(self.chunk_size)
+        if not data:
+            return False
+        self.compressed_pos += len(data)
+        out = self._decompressor.decompress(data)
+        while self._decompressor.eof and self._decompressor.unused_data:
+            # concatenated gzip members, e.g. created by "cat a.gz b.gz"
+            unused_data = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            out += self._decompressor.decompress(unused_data)
+        self.uncompressed_pos += len(out)
+        self.checkpoints.append((self.compressed_pos, self.uncompressed_pos))
+        self._out = out
+        self._offset = 0
+        return True
+
+    def read(self, size=-1):
+        chunks = list()
+        while size != 0:
+            if self._offset >= len(self._out):
+                if not self._fill():
+                    break
+                continue
+            end = len(self._out)
+            if size > 0:
+                end = min(end, self._offset + size)
+                size -= end - self._offset
+            chunks.append(self._out[self._offset : end])
+            self._offset = end
+        return b"".join(chunks)
+
+    def skip(self, size):
+        """Skip (i.e. read and drop) `size` uncompressed bytes"""
+        while size > 0:
+            data = self.read(min(size, 2**20))
+            if not data:
+                break
+            size -= len(data)
+
+
+def buildTarIndex(fileobj, compressed=True):
+    """Build an index of the file members of a (gzipped) tar archive in a single streaming pass.
+    Each member is mapped to its data `offset` and `size` in the (uncompressed) tar. For gzipped
+    archives, `compressed_end` is the number of compressed bytes that have to be decompressed to
+    get to the end of the member.
+
+    Note: arbitrary restart points in a gzip stream require setting the decompressor's bit
+    position, which python's zlib doesn't support. A member of a gzipped archive is thus retrieved
+    by decompressing the archive up to its `compressed_end`, i.e. without transferring the rest of
+    the archive.
+
+    :param fileobj: A readable stream of the archive
+    :param compressed: Whether the archive is gzipped, defaults to True
+    :type compressed: bool, optional
+
+    return: the index
+    rtype: dict
+    """
+    reader = GzipStreamReader(fileobj) if compressed else fileobj
+    members = dict()
+    with tarfile.open(fileobj=reader, mode="r|") as tar:
+        for member in tar:
+            if member.isfile():
+                members[_memberName(member.name)] = {
+                    "offset": member.offset_data,
+                    "size": member.size,
+                }
+    if compressed:
+        uncompressed_offsets = [x[1] for x in reader.checkpoints]
+        for member in members.values():
+            i = bisect_left(uncompressed_offsets, member["offset"] + member["size"])
+            member["compressed_end"] = reader.checkpoints[
+                min(i, len(reader.checkpoints) - 1)
+            ][0]
+    return {"compressed": compressed, "members": members}
+
+
+def _extractTarStream(tar, path, members):
+    extracted = list()
+    for member in tar:
+        if not matchesMembers(member.name, members):
+            continue
+        if not isSafeMember(member, path):
+            logger.warning(f"Skipping unsafe archive member {member.name}")
+            continue
+        tar.extract(member, path)
+        extracted.append(_memberName(member.name))
+    return extracted
+
+
+def extractStream(fileobj, path, members=None, use_pigz=True, pigz_threads=None):
+    """Extract a gzipped tar archive from a (non seekable) stream, e.g. an S3 object body, without
+    writing the archive itself. The decompression is done by pigz in a separate process if it's
+    available (and `use_pigz` is set), otherwise in-process.
+
+    :param fileobj: A readable stream of the gzipped tar
+    :param path: The directory to extract to
+    :type path: str
+    :param members: Extract only members matching these paths / glob patterns,
+        see :func:`matchesMembers`, defaults to None (all members)
+    :type members: list, optional
+    :param use_pigz: Whether to use pigz when it's available, defaults to True
+    :type use_pigz: bool, optional
+    :param pigz_threads: Number of pigz threads, defaults to None (number of cores)
+    :type pigz_threads: int, optional
+
+    return: the names of the extracted members
+    rtype: list
+    """
+    os.makedirs(path, exist_ok=True)
+    start_time = time.time()
+    pigz_path = getPigzPath() if use_pigz else None
+    if not pigz_path:
+        with tarfile.open(fileobj=fileobj, mode="r|gz") as tar:
+            extracted = _extractTarStream(tar, path, members)
+    else:
+        cmd = [pigz_path, "-dc"]
+        if pigz_threads:
+            cmd += ["-p", str(pigz_threads)]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        def feed():
+            try:
+                while True:
+                    data = fileobj.read(2**20)
+                    if not data:
+                        break
+                    proc.stdin.write(data)
+            except BrokenPipeError:
+                # pigz exited early, its exit code is checked below
+                pass
+            finally:
+                proc.stdin.close()
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+                extracted = _extractTarStream(tar, path, members)
+            # drain anything left (e.g. end of archive padding)
+            with open(os.devnull, "wb") as devnull:
+                shutil.copyfileobj(proc.stdout, devnull)
+        finally:
+            proc.stdout.close()
+            feeder.join()
+            return_code = proc.wait()
+        assert return_code == 0, f"pigz failed with exit code {return_code}"
+    logger.debug(
+        f"Extracted {len(extracted)} members to {path} in {time.time() - start_time:.1f} secs"
+    )
+    return extracted
+
+
+def extractFile(file_name, use_pigz=True, pigz_threads=None, remove=True):
+    """Extract a gzipped tar file into its directory, see :func:`extractStream`
+
+    :param remove: Whether to remove the file once extracted, defaults to True
+    :type remove: bool, optional
+
+    return: (file name, file size, extraction time in secs)
+    rtype: tuple
+    """
+    size = os.path.getsize(file_name)
+    start_time = time.time()
+    with open(file_name, "rb") as f:
+        extractStream(f, os.path.dirname(file_name), None, use_pigz, pigz_threads)
+    if remove:
+        os.remove(file_name)
+    return file_name, size, time.time() - start_time
+
+
+def extractFiles(file_names, max_workers=None, use_pigz=True, remove=True):
+    """Extract gzipped tar files in parallel, each into its directory, using a process pool.
+    When pigz is used, the cores are split between the concurrently extracted files.
+
+    :param max_workers: Maximal number of files to extract concurrently,
+        defaults to None (number of cores)
+    :type max_workers: int, optional
+
+    return: a list of (file name, file size, extraction time in secs) tuples
+    rtype: list
+    """
+    if not file_names:
+        return []
+    max_workers = min(max_workers or os.cpu_count() or 1, len(file_names))
+    pigz_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    start_time = time.time()
+    results = list()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(extractFile, file_name, use_pigz, pigz_threads, remove)
+            for file_name in file_names
+        ]
+        for future in as_completed(futures):
+            file_name, size, secs = future.result()
+            mb_per_sec = size / 2**20 / secs if secs else 0
+            logger.info(
+                f"Extracted {file_name} ({size / 2**20:.1f} MB) in {secs:.1f} secs ({mb_per_sec:.2f} MB/s)"
+            )
+            results.append((file_name, size, secs))
+    total_size = sum(x[1] for x in results)
+    logger.info(
+        f"Extracted {len(results)} archives ({total_size / 2**20:.1f} MB) "
+        f"in {time.time() - start_time:.1f} secs, using {max_workers} processes"
+    )
+    return results
@@ -7,11 +7,14 @@ import sys
 from pathlib import Path
 
 import sagemaker
+import yaml
 from sagemaker.inputs import TrainingInput
 from sagemaker.processing import ProcessingInput  # ProcessingOutput
 
 from . import constants
 from .sm_project import SageMakerProject
+from .timeline import formatTimeline
+from .utilization import formatUtilizationSummary, summarizeUtilization
 
 logger = logging.getLogger(__name__)
 
@@ -28,20 +31,33 @@ def fileOrS3Validation(parser, arg):
     return arg
 
 
-InputTuple = collections.namedtuple("Input", ("path", "distribution", "subdir"))
+InputTuple = collections.namedtuple(
+    "Input", ("path", "distribution", "subdir", "input_mode")
+)
 Input_S3Tuple = collections.namedtuple(
-    "Input_S3", ("input_name", "s3_uri", "distribution", "subdir")
+    "Input_S3", ("input_name", "s3_uri", "distribution", "subdir", "input_mode")
 )
 Input_Task_Tuple = collections.namedtuple(
-    "Input_Task", ("input_name", "task_name", "type", "distribution", "subdir")
+    "Input_Task",
+    ("input_name", "task_name", "type", "distribution", "subdir", "input_mode"),
 )
 
+Input_Modes = ["File", "FastFile", "Pipe"]
+
 
 def help_for_input_type(tuple, additional_text=""):
-    field_names = " ".join([x.upper() for x in tuple._fields[:-2]])
-    res = f"{tuple.__name__.upper()}: {field_names} [DISTRIBUTION] [SUBDIR]"
+    field_names = " ".join([x.upper() for x in tuple._fields[:-3]])
+    res = (
+        f"{tuple.__name__.upper()}: {field_names} [DISTRIBUTION] [SUBDIR] [INPUT_MODE]"
+    )
     if additional_text:
         res += "\n" + additional_text
+    res += f""" INPUT_MODE is one of {Input_Modes} (FastFile and Pipe stream the data instead of downloading
+        it before the job starts, FastFile isn't supported by processing tasks), defaults to File.
+        DISTRIBUTION is one of FullyReplicated (the default), ShardedByS3Key or {constants.INPUT_DISTRIBUTION_BY_SIZE}.
+        The latter splits the objects between the instances by size, and reports the imbalance before launching
+        (training tasks only, see worker_lib.getShardFiles). It supports the FastFile (the default) and File modes,
+        but only FastFile reads just the files of each instance, and Pipe isn't supported."""
     return res
 
 
@@ -52,20 +68,29 @@ class InputActionBase(argparse.Action):
         super(InputActionBase, self).__init__(option_strings, dest, "+", **kwargs)
 
     def __append__(self, args, values):
-        dist_options = ["FullyReplicated", "ShardedByS3Key"]
+        dist_options = [
+            "FullyReplicated",
+            "ShardedByS3Key",
+            constants.INPUT_DISTRIBUTION_BY_SIZE,
+        ]
         default_dist = "FullyReplicated"
-        if len(values) == self.__nargs - 2:
+        if not self.__nargs - 3 <= len(values) <= self.__nargs:
+            raise argparse.ArgumentTypeError(
+                f"{self.dest} has to contain {self.__nargs-3}-{self.__nargs} arguments, got {values}"
+            )
+        if len(values) == self.__nargs - 3:
             values.append(default_dist)
-        if len(values) == self.__nargs - 1:
+        if len(values) == self.__nargs - 2:
             values.append("")
-        elif len(values) == self.__nargs:
-            if values[-2] not in dist_options:
-                raise argparse.ArgumentTypeError(
-                    f"distribution has to be one of {dist_options}, got {values[-2]}"
-                )
-        else:
+        if len(values) == self.__nargs - 1:
+            values.append(None)
+        if values[-3] not in dist_options:
+            raise argparse.ArgumentTypeError(
+                f"distribution has to be one of {dist_options}, got {values[-3]}"
+            )
+        if values[-1] is not None and values[-1] not in Input_Modes:
             raise argparse.ArgumentTypeError(
-                f"{self.dest} has to contain {self.__nargs}/{self.__nargs-1} arguments, got {values}"
+                f"input mode has to be one of {Input_Modes}, got {values[-1]}"
             )
         value = self.__tuple(*values)
         if not args.__getattribute__(self.dest):
@@ -127,6 +152,26 @@ def addDownloadArgs(download_params):
         action="store_true",
         help="Download the output once task is finished",
     )
+    download_params.add_argument(
+        "--download_members",
+        nargs="+",
+        default=None,
+        help="""Extract only these paths / glob patterns (e.g. metrics.json, checkpoints or "*.json")
+        from the downloaded model and output archives""",
+    )
+    download_params.add_argument(
+        "--extract_archives",
+        default=False,
+        action="store_true",
+        help="""Extract the .tar.gz archives inside the downloaded output and state directories
+        (e.g. written by a processing task), in parallel""",
+    )
+    download_params.add_argument(
+        "--extract_workers",
+        type=int,
+        default=None,
+        help="Maximal number of archives to extract concurrently (defaults to the number of cores)",
+    )
 
 
 def runArguments(run_parser, shell=False):
@@ -170,6 +215,13 @@ def runArguments(run_parser, shell=False):
             help="""Path (absolute or relative) to the local Python source file or a .sh script which should be executed as the entry point.
             If source_dir is specified, then entry_point must point to a file located at the root of source_dir.""",
         )
+    code_group.add_argument(
+        "--code_delta",
+        default=False,
+        action="store_true",
+        help="""Upload only the changed / added files relative to the previously uploaded code (of the same
+        source_dir / dependencies), as an overlay that's applied on the instances before the entry point runs.""",
+    )
     code_group.add_argument(
         "--dependencies",
         "-d",
@@ -259,6 +311,13 @@ def runArguments(run_parser, shell=False):
         "--pv",
         help="The python version",
     )
+    image_group.add_argument(
+        "--prebuild_instance_types",
+        "--pit",
+        nargs="+",
+        help="""Additional instance types to concurrently build (or get) the image for, along with the one
+        for --instance_type. Identical images are built once.""",
+    )
     # run params
     IO_params.add_argument(
         "--input_path",
@@ -439,6 +498,13 @@ def processingArguments(processing_parser):
         help="The framework version",
         default="0.20.0",
     )
+    image_group.add_argument(
+        "--prebuild_instance_types",
+        "--pit",
+        nargs="+",
+        help="""Additional instance types to concurrently build (or get) the image for, along with the one
+        for --instance_type. Identical images are built once.""",
+    )
     # run params
     IO_params.add_argument(
         "--input_path",
@@ -517,6 +583,55 @@ def processingArguments(processing_parser):
     addDownloadArgs(download_params)
 
 
+def sweepArguments(sweep_parser):
+    runArguments(sweep_parser)
+    sweep_parser.set_defaults(func=sweepHandler)
+
+    sweep_params = sweep_parser.add_argument_group("Sweep")
+    sweep_params.add_argument(
+        "--grid",
+        nargs="+",
+        action="append",
+        metavar=("NAME", "VALUE"),
+        help="""A hyperparameter name and its values, a few can be given. A trial is run for each combination of
+        the values. The task name (-t) is used as the trials task names template, formatted with the trial index
+        ({i}) and the hyperparameters, e.g. "sweep-{i}" or "lr-{lr}".""",
+    )
+    sweep_params.add_argument(
+        "--samples",
+        type=lambda x: fileValidation(sweep_parser, x),
+        help="""A path to a JSON file with a list of trials (e.g. random samples), each a mapping of
+        hyperparameter names to values, instead of --grid.""",
+    )
+    sweep_params.add_argument(
+        "--max_concurrent",
+        type=int,
+        default=constants.DEFAULT_SWEEP_MAX_CONCURRENT,
+        help="Maximal number of concurrently running trials.",
+    )
+
+
+def pipelineArguments(pipeline_run_parser):
+    pipeline_run_parser.add_argument(
+        "file",
+        type=lambda x: fileValidation(pipeline_run_parser, x),
+        help=f"""A path to the pipeline YAML file. Its "tasks" section maps each task name to its arguments
+        (see SageMakerProject.runTask), where the inputs of a task that are outputs of other tasks are given by
+        an "input_tasks" list of [NAME] [TASK_NAME] [TYPE] [DISTRIBUTION] [SUBDIR] [INPUT_MODE] lists (as
+        --input_task). Optional sections: "image", "instance" and "code" (the default image, instance and code params),
+        "defaults" (arguments shared by all the tasks) and "max_concurrent" (defaults to
+        {constants.DEFAULT_PIPELINE_MAX_CONCURRENT}).""",
+    )
+    pipeline_run_parser.add_argument(
+        "--max_concurrent",
+        type=int,
+        default=None,
+        help="Maximal number of concurrently running tasks, overrides the pipeline file.",
+    )
+    pipeline_run_parser.set_defaults(func=pipelineHandler)
+    addDownloadArgs(pipeline_run_parser)
+
+
 def dataArguments(data_parser):
     data_parser.add_argument(
         "--clean_state",
@@ -525,10 +640,63 @@ def dataArguments(data_parser):
         action="store_true",
         help="Clean the task state.",
     )
+    data_parser.add_argument(
+        "--get",
+        nargs="+",
+        default=None,
+        metavar="MEMBER",
+        help="""Get only these files from the task's model (or output, see --get_from) archive, without
+        downloading the whole archive. The files are saved under --output_path, or written to stdout
+        if it isn't given.""",
+    )
+    data_parser.add_argument(
+        "--timeline",
+        default=False,
+        action="store_true",
+        help="""Print the per-phase timeline of the task's last job, i.e. where its time went (capacity wait,
+        instances launch, data download, training / processing, artifacts upload).""",
+    )
+    data_parser.add_argument(
+        "--utilization",
+        default=False,
+        action="store_true",
+        help="""Print the average / peak CPU, memory, disk and GPU utilization of each instance of the task's
+        last job. The full metrics are saved with the downloaded results.""",
+    )
+    data_parser.add_argument(
+        "--get_from",
+        default="model",
+        choices=["model", "output"],
+        help="The archive to --get the files from.",
+    )
     data_parser.set_defaults(func=dataHandler)
     addDownloadArgs(data_parser)
 
 
+def logsArguments(logs_parser):
+    logs_parser.add_argument(
+        "--output_path",
+        "-o",
+        help="""Local path to download the logs to (into a "logs" sub directory). Only new log events are
+        fetched if the logs were already downloaded there. Required unless --merged is used.""",
+    )
+    logs_parser.add_argument(
+        "--follow",
+        "-f",
+        default=False,
+        action="store_true",
+        help="Keep tailing the logs of all the instances until the task's job is done.",
+    )
+    logs_parser.add_argument(
+        "--merged",
+        default=False,
+        action="store_true",
+        help="""Merge the logs of all the instances, ordered by time and prefixed by the host name, into
+        a single [OUTPUT_PATH]/logs_merged file, or to stdout if --output_path isn't given.""",
+    )
+    logs_parser.set_defaults(func=logsHandler)
+
+
 def parseArgs():
     parser = argparse.ArgumentParser(
         # config_file_parser_class=configargparse.DefaultConfigFileParser,
@@ -548,11 +716,42 @@ def parseArgs():
         help="Run a shell task",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Run a hyperparameter sweep of a python / .sh script task",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog=f"""
+        The results table (task, job, status, hyperparameters and final metrics of each trial) is saved to
+        [OUTPUT_PATH]/{constants.SWEEP_RESULTS_FILE_NAME}, and the results of each trial to [OUTPUT_PATH]/[TASK_NAME].
+        """,
+    )
+    pipeline_parser = subparsers.add_parser(
+        "pipeline",
+        help="Run a pipeline of dependent tasks",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    pipeline_parser.set_defaults(func=lambda *_: pipeline_parser.print_help())
+    pipeline_run_parser = pipeline_parser.add_subparsers().add_parser(
+        "run",
+        help="Run a pipeline defined by a YAML file",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        epilog=f"""
+        Tasks are run as soon as the tasks they depend on are completed, already completed tasks aren't run
+        again. The results table (job, status and timing of each task) is saved to
+        [OUTPUT_PATH]/{constants.PIPELINE_RESULTS_FILE_NAME}, and the results of each task to
+        [OUTPUT_PATH]/[TASK_NAME].
+        """,
+    )
     data_parser = subparsers.add_parser(
         "data",
         help="Manage task data",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
+    logs_parser = subparsers.add_parser(
+        "logs",
+        help="Download / follow task logs",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
     processing_parser = subparsers.add_parser(
         "process",
         help="Run a processing task",
@@ -562,7 +761,14 @@ def parseArgs():
         """,
     )
 
-    for specific_parser in (run_parser, shell_parser, data_parser, processing_parser):
+    for specific_parser in (
+        run_parser,
+        shell_parser,
+        sweep_parser,
+        data_parser,
+        logs_parser,
+        processing_parser,
+    ):
         specific_parser.add_argument(
             "--project_name", "-p", required=True, help="Project name."
         )
@@ -576,9 +782,23 @@ def parseArgs():
             help="S3 bucket name (a default one is used if not given).",
         )
 
+    # a pipeline runs many tasks, no task name is needed
+    pipeline_run_parser.add_argument(
+        "--project_name", "-p", required=True, help="Project name."
+    )
+    pipeline_run_parser.add_argument("--prefix", help="S3 prefix.")
+    pipeline_run_parser.add_argument(
+        "--bucket_name",
+        "-b",
+        help="S3 bucket name (a default one is used if not given).",
+    )
+
     runArguments(run_parser)
     runArguments(shell_parser, True)
+    sweepArguments(sweep_parser)
+    pipelineArguments(pipeline_run_parser)
     dataArguments(data_parser)
+    logsArguments(logs_parser)
     processingArguments(processing_parser)
 
     # Parse the configuration, assume anything extra and / or after "--"
@@ -621,8 +841,9 @@ def getAllParams(args, mapping):
 def parseInputsAndAllowAccess(args, sm_project):
     input_data_path = None
     distribution = "FullyReplicated"
+    input_mode = None
     if args.input_path:
-        input_data_path, distribution, subdir = args.input_path[0]
+        input_data_path, distribution, subdir, input_mode = args.input_path[0]
         if input_data_path.lower().startswith("s3://"):
             input_data_path = sagemaker.s3.s3_path_join(input_data_path, subdir)
         else:
@@ -630,25 +851,55 @@ def parseInputsAndAllowAccess(args, sm_project):
 
     inputs = dict()
     if args.input_task:
-        for (input_name, task_name, ttype, distribution, subdir) in args.input_task:
+        for (input_name, task_name, ttype, dist, subdir, mode) in args.input_task:
+            if dist == constants.INPUT_DISTRIBUTION_BY_SIZE:
+                s3_uri = sm_project.getInputConfig(
+                    task_name, ttype, subdir=subdir, return_s3uri=True
+                )
+                inputs.update(
+                    sm_project.getBalancedInputConfig(
+                        args.task_name, input_name, s3_uri, args.instance_count, mode
+                    )
+                )
+                continue
             inputs[input_name] = sm_project.getInputConfig(
-                task_name, ttype, distribution=distribution, subdir=subdir
+                task_name, ttype, distribution=dist, subdir=subdir, input_mode=mode
             )
     if args.input_s3:
-        for (input_name, s3_uri, distribution, subdir) in args.input_s3:
+        for (input_name, s3_uri, dist, subdir, mode) in args.input_s3:
             s3_uri = sagemaker.s3.s3_path_join(s3_uri, subdir)
             bucket, _ = sagemaker.s3.parse_s3_url(s3_uri)
             sm_project.allowAccessToS3Bucket(bucket)
-            inputs[input_name] = TrainingInput(s3_uri, distribution=distribution)
+            if dist == constants.INPUT_DISTRIBUTION_BY_SIZE:
+                inputs.update(
+                    sm_project.getBalancedInputConfig(
+                        args.task_name, input_name, s3_uri, args.instance_count, mode
+                    )
+                )
+                continue
+            inputs[input_name] = TrainingInput(
+                s3_uri, distribution=dist, input_mode=mode
+            )
+
+    return input_data_path, distribution, input_mode, inputs
 
-    return input_data_path, distribution, inputs
+
+def getProcessingInputMode(input_mode, distribution):
+    assert (
+        input_mode != "FastFile"
+    ), "The FastFile input mode isn't supported by processing tasks"
+    assert (
+        distribution != constants.INPUT_DISTRIBUTION_BY_SIZE
+    ), f"The {constants.INPUT_DISTRIBUTION_BY_SIZE} distribution isn't supported by processing tasks"
+    return input_mode or "File"
 
 
 def parseIOAndAllowAccess(args, env, sm_project):
     input_data_path = None
     distribution = "FullyReplicated"
+    input_mode = None
     if args.input_path:
-        input_data_path, distribution, subdir = args.input_path[0]
+        input_data_path, distribution, subdir, input_mode = args.input_path[0]
         if input_data_path.lower().startswith("s3://"):
             input_data_path = sagemaker.s3.s3_path_join(input_data_path, subdir)
         else:
@@ -656,11 +907,11 @@ def parseIOAndAllowAccess(args, env, sm_project):
 
     inputs = list()
     if args.input_task:
-        for (input_name, task_name, ttype, distribution, subdir) in args.input_task:
+        for (input_name, task_name, ttype, dist, subdir, mode) in args.input_task:
             s3_uri = sm_project.getInputConfig(
                 task_name,
                 ttype,
-                distribution=distribution,
+                distribution=dist,
                 subdir=subdir,
                 return_s3uri=True,
             )
@@ -669,14 +920,15 @@ def parseIOAndAllowAccess(args, env, sm_project):
                     s3_uri,
                     f"/opt/ml/processing/input/data/{input_name}",
                     input_name,
-                    s3_data_distribution_type=distribution,
+                    s3_data_distribution_type=dist,
+                    s3_input_mode=getProcessingInputMode(mode, dist),
                 )
             )
             env[
                 f"SM_CHANNEL_{input_name.upper()}"
             ] = f"/opt/ml/processing/input/data/{input_name}"
     if args.input_s3:
-        for (input_name, s3_uri, distribution, subdir) in args.input_s3:
+        for (input_name, s3_uri, dist, subdir, mode) in args.input_s3:
             s3_uri = sagemaker.s3.s3_path_join(s3_uri, subdir)
             bucket, _ = sagemaker.s3.parse_s3_url(s3_uri)
             sm_project.allowAccessToS3Bucket(bucket)
@@ -685,7 +937,8 @@ def parseIOAndAllowAccess(args, env, sm_project):
                     s3_uri,
                     f"/opt/ml/processing/processing/input/data/{input_name}",
                     input_name,
-                    s3_data_distribution_type=distribution,
+                    s3_data_distribution_type=dist,
+                    s3_input_mode=getProcessingInputMode(mode, dist),
                 )
             )
             env[
@@ -695,7 +948,14 @@ def parseIOAndAllowAccess(args, env, sm_project):
     outputs = list()
     # TBD: support outputs
 
-    return input_data_path, distribution, inputs, outputs
+    return input_data_path, distribution, input_mode, inputs, outputs
+
+
+def buildOrGetImages(args, sm_project):
+    instance_type = sm_project.defaultInstanceParams.instance_type
+    if args.prebuild_instance_types:
+        sm_project.prebuildImages([instance_type] + args.prebuild_instance_types)
+    return sm_project.buildOrGetImage(instance_type=instance_type)
 
 
 def shellHandler(args, hyperparameters):
@@ -776,9 +1036,7 @@ def processingHandler(args, hyperparameters):
         )
     )
 
-    image_uri = sm_project.buildOrGetImage(
-        instance_type=sm_project.defaultInstanceParams.instance_type
-    )
+    image_uri = buildOrGetImages(args, sm_project)
 
     running_params = getAllParams(
         args,
@@ -792,7 +1050,13 @@ def processingHandler(args, hyperparameters):
     running_params["env"] = env
     running_params["tags"] = tags
 
-    input_data_path, input_distribution, inputs, outputs = parseIOAndAllowAccess(
+    (
+        input_data_path,
+        input_distribution,
+        input_mode,
+        inputs,
+        outputs,
+    ) = parseIOAndAllowAccess(
         args,
         running_params["env"],
         sm_project,
@@ -804,6 +1068,7 @@ def processingHandler(args, hyperparameters):
         hyperparameters=None,
         input_data_path=input_data_path,
         input_distribution=input_distribution,
+        input_mode=input_mode,
         inputs=inputs,
         outputs=outputs,
         clean_state=args.clean_state,
@@ -819,10 +1084,18 @@ def processingHandler(args, hyperparameters):
             state=args.download_state,
             model=args.download_model,
             output=args.download_output,
+            members=args.download_members,
+            extract_archives=args.extract_archives,
+            extract_workers=args.extract_workers,
         )
 
 
-def runHandler(args, hyperparameters):
+def prepareRunTask(args, hyperparameters):
+    """Set up the project, image and task arguments of a `run` / `shell` / `sweep` command
+
+    return: the project, image URI and the :func:`SageMakerProject.runTask` arguments
+    rtype: tuple
+    """
     if args.entry_point and os.path.splitext(args.entry_point)[-1] == ".sh":
         # Running a shell script
 
@@ -895,9 +1168,7 @@ def runHandler(args, hyperparameters):
         )
     )
 
-    image_uri = sm_project.buildOrGetImage(
-        instance_type=sm_project.defaultInstanceParams.instance_type
-    )
+    image_uri = buildOrGetImages(args, sm_project)
 
     running_params = getAllParams(
         args,
@@ -906,12 +1177,16 @@ def runHandler(args, hyperparameters):
             "force_running": "force_running",
             "distribution": "distribution",
             "model_uri": "model_uri",
+            "code_delta": "code_delta",
         },
     )
 
-    input_data_path, input_distribution, inputs = parseInputsAndAllowAccess(
-        args, sm_project
-    )
+    (
+        input_data_path,
+        input_distribution,
+        input_mode,
+        inputs,
+    ) = parseInputsAndAllowAccess(args, sm_project)
     tags = {} if args.tag is None else {k: v for (k, v) in args.tag}
     metric_definitions = (
         {}
@@ -939,17 +1214,22 @@ def runHandler(args, hyperparameters):
     else:
         del hyperparameters["external_hps"]
 
-    sm_project.runTask(
-        args.task_name,
-        image_uri,
+    task_args = dict(
         hyperparameters=hyperparameters,
         input_data_path=input_data_path,
         input_distribution=input_distribution,
+        input_mode=input_mode,
         additional_inputs=inputs,
         tags=tags,
         metric_definitions=metric_definitions,
         **running_params,
     )
+    return sm_project, image_uri, task_args
+
+
+def runHandler(args, hyperparameters):
+    sm_project, image_uri, task_args = prepareRunTask(args, hyperparameters)
+    sm_project.runTask(args.task_name, image_uri, **task_args)
 
     if args.output_path:
         sm_project.downloadResults(
@@ -959,9 +1239,112 @@ def runHandler(args, hyperparameters):
             state=args.download_state,
             model=args.download_model,
             output=args.download_output,
+            members=args.download_members,
+            extract_archives=args.extract_archives,
+            extract_workers=args.extract_workers,
         )
 
 
+def sweepHandler(args, hyperparameters):
+    assert bool(args.grid) != bool(
+        args.samples
+    ), "Either --grid or --samples has to be given"
+    if args.grid:
+        trials = {name: values for (name, *values) in args.grid}
+    else:
+        with open(args.samples, "rt") as f:
+            trials = json.load(f)
+    sm_project, image_uri, task_args = prepareRunTask(args, hyperparameters)
+    base_hyperparameters = task_args.pop("hyperparameters")
+    results = sm_project.sweep(
+        args.task_name,
+        trials,
+        image_uri,
+        hyperparameters=base_hyperparameters,
+        max_concurrent=args.max_concurrent,
+        output_path=args.output_path,
+        **task_args,
+    )
+
+    if args.output_path:
+        for row in results:
+            if row["status"] != "Completed":
+                continue
+            sm_project.downloadResults(
+                row["task_name"],
+                os.path.join(args.output_path, row["task_name"]),
+                logs=True,
+                state=args.download_state,
+                model=args.download_model,
+                output=args.download_output,
+                members=args.download_members,
+                extract_archives=args.extract_archives,
+                extract_workers=args.extract_workers,
+            )
+
+
+def pipelineHandler(args, hyperparameters):
+    assert (
+        len(hyperparameters) == 1 and not hyperparameters["external_hps"]
+    ), "Hyperparameters of pipeline tasks have to be given by the pipeline file"
+    with open(args.file, "rt") as f:
+        config = yaml.safe_load(f)
+    unknown = set(config) - {
+        "image",
+        "instance",
+        "code",
+        "defaults",
+        "tasks",
+        "max_concurrent",
+    }
+    assert not unknown, f"Unknown pipeline file sections: {unknown}"
+    assert config.get("tasks"), "The pipeline file has no tasks"
+
+    general_params = getAllParams(
+        args,
+        {
+            "project_name": "project_name",
+            "bucket_name": "bucket_name",
+            "prefix": "prefix",
+        },
+    )
+    instance_params = config.get("instance") or dict()
+    if "local" in instance_params.get("instance_type", ""):
+        general_params["local_mode"] = True
+    sm_project = SageMakerProject(**general_params)
+    sm_project.setDefaultImageParams(**(config.get("image") or dict()))
+    sm_project.setDefaultInstanceParams(**instance_params)
+    sm_project.setDefaultCodeParams(**(config.get("code") or dict()))
+
+    defaults = config.get("defaults") or dict()
+    tasks = {
+        task_name: {**defaults, **(task_args or dict())}
+        for task_name, task_args in config["tasks"].items()
+    }
+    results = sm_project.runPipeline(
+        tasks,
+        max_concurrent=args.max_concurrent
+        or config.get("max_concurrent", constants.DEFAULT_PIPELINE_MAX_CONCURRENT),
+        output_path=args.output_path,
+    )
+
+    if args.output_path:
+        for row in results:
+            if row["status"] != "Completed":
+                continue
+            sm_project.downloadResults(
+                row["task_name"],
+                os.path.join(args.output_path, row["task_name"]),
+                logs=True,
+                state=args.download_state,
+                model=args.download_model,
+                output=args.download_output,
+                members=args.download_members,
+                extract_archives=args.extract_archives,
+                extract_workers=args.extract_workers,
+            )
+
+
 def dataHandler(args, hyperparameters):
     sm_project = SageMakerProject(
         **getAllParams(
@@ -975,7 +1358,24 @@ def dataHandler(args, hyperparameters):
     )
     if args.clean_state:
         sm_project.cleanState(args.task_name)
-    if args.output_path:
+    if args.timeline:
+        print("\n".join(formatTimeline(sm_project.getTimeline(args.task_name))))
+    if args.utilization:
+        summary = summarizeUtilization(sm_project.getUtilization(args.task_name))
+        print("\n".join(formatUtilizationSummary(summary)))
+    if args.get:
+        for member in args.get:
+            data = sm_project.getResultMember(args.task_name, member, args.get_from)
+            if args.output_path:
+                file_name = os.path.join(args.output_path, member)
+                os.makedirs(os.path.dirname(file_name), exist_ok=True)
+                with open(file_name, "wb") as f:
+                    f.write(data)
+                logger.info(f"{member} was saved to {file_name}")
+            else:
+                sys.stdout.buffer.write(data)
+                sys.stdout.flush()
+    elif args.output_path:
         sm_project.downloadResults(
             args.task_name,
             args.output_path,
@@ -983,7 +1383,30 @@ def dataHandler(args, hyperparameters):
             state=args.download_state,
             model=args.download_model,
             output=args.download_output,
+            members=args.download_members,
+            extract_archives=args.extract_archives,
+            extract_workers=args.extract_workers,
+        )
+
+
+def logsHandler(args, hyperparameters):
+    assert (
+        args.output_path or args.merged
+    ), "--output_path has to be given, unless --merged is used"
+    assert not (args.follow and args.merged), "--follow can't be used with --merged"
+    sm_project = SageMakerProject(
+        **getAllParams(
+            args,
+            {
+                "project_name": "project_name",
+                "bucket_name": "bucket_name",
+                "prefix": "prefix",
+            },
         )
+    )
+    sm_project.downloadLogs(
+        args.task_name, args.output_path, follow=args.follow, merged=args.merged
+    )
 
 
 def main():
@@ -0,0 +1,112 @@
+import logging
+import threading
+
+import sagemaker
+from botocore.config import Config
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+# guards attaching a registry to a session
+_lock = threading.Lock()
+
+# throttling prone services use the client side rate limiting of botocore's adaptive retry mode
+RETRY_MODES = {"logs": "adaptive"}
+
+
+def getClientConfig(
+    service_name, max_pool_connections=constants.DEFAULT_CLIENT_MAX_POOL_CONNECTIONS
+):
+    """Get the client configuration used for a service - a consistent retry configuration and a connection
+    pool large enough for the concurrent transfers / queries done by this package
+    """
+    return Config(
+        retries={
+            "max_attempts": constants.DEFAULT_CLIENT_MAX_ATTEMPTS,
+            "mode": RETRY_MODES.get(service_name, "standard"),
+        },
+        max_pool_connections=max_pool_connections,
+    )
+
+
+class ClientRegistry:
+    """The clients of a boto3 session, shared by everything using it (e.g. a project and all its tasks),
+    instead of creating a new client (which resolves the endpoint and opens new connections) for every call.
+    The registry is attached to the session (see :func:`getRegistry`), and goes away along with it.
+    Clients are thread safe, and can be used concurrently.
+
+    :param boto3_session: The boto3 session
+    """
+
+    def __init__(self, boto3_session):
+        self.boto3_session = boto3_session
+        # (service name, pool size) -> client
+        self._clients = dict()
+        self._sm_session = None
+        self._account_id = None
+        # boto3 sessions (unlike clients) aren't thread safe, clients are created under a lock
+        self._lock = threading.RLock()
+
+    def getClient(self, service_name, max_pool_connections=None):
+        f"""Get the shared client of a service
+
+        :param service_name: The service name, e.g. "s3" or "sagemaker"
+        :type service_name: str
+        :param max_pool_connections: The number of connections needed. Clients needing more than the default
+            pool size ({constants.DEFAULT_CLIENT_MAX_POOL_CONNECTIONS}) are shared by the pool size,
+            defaults to None
+        :type max_pool_connections: int, optional
+
+        return: the client
+        """
+        pool_size = max(
+            max_pool_connections or 0, constants.DEFAULT_CLIENT_MAX_POOL_CONNECTIONS
+        )
+        key = (service_name, pool_size)
+        with self._lock:
+            if key not in self._clients:
+                logger.debug(f"Creating a shared {service_name} client ({pool_size})")
+                self._clients[key] = self.boto3_session.client(
+                    service_name, config=getClientConfig(service_name, pool_size)
+                )
+            return self._clients[key]
+
+    def getSageMakerSession(self):
+        """Get a shared :class:`sagemaker.Session`, which uses the shared SageMaker client"""
+        with self._lock:
+            if self._sm_session is None:
+                self._sm_session = sagemaker.Session(
+                    boto_session=self.boto3_session,
+                    sagemaker_client=self.getClient("sagemaker"),
+                )
+            return self._sm_session
+
+    def getAccountId(self):
+        """Get the AWS account id of the session"""
+        with self._lock:
+            if self._account_id is None:
+                self._account_id = self.getClient("sts").get_caller_identity()[
+                    "Account"
+                ]
+            return self._account_id
+
+
+def getRegistry(boto3_session):
+    """Get the :class:`ClientRegistry` of a boto3 session, attaching a new one to it on first use"""
+    with _lock:
+        registry = getattr(boto3_session, "_ssm_client_registry", None)
+        if registry is None:
+            registry = ClientRegistry(boto3_session)
+            boto3_session._ssm_client_registry = registry
+        return registry
+
+
+def getClient(boto3_session, service_name, max_pool_connections=None):
+    """Get the shared client of a service of a boto3 session, see :func:`ClientRegistry.getClient`"""
+    return getRegistry(boto3_session).getClient(service_name, max_pool_connections)
+
+
+def getSageMakerSession(boto3_session):
+    """Get the shared :class:`sagemaker.Session` of a boto3 session, see :func:`ClientRegistry.getSageMakerSession`"""
+    return getRegistry(boto3_session).getSageMakerSession()
@@ -0,0 +1,281 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tarfile
+import tempfile
+import threading
+
+import sagemaker
+
+from . import constants
+from .clients import getClient
+
+logger = logging.getLogger(__name__)
+
+# (path, size, mtime, mode) signature -> content hash, to avoid re-reading unchanged files
+_hash_cache = dict()
+_hash_cache_lock = threading.Lock()
+# (content URI, entry point, delta) -> (source dir URI, entry point), of code that's known to be uploaded
+_source_dir_cache = dict()
+_source_dir_cache_lock = threading.Lock()
+
+
+def listFiles(path, arcname):
+    """List the files under `path` (or `path` itself if it's a file), following links
+
+    return: a sorted list of (archive name, local path) tuples
+    rtype: list
+    """
+    if not os.path.isdir(path):
+        return [(arcname, path)]
+    files = list()
+    for root, _, file_names in os.walk(path, followlinks=True):
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            rel_path = os.path.relpath(file_path, path).replace(os.sep, "/")
+            files.append((arcname + "/" + rel_path, file_path))
+    return sorted(files)
+
+
+def hashFile(path):
+    """Get a hash of the content and permissions of a file (e.g. an entry point that was made executable),
+    cached by its name, size, modification time and mode
+    """
+    stat = os.stat(path)
+    signature = (path, stat.st_size, stat.st_mtime_ns, stat.st_mode)
+    with _hash_cache_lock:
+        if signature in _hash_cache:
+            return _hash_cache[signature]
+
+    content_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(2**20), b""):
+            content_hash.update(data)
+    # the permissions are kept in the archives
+    content_hash.update(f"\0{stat.st_mode & 0o7777:o}".encode("utf-8"))
+    content_hash = content_hash.hexdigest()
+    with _hash_cache_lock:
+        _hash_cache[signature] = content_hash
+    return content_hash
+
+
+def hashManifest(manifest):
+    """Get a content hash of files, given as an {archive name: file hash} mapping"""
+    content_hash = hashlib.sha256()
+    for arcname in sorted(manifest):
+        content_hash.update(f"{arcname}\0{manifest[arcname]}\0".encode("utf-8"))
+    return content_hash.hexdigest()[:32]
+
+
+def hashFiles(files):
+    """Get a content hash of files, given as (archive name, local path) tuples"""
+    return hashManifest({arcname: hashFile(path) for arcname, path in files})
+
+
+class CodeArtifacts:
+    """Uploads code artifacts (source dirs, dependencies, scripts) to S3 under a content hash of their
+    files, so identical code is uploaded only once, and shared by all the jobs using it.
+
+    :param boto3_session: The boto3 session to be used
+    :param base_uri: The S3 URI artifacts are kept under, as `[base_uri]/[content hash]/...`
+    :type base_uri: str
+    :param extra_args: Extra arguments of the uploads, e.g. {"ServerSideEncryption": "aws:kms"},
+        defaults to None
+    :type extra_args: dict, optional
+    """
+
+    def __init__(self, boto3_session, base_uri, extra_args=None):
+        self.s3_client = getClient(boto3_session, "s3")
+        self.base_uri = base_uri
+        self.extra_args = extra_args or dict()
+
+    def _exists(self, bucket, key):
+        try:
+            self.s3_client.head_object(Bucket=bucket, Key=key)
+            return True
+        except self.s3_client.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _getJson(self, bucket, key):
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+        return json.loads(response["Body"].read())
+
+    def _putJson(self, bucket, key, obj):
+        self.s3_client.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=json.dumps(obj).encode("utf-8"),
+            **self.extra_args,
+        )
+
+    def getSourceDirUri(self, entry_point, source_dir, dependencies, delta=False):
+        """Get the URI of a `sourcedir.tar.gz` of a training job, packaged the same way the SageMaker
+        SDK does (the content of `source_dir`, or `entry_point` if it isn't given, and the dependencies,
+        at the root of the archive). The archive is uploaded only if it doesn't already exist.
+
+        In `delta` mode, if a previous archive of the same code tree exists (the "base"), only the
+        changed / added files are uploaded, as an overlay archive. The overlay also contains the
+        list of deleted files and the worker toolkit bootstrap, which is used as the entry point,
+        to apply the overlay onto the base before running the actual entry point.
+
+        return: the S3 URI, to be used as the estimator `source_dir` (with no dependencies), and
+            the entry point name within it
+        rtype: tuple
+        """
+        if source_dir:
+            top_paths = [
+                os.path.join(source_dir, x) for x in sorted(os.listdir(source_dir))
+            ]
+            entry_point_name = entry_point
+        else:
+            top_paths = [entry_point]
+            entry_point_name = os.path.basename(entry_point)
+        top_paths += dependencies
+        files = dict()
+        for path in top_paths:
+            files.update(listFiles(path, os.path.basename(path)))
+        manifest = {arcname: hashFile(path) for arcname, path in files.items()}
+        content_uri = sagemaker.s3.s3_path_join(self.base_uri, hashManifest(manifest))
+        # the last full archive of the same code tree (i.e. source dir / entry point and dependencies
+        #   names) is the delta base
+        tree_names = [os.path.basename(os.path.abspath(source_dir or entry_point))]
+        tree_names += [os.path.basename(os.path.abspath(x)) for x in dependencies]
+        tree_id = hashManifest({x: "" for x in tree_names})[:16]
+
+        # code that was already resolved by this process, e.g. by a previous task of a sweep, is known to exist
+        cache_key = (content_uri, entry_point_name, delta)
+        with _source_dir_cache_lock:
+            resolved = _source_dir_cache.get(cache_key)
+        if resolved:
+            logger.debug(f"Reusing the already resolved code of {content_uri}")
+            return resolved
+        # resolved without holding the lock, the uploads of the same content are idempotent
+        resolved = self._getSourceDirUri(
+            content_uri,
+            top_paths,
+            files,
+            manifest,
+            entry_point_name,
+            tree_id,
+            delta,
+        )
+        with _source_dir_cache_lock:
+            _source_dir_cache[cache_key] = resolved
+        return resolved
+
+    def _getSourceDirUri(
+        self, content_uri, top_paths, files, manifest, entry_point_name, tree_id, delta
+    ):
+        uri = sagemaker.s3.s3_path_join(content_uri, "sourcedir.tar.gz")
+        bucket, key = sagemaker.s3.parse_s3_url(uri)
+        if self._exists(bucket, key):
+            logger.info(f"Reusing the code at {uri}")
+            return uri, entry_point_name
+
+        base_key = sagemaker.s3.parse_s3_url(
+            sagemaker.s3.s3_path_join(self.base_uri, "bases", f"{tree_id}.json")
+        )[1]
+        if delta:
+            delta_uri = sagemaker.s3.s3_path_join(content_uri, "sourcedir-delta.tar.gz")
+            delta_key = sagemaker.s3.parse_s3_url(delta_uri)[1]
+            if self._exists(bucket, delta_key):
+                logger.info(f"Reusing the code overlay at {delta_uri}")
+                return delta_uri, constants.DELTA_BOOTSTRAP_NAME
+            base = self._getJson(bucket, base_key)
+            if base and self._uploadDelta(
+                bucket, delta_key, files, manifest, base, entry_point_name
+            ):
+                return delta_uri, constants.DELTA_BOOTSTRAP_NAME
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tar_file_name = os.path.join(tmp_dir, "sourcedir.tar.gz")
+            with tarfile.open(tar_file_name, mode="w:gz", dereference=True) as tar:
+                for path in top_paths:
+                    tar.add(path, arcname=os.path.basename(path))
+            logger.info(f"Uploading the code to {uri}")
+            self.s3_client.upload_file(
+                tar_file_name, bucket, key, ExtraArgs=self.extra_args
+            )
+        self._putJson(bucket, base_key, {"uri": uri, "files": manifest})
+        return uri, entry_point_name
+
+    def _uploadDelta(self, bucket, key, files, manifest, base, entry_point_name):
+        changed = [x for x in sorted(manifest) if base["files"].get(x) != manifest[x]]
+        deleted = [x for x in sorted(base["files"]) if x not in manifest]
+        # requirements.txt is installed before the entry point runs, so it's always needed
+        if "requirements.txt" in manifest and "requirements.txt" not in changed:
+            changed.append("requirements.txt")
+        changed_size = sum(os.path.getsize(files[x]) for x in changed)
+        total_size = sum(os.path.getsize(x) for x in files.values())
+        if changed_size > total_size * constants.DELTA_MAX_SIZE_RATIO:
+            logger.info(
+                f"Too many changes for a code overlay ({changed_size} of {total_size} bytes)"
+            )
+            return False
+
+        delta = {
+            "base": base["uri"],
+            "overlay": changed,
+            "deleted": deleted,
+            "entry_point": entry_point_name,
+        }
+        bootstrap_path = os.path.join(
+            os.path.dirname(__file__), "worker_toolkit", "delta_bootstrap.py"
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tar_file_name = os.path.join(tmp_dir, "sourcedir-delta.tar.gz")
+            with tarfile.open(tar_file_name, mode="w:gz", dereference=True) as tar:
+                for arcname in changed:
+                    tar.add(files[arcname], arcname=arcname)
+                tar.add(bootstrap_path, arcname=constants.DELTA_BOOTSTRAP_NAME)
+                delta_data = json.dumps(delta).encode("utf-8")
+                info = tarfile.TarInfo(constants.DELTA_FILE_NAME)
+                info.size = len(delta_data)
+                tar.addfile(info, io.BytesIO(delta_data))
+            logger.info(
+                f"Uploading a code overlay of {len(changed)} changed and {len(deleted)} deleted "
+                f"files ({changed_size} bytes) to s3://{bucket}/{key}, based on {base['uri']}"
+            )
+            self.s3_client.upload_file(
+                tar_file_name, bucket, key, ExtraArgs=self.extra_args
+            )
+        return True
+
+    def getPathUri(self, path):
+        """Get the URI of a local file or directory, e.g. a processing job dependency.
+        Only the files that don't already exist are uploaded.
+
+        return: the S3 URI of the file / directory
+        rtype: str
+        """
+        path = os.path.abspath(path)
+        basename = os.path.basename(path)
+        files = listFiles(path, basename)
+        base_uri = sagemaker.s3.s3_path_join(self.base_uri, hashFiles(files))
+        bucket, prefix = sagemaker.s3.parse_s3_url(base_uri)
+
+        existing = set()
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix + "/"):
+            existing.update(x["Key"] for x in page.get("Contents", []))
+        missing = [
+            (key, file_path)
+            for key, file_path in ((prefix + "/" + x, y) for x, y in files)
+            if key not in existing
+        ]
+        if missing:
+            logger.info(f"Uploading {len(missing)} files of {path} to {base_uri}")
+        else:
+            logger.info(f"Reusing {path} at {base_uri}")
+        for key, file_path in missing:
+            self.s3_client.upload_file(
+                file_path, bucket, key, ExtraArgs=self.extra_args
+            )
+        return sagemaker.s3.s3_path_join(base_uri, basename)
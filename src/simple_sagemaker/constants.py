@@ -7,6 +7,33 @@ DEFAULT_VOLUME_SIZE = 30  # GB
 DEFAULT_USE_SPOT = True
 DEFAULT_MAX_RUN = 24 * 60
 DEFAULT_MAX_WAIT = 0
+DEFAULT_JOB_POLL_SECS = 30
+JOB_POLL_MIN_SECS = 10
+JOB_POLL_MAX_SECS = 120
+DEFAULT_LOGS_MAX_WORKERS = 8
+DEFAULT_LOGS_POLL_SECS = 10
+LOG_POSITIONS_FILE_NAME = ".log_positions.json"
+DEFAULT_DOWNLOAD_MAX_WORKERS = 16
+DEFAULT_CLIENT_MAX_POOL_CONNECTIONS = 32
+DEFAULT_CLIENT_MAX_ATTEMPTS = 10
+ARCHIVE_INDEX_SUFFIX = ".index.json"
+DEFAULT_JOB_INDEX_PATH = "~/.simple_sagemaker/jobs.sqlite"
+PROCESSING_JOB_MAX_CANDIDATES = 10
+FINGERPRINT_TAG_NAME = "SimpleSagemakerFingerprint"
+FINGERPRINT_LENGTH = 32
+CODE_ARTIFACTS_DIR = "_code"  # not a valid task name, to not collide with one
+DELTA_MAX_SIZE_RATIO = 0.5
+DELTA_BOOTSTRAP_NAME = "ssm_delta_bootstrap.py"
+DELTA_FILE_NAME = ".ssm_delta.json"
+INPUT_DISTRIBUTION_BY_SIZE = "ShardedBySize"
+SHARD_MANIFEST_NAME = "shard-{}.manifest"
+DEFAULT_SWEEP_MAX_CONCURRENT = 4
+SWEEP_RESULTS_FILE_NAME = "sweep.csv"
+DEFAULT_PIPELINE_MAX_CONCURRENT = 4
+PIPELINE_RESULTS_FILE_NAME = "pipeline.csv"
+TIMELINE_FILE_NAME = "timeline.json"
+UTILIZATION_FILE_NAME = "utilization.csv"
+UTILIZATION_SUMMARY_FILE_NAME = "utilization_summary.json"
 
 DEFAULT_IAM_ROLE = "SageMakerIAMRole"
 DEFAULT_IAM_BUCKET_POLICY_SUFFIX = "Policy"
@@ -1,18 +1,99 @@
 import base64
+import json
 import logging
 import os
+import time
 from io import BytesIO
 
 import docker
 from sagemaker import image_uris
 
+from .clients import getClient
+
 logger = logging.getLogger(__name__)
 
 
+class PushProgress:
+    """Aggregates the decoded stream of `docker push` into a per-layer progress,
+    instead of logging each of its (many) lines.
+
+    :param log_interval: Minimal number of seconds between progress log lines, defaults to 5
+    :type log_interval: int, optional
+    """
+
+    def __init__(self, log_interval=5):
+        self.log_interval = log_interval
+        self.layers = dict()
+        self.errors = list()
+        self.digest = None
+        self.start_time = time.time()
+        self.last_log_time = self.start_time
+
+    def update(self, line):
+        """Update the progress with a single (decoded) line of the push stream"""
+        if "error" in line:
+            self.errors.append(line["error"])
+            logger.error(f"Push error: {line['error']}")
+            return
+        if "aux" in line:
+            self.digest = line["aux"].get("Digest", self.digest)
+            return
+        if "id" not in line:
+            logger.debug(line)
+            return
+
+        layer = self.layers.setdefault(
+            line["id"], {"status": None, "current": 0, "total": 0}
+        )
+        layer["status"] = line.get("status", layer["status"])
+        details = line.get("progressDetail") or {}
+        if "total" in details:
+            layer["total"] = details["total"]
+        if "current" in details:
+            layer["current"] = details["current"]
+        if layer["status"] == "Pushed":
+            layer["current"] = layer["total"]
+
+        now = time.time()
+        if now - self.last_log_time >= self.log_interval:
+            self.last_log_time = now
+            logger.info(self.progressLine())
+
+    def _countStatus(self, status):
+        return sum(1 for x in self.layers.values() if x["status"] == status)
+
+    def summary(self):
+        """A machine readable summary of the push"""
+        elapsed = time.time() - self.start_time
+        pushed_bytes = sum(x["current"] for x in self.layers.values())
+        return {
+            "layers": len(self.layers),
+            "pushed_layers": self._countStatus("Pushed"),
+            "skipped_layers": self._countStatus("Layer already exists"),
+            "pushed_bytes": pushed_bytes,
+            "total_bytes": sum(x["total"] for x in self.layers.values()),
+            "elapsed_secs": round(elapsed, 2),
+            "mb_per_sec": round(pushed_bytes / 2**20 / elapsed, 2) if elapsed else 0,
+            "digest": self.digest,
+            "errors": self.errors,
+        }
+
+    def progressLine(self):
+        """A compact, human readable, progress line"""
+        s = self.summary()
+        done = s["pushed_layers"] + s["skipped_layers"]
+        return (
+            f"Pushing: {done}/{s['layers']} layers done ({s['skipped_layers']} already exist), "
+            f"{s['pushed_bytes'] / 2**20:.1f}/{s['total_bytes'] / 2**20:.1f} MB, "
+            f"{s['mb_per_sec']:.2f} MB/s"
+        )
+
+
 class ECRSync:
     def __init__(self, boto3_session):
         self.boto3_session = boto3_session
-        self.ecrClient = self.boto3_session.client("ecr")
+        self.ecrClient = getClient(self.boto3_session, "ecr")
+        self.pushSummary = None
 
     def getRpoUri(self, aws_repo_name):
         repo_uri = None
@@ -21,12 +102,66 @@ class ECRSync:
                 repo_uri = repo["repositoryUri"]
         return repo_uri
 
+    def getImageDetails(self, aws_repo_name, image_digest):
+        """Get the details of an image by its digest, None if it doesn't exist in the repository.
+        A single targeted lookup is used, falling back to paging over all the repository images.
+        """
+        try:
+            resp = self.ecrClient.describe_images(
+                repositoryName=aws_repo_name, imageIds=[{"imageDigest": image_digest}]
+            )
+            return resp["imageDetails"][0] if resp["imageDetails"] else None
+        except self.ecrClient.exceptions.ImageNotFoundException:
+            return None
+        except self.ecrClient.exceptions.InvalidParameterException:
+            logger.debug(
+                f"Couldn't look up {image_digest} directly, paging over {aws_repo_name}",
+                exc_info=True,
+            )
+
+        paginator = self.ecrClient.get_paginator("describe_images")
+        for page in paginator.paginate(repositoryName=aws_repo_name):
+            for image_details in page["imageDetails"]:
+                if image_details["imageDigest"] == image_digest:
+                    return image_details
+        return None
+
+    def getImageDigest(self, image_uri):
+        """Get the digest of an ECR image, given by its URI
+
+        return: the digest, or None if it can't be found (e.g. of a non ECR or a local image)
+        rtype: str
+        """
+        if "@" in image_uri:
+            return image_uri.split("@", 1)[1]
+        registry, _, repo_and_tag = image_uri.partition("/")
+        repo_name, _, image_tag = repo_and_tag.rpartition(":")
+        if ".ecr." not in registry or not repo_name:
+            return None
+        try:
+            resp = self.ecrClient.describe_images(
+                registryId=registry.split(".")[0],
+                repositoryName=repo_name,
+                imageIds=[{"imageTag": image_tag}],
+            )
+            return resp["imageDetails"][0]["imageDigest"]
+        except:  # noqa: E722
+            logger.debug(f"Failed to get the digest of {image_uri}", exc_info=True)
+            return None
+
     def getOrCreateRepo(self, aws_repo_name):
         repo_uri = self.getRpoUri(aws_repo_name)
         if repo_uri is None:
             logging.info(f"Creating ECR repository: {aws_repo_name}")
-            repo = self.ecrClient.create_repository(repositoryName=aws_repo_name)
-            repo_uri = repo["repository"]["repositoryUri"]
+            try:
+                repo = self.ecrClient.create_repository(repositoryName=aws_repo_name)
+                repo_uri = repo["repository"]["repositoryUri"]
+            except self.ecrClient.exceptions.RepositoryAlreadyExistsException:
+                # created concurrently, e.g. by another build of :func:`SageMakerProject.prebuildImages`
+                repo = self.ecrClient.describe_repositories(
+                    repositoryNames=[aws_repo_name]
+                )
+                repo_uri = repo["repositories"][0]["repositoryUri"]
         return repo_uri
 
     def getPrebuiltImage(
@@ -129,26 +264,28 @@ class ECRSync:
         # build and tag the image
         image = client.images.build(**build_args)
 
-        images = self.ecrClient.describe_images(repositoryName=aws_repo_name)
-        images_digests = [x["imageDigest"] for x in images["imageDetails"]]
         build_repo_digests = image[0].attrs["RepoDigests"]
+        image_details = None
         if build_repo_digests:
             builtImageDigest = build_repo_digests[0].split("@")[1]
-        if not build_repo_digests or (builtImageDigest not in images_digests):
+            image_details = self.getImageDetails(aws_repo_name, builtImageDigest)
+        if not image_details:
             logging.info("Tagging and pushing the image...")
             res = image[0].tag(repo_uri, image_tag)
             assert res
 
             # push the image to ECR
+            progress = PushProgress()
             for line in client.images.push(
                 repo_uri, image_tag, auth_config=auth_config, stream=True, decode=True
             ):
-                logging.info(line)
+                progress.update(line)
+            self.pushSummary = progress.summary()
+            logger.info(progress.progressLine())
+            logger.info(f"Push summary: {json.dumps(self.pushSummary)}")
             image_uri = f"{repo_uri}:{image_tag}"
         else:
             logging.info("Image already exists!")
-            image_idx = images_digests.index(builtImageDigest)
-            image_details = images["imageDetails"][image_idx]
             # see https://docs.aws.amazon.com/AmazonECR/latest/userguide/docker-pull-ecr-image.html
             image_uri = f'{repo_uri}@{image_details["imageDigest"]}'
         logging.info(f"Image uri: {image_uri}")
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+
+import sagemaker
+
+from . import VERSION, constants
+from .clients import getClient
+from .code_artifacts import hashFiles, listFiles
+
+logger = logging.getLogger(__name__)
+
+# runTask arguments that don't affect the results of a task
+IGNORED_ARGS = (
+    "volume_size",
+    "use_spot_instances",
+    "max_run_mins",
+    "max_wait_mins",
+    "code_delta",
+)
+# runTask arguments that are fingerprinted by their content
+CODE_ARGS = ("source_dir", "entry_point", "code", "dependencies")
+INPUT_ARGS = ("additional_inputs", "inputs", "outputs", "model_uri")
+
+
+def hashS3Prefix(s3_client, uri):
+    """Get a content hash of the objects under an S3 "directory" (or of a single object), by their keys and ETags,
+    without reading them. E.g. `s3://bucket/task/output` covers `task/output/...` but not `task/output2/...`
+    """
+    bucket, prefix = sagemaker.s3.parse_s3_url(uri)
+    content_hash = hashlib.sha256()
+    dir_prefix = prefix if not prefix or prefix.endswith("/") else prefix + "/"
+    for page in s3_client.get_paginator("list_objects_v2").paginate(
+        Bucket=bucket, Prefix=prefix
+    ):
+        for obj in page.get("Contents", []):
+            if obj["Key"] != prefix and not obj["Key"].startswith(dir_prefix):
+                continue
+            content_hash.update(
+                f"{obj['Key'][len(prefix) :]}\0{obj['ETag']}\0".encode("utf-8")
+            )
+    return content_hash.hexdigest()[:32]
+
+
+def hashPath(s3_client, path):
+    """Get a content hash of an S3 prefix, or of a local file or directory. Other paths (e.g. of a
+    missing file) are taken as is
+    """
+    if path.lower().startswith("s3://"):
+        return hashS3Prefix(s3_client, path)
+    if os.path.exists(path):
+        return hashFiles(listFiles(path, os.path.basename(os.path.abspath(path))))
+    return path
+
+
+def _describeInputs(s3_client, args, input_uri):
+    inputs = dict()
+    if input_uri:
+        inputs["data"] = hashPath(s3_client, input_uri)
+    if args.get("model_uri"):
+        inputs["model"] = hashPath(s3_client, args["model_uri"])
+    for name, channel in (args.get("additional_inputs") or dict()).items():
+        config = channel.config
+        uri = config["DataSource"]["S3DataSource"]["S3Uri"]
+        inputs[name] = {"config": config, "content": hashPath(s3_client, uri)}
+    for channel in args.get("inputs") or list():
+        inputs[channel.input_name] = {
+            "destination": channel.destination,
+            "distribution": channel.s3_data_distribution_type,
+            "mode": channel.s3_input_mode,
+            "content": hashPath(s3_client, channel.source),
+        }
+    return inputs
+
+
+def _describeOutputs(args):
+    # where the outputs are written to, their content is the result
+    return {
+        channel.output_name: {
+            "source": channel.source,
+            "destination": channel.destination,
+            "mode": channel.s3_upload_mode,
+        }
+        for channel in args.get("outputs") or list()
+    }
+
+
+def getTaskFingerprint(
+    boto3_session, task_type, image_id, hyperparameters, args, input_uri=None
+):
+    """Get the fingerprint of a task run - a hash of everything its results depend on:
+
+    * The code content (source dir / entry point / processing code and the dependencies) and the library version
+    * The image (by its digest, if known)
+    * The hyperparameters
+    * The instance and running configuration, e.g. instance type and count, entry point, command line arguments
+      or environment variables
+    * The inputs content, by the keys and ETags of their S3 objects, which also covers the outputs of the
+      input tasks
+    * The outputs configuration, e.g. the destinations of a processing task outputs
+
+    Arguments that don't affect the results (e.g. spot instances, volume size or timeouts) are ignored.
+
+    :param task_type: The task type, either "Training" or "Processing"
+    :type task_type: str
+    :param image_id: The image digest, or its URI if the digest isn't known
+    :type image_id: str
+    :param hyperparameters: The task hyperparameters
+    :type hyperparameters: dict
+    :param args: The rest of the task arguments, see :func:`SageMakerProject.runTask`
+    :type args: dict
+    :param input_uri: The task input data URI, defaults to None
+    :type input_uri: str, optional
+
+    return: the fingerprint
+    rtype: str
+    """
+    s3_client = getClient(boto3_session, "s3")
+    code_paths = [args.get("source_dir") or args.get("entry_point"), args.get("code")]
+    code_paths += args.get("dependencies") or list()
+    entry_point = args.get("entry_point")
+    components = {
+        "version": VERSION,
+        "task_type": task_type,
+        "image": image_id,
+        "hyperparameters": hyperparameters,
+        "code": [hashPath(s3_client, x) for x in code_paths if x],
+        # the entry point content is part of the code, its location doesn't matter
+        "entry_point": entry_point and os.path.basename(entry_point),
+        "config": {
+            k: v
+            for k, v in args.items()
+            if k not in IGNORED_ARGS + CODE_ARGS + INPUT_ARGS
+        },
+        "inputs": _describeInputs(s3_client, args, input_uri),
+        "outputs": _describeOutputs(args),
+    }
+    logger.debug(f"Fingerprint components: {components}")
+    content = json.dumps(components, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(content).hexdigest()[: constants.FINGERPRINT_LENGTH]
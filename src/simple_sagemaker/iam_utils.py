@@ -1,6 +1,8 @@
 import json
 import logging
 
+from .clients import getClient
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +22,7 @@ def createSageMakerIAMRole(boto3_session, role_name):
             }
         ],
     }
-    client = boto3_session.client("iam")
+    client = getClient(boto3_session, "iam")
     try:
         client.get_role(RoleName=role_name)
     except:  # noqa: E722
@@ -85,7 +87,7 @@ def allowAccessToS3Bucket(boto3_session, role_name, policy_name, bucket_name):
         f"Allowing access for {role_name} to {bucket_name} using the {policy_name} policy..."
     )
 
-    client = boto3_session.client("iam")
+    client = getClient(boto3_session, "iam")
     policyString = {
         "Version": "2012-10-17",
         "Statement": [
@@ -0,0 +1,454 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError, ParamValidationError
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailedError(Exception):
+    """Raised when the result of a job that didn't complete successfully is requested"""
+
+    def __init__(self, job_name, status, reason=None):
+        self.job_name = job_name
+        self.status = status
+        self.reason = reason
+        super().__init__(f"Job {job_name} is {status}: {reason}")
+
+
+class JobHandle:
+    """A handle to a submitted (or an already completed) job of a task, with a future like interface.
+
+    :param smTask: The task the job belongs to
+    :type smTask: :class:`SageMakerTask`
+    :param job_name: The job name
+    :type job_name: str
+    :param task_type: The job type, either "Training" or "Processing"
+    :type task_type: str
+    """
+
+    TERMINAL_STATUSES = ("Completed", "Failed", "Stopped")
+
+    def __init__(self, smTask, job_name, task_type):
+        self.smTask = smTask
+        self.job_name = job_name
+        self.task_type = task_type
+        self.description = None
+        self.poller = None
+        self._done_event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = list()
+        self._status_callbacks = list()
+
+    def __repr__(self):
+        status = self.description and self._getStatus(self.description)
+        return f"JobHandle({self.job_name}, {self.task_type}, {status})"
+
+    def _getStatus(self, description):
+        return description[f"{self.task_type}JobStatus"]
+
+    def _getState(self, description):
+        if description is None:
+            return (None, None)
+        return (self._getStatus(description), description.get("SecondaryStatus"))
+
+    def getSecondaryStatus(self):
+        """The last known secondary status (for training jobs), e.g. "Downloading" or "Training" """
+        return self._getState(self.description)[1]
+
+    def _describe(self):
+        if self.task_type == constants.TASK_TYPE_TRAINING:
+            return self.smTask.smSession.describe_training_job(self.job_name)
+        return self.smTask.smSession.describe_processing_job(self.job_name)
+
+    def refresh(self):
+        """Describe the job and update its status
+
+        return: the job status
+        rtype: str
+        """
+        if not self._done_event.is_set():
+            self.update(self._describe(), full=True)
+        return self._getStatus(self.description)
+
+    def update(self, description, full=False):
+        """Update the job with an up to date description, e.g. from a batched query.
+        The done callbacks are called once the job reaches a terminal status.
+
+        :param description: The job description, or a summary of it with at least the job status
+        :type description: dict
+        :param full: Whether `description` is a full one (i.e. from `describe_*_job`), defaults to False
+        :type full: bool, optional
+        """
+        with self._lock:
+            if self._done_event.is_set():
+                return
+            prev_state = self._getState(self.description)
+            self.description = description
+            done = self._getStatus(description) in JobHandle.TERMINAL_STATUSES
+            if done and not full:
+                # make sure the full description is kept
+                self.description = description = self._describe()
+            state = self._getState(description)
+            if done:
+                self.smTask.descriptions.append(description)
+                self._done_event.set()
+
+        if state != prev_state:
+            logger.debug(f"Job {self.job_name}: {prev_state} -> {state}")
+            for callback in self._status_callbacks:
+                self._runCallback(callback, prev_state, state)
+        if not done:
+            return
+
+        status = self._getStatus(description)
+        if status != "Completed":
+            logger.error(f"Job {self.job_name} failed with status: {status}")
+        for callback in self._callbacks:
+            self._runCallback(callback)
+
+    def _runCallback(self, callback, *args):
+        try:
+            callback(self, *args)
+        except:  # noqa: E722
+            logger.error(f"Done callback of {self.job_name} failed", exc_info=True)
+
+    def _polled(self):
+        # the status is updated by a poller, no need to query it
+        return self.poller is not None and self.description is not None
+
+    def status(self):
+        """Get the current job status, e.g. "InProgress" or "Completed"
+
+        return: the job status
+        rtype: str
+        """
+        if self._polled():
+            return self._getStatus(self.description)
+        return self.refresh()
+
+    def done(self):
+        """Whether the job reached a terminal status (Completed, Failed or Stopped)"""
+        if self._done_event.is_set():
+            return True
+        return self.status() in JobHandle.TERMINAL_STATUSES
+
+    def running(self):
+        """Whether the job is still running"""
+        return not self.done()
+
+    def wait(self, timeout=None, poll_secs=constants.DEFAULT_JOB_POLL_SECS):
+        f"""Wait for the job to reach a terminal status
+
+        :param timeout: Maximal number of seconds to wait, defaults to wait forever
+        :type timeout: float, optional
+        :param poll_secs: Number of seconds between status queries, defaults to {constants.DEFAULT_JOB_POLL_SECS}
+        :type poll_secs: float, optional
+
+        return: the job status
+        rtype: str
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not self.done():
+            remaining = poll_secs if deadline is None else deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Job {self.job_name} isn't done yet")
+            # a poller sets the done event, no need to poll here
+            self._done_event.wait(
+                remaining if self._polled() else min(poll_secs, remaining)
+            )
+        return self._getStatus(self.description)
+
+    def result(self, timeout=None):
+        """Wait for the job and get its description
+
+        :param timeout: Maximal number of seconds to wait, defaults to wait forever
+        :type timeout: float, optional
+
+        :raises JobFailedError: If the job didn't complete successfully
+
+        return: the job description
+        rtype: dict
+        """
+        exception = self.exception(timeout)
+        if exception:
+            raise exception
+        return self.description
+
+    def exception(self, timeout=None):
+        """Wait for the job and get a :class:`JobFailedError` if it failed, None otherwise"""
+        status = self.wait(timeout)
+        if status == "Completed":
+            return None
+        return JobFailedError(
+            self.job_name, status, self.description.get("FailureReason")
+        )
+
+    def addStatusCallback(self, callback):
+        """Add a callback to be called on every status transition of the job, as
+        `callback(handle, prev_state, state)`, where the states are (status, secondary status) tuples.
+        """
+        self._status_callbacks.append(callback)
+
+    def addDoneCallback(self, callback):
+        """Add a callback, to be called with this handle once the job is done.
+        If the job is already known to be done, the callback is called immediately.
+        """
+        with self._lock:
+            if not self._done_event.is_set():
+                self._callbacks.append(callback)
+                return
+        self._runCallback(callback)
+
+    def cancel(self):
+        """Stop the job if it's still running
+
+        return: whether a stop request was sent
+        rtype: bool
+        """
+        if self.done():
+            return False
+        sm_client = self.smTask.sm_client
+        if self.task_type == constants.TASK_TYPE_TRAINING:
+            sm_client.stop_training_job(TrainingJobName=self.job_name)
+        else:
+            sm_client.stop_processing_job(ProcessingJobName=self.job_name)
+        return True
+
+    @staticmethod
+    def waitAll(handles, timeout=None):
+        """Wait for all the given handles to be done
+
+        :param handles: The handles to wait for
+        :type handles: list of :class:`JobHandle`
+        :param timeout: Maximal number of seconds to wait, defaults to wait forever
+        :type timeout: float, optional
+
+        return: a mapping from job name to its status
+        rtype: dict
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        statuses = dict()
+        for handle in handles:
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            statuses[handle.job_name] = handle.wait(remaining)
+        return statuses
+
+
+class JobPoller:
+    f"""Tracks the status of many outstanding jobs using a single background thread. Instead of
+    describing each job, the statuses are queried in batches using the SageMaker search API
+    (falling back to `list_*_jobs`), so the number of API calls doesn't grow with the number of jobs.
+
+    The polling interval adapts: it's reset to `min_secs` after a status transition, kept short while
+    jobs are in a short phase (e.g. starting), grows up to `max_secs` while nothing changes, and is
+    doubled when the API is throttled.
+
+    :param sm_client: A SageMaker boto3 client
+    :param min_secs: Minimal number of seconds between polls, defaults to {constants.JOB_POLL_MIN_SECS}
+    :type min_secs: float, optional
+    :param max_secs: Maximal number of seconds between polls, defaults to {constants.JOB_POLL_MAX_SECS}
+    :type max_secs: float, optional
+    :param on_transition: A callback to be called on status transitions of any of the jobs,
+        see :func:`JobHandle.addStatusCallback`
+    :type on_transition: callable, optional
+    """
+
+    SHORT_PHASES = ("Starting", "Downloading", "Uploading", "Stopping")
+    BACKOFF_FACTOR = 1.5
+    # Creation time margin for the batched queries, to cover clock skews
+    CREATION_TIME_MARGIN_SECS = 15 * 60
+
+    def __init__(
+        self,
+        sm_client,
+        min_secs=constants.JOB_POLL_MIN_SECS,
+        max_secs=constants.JOB_POLL_MAX_SECS,
+        on_transition=None,
+    ):
+        self.sm_client = sm_client
+        self.min_secs = min_secs
+        self.max_secs = max_secs
+        self.on_transition = on_transition
+        self.interval = min_secs
+        self.handles = dict()
+        self.api_calls = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._use_search = {
+            constants.TASK_TYPE_TRAINING: True,
+            constants.TASK_TYPE_PROCESSING: True,
+        }
+
+    def add(self, handle):
+        """Start tracking a job handle"""
+        if handle._done_event.is_set():
+            return
+        handle.poller = self
+        if self.on_transition:
+            handle.addStatusCallback(self.on_transition)
+        with self._lock:
+            self.handles[handle.job_name] = (handle, time.time())
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="JobPoller", daemon=True
+                )
+                self._thread.start()
+            # poll soon after new jobs are added
+            self.interval = self.min_secs
+
+    def _outstanding(self):
+        # only the done flag is checked under the lock, done() may describe the job and run its callbacks,
+        # which may add handles. Jobs that aren't done yet are queried by the next poll
+        with self._lock:
+            done = [x for x, (h, _) in self.handles.items() if h._done_event.is_set()]
+            for job_name in done:
+                del self.handles[job_name]
+            return list(self.handles.values())
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            outstanding = self._outstanding()
+            if not outstanding:
+                with self._lock:
+                    if not self.handles:
+                        self._thread = None
+                        return
+                continue
+            try:
+                self.interval = self.poll(outstanding)
+            except:  # noqa: E722
+                logger.warning("Polling jobs failed", exc_info=True)
+                self.interval = min(self.interval * 2, self.max_secs)
+
+    def poll(self, outstanding=None):
+        """Query the status of all the outstanding jobs and update their handles
+
+        return: number of seconds to wait before the next poll
+        rtype: float
+        """
+        if outstanding is None:
+            outstanding = self._outstanding()
+        throttled = False
+        changed = False
+        for task_type in self._use_search.keys():
+            handles = {
+                h.job_name: h for (h, _) in outstanding if h.task_type == task_type
+            }
+            if not handles:
+                continue
+            since = min(t for (h, t) in outstanding if h.job_name in handles)
+            since -= JobPoller.CREATION_TIME_MARGIN_SECS
+            try:
+                summaries = self._query(task_type, set(handles), since)
+            except ClientError as e:
+                if not _isThrottling(e):
+                    raise
+                logger.debug(f"Polling {task_type} jobs was throttled")
+                throttled = True
+                continue
+            for job_name, summary in summaries.items():
+                handle = handles[job_name]
+                prev_state = handle._getState(handle.description)
+                handle.update(summary)
+                changed |= prev_state != handle._getState(handle.description)
+
+        if throttled:
+            return min(self.interval * 2, self.max_secs)
+        if changed:
+            return self.min_secs
+        interval = min(self.interval * JobPoller.BACKOFF_FACTOR, self.max_secs)
+        phases = [h.getSecondaryStatus() for (h, _) in outstanding]
+        if any(phase in JobPoller.SHORT_PHASES for phase in phases):
+            interval = min(interval, 2 * self.min_secs)
+        return interval
+
+    def wakeup(self):
+        """Poll now, instead of waiting for the current interval to pass"""
+        self._wakeup.set()
+
+    def _query(self, task_type, job_names, since):
+        if self._use_search[task_type]:
+            try:
+                return self._search(task_type, job_names, since)
+            except (ClientError, ParamValidationError) as e:
+                # e.g. processing jobs aren't a searchable resource
+                if isinstance(e, ClientError) and _isThrottling(e):
+                    raise
+                logger.info(
+                    f"Searching {task_type} jobs isn't possible, listing them instead",
+                    exc_info=True,
+                )
+                self._use_search[task_type] = False
+        return self._list(task_type, job_names, since)
+
+    def _search(self, task_type, job_names, since):
+        # All jobs launched by simple-sagemaker are tagged by the version
+        filters = [
+            {
+                "Name": "CreationTime",
+                "Operator": "GreaterThanOrEqualTo",
+                "Value": _isoTime(since),
+            },
+            {"Name": "Tags.SimpleSagemakerVersion", "Operator": "Exists"},
+        ]
+        res = dict()
+        extra_args = dict()
+        while True:
+            self.api_calls += 1
+            resp = self.sm_client.search(
+                Resource=f"{task_type}Job",
+                SearchExpression={"Filters": filters},
+                SortBy="CreationTime",
+                SortOrder="Descending",
+                MaxResults=100,
+                **extra_args,
+            )
+            for result in resp["Results"]:
+                job = result[f"{task_type}Job"]
+                if job[f"{task_type}JobName"] in job_names:
+                    res[job[f"{task_type}JobName"]] = job
+            if len(res) == len(job_names) or "NextToken" not in resp:
+                return res
+            extra_args["NextToken"] = resp["NextToken"]
+
+    def _list(self, task_type, job_names, since):
+        list_func = (
+            self.sm_client.list_training_jobs
+            if task_type == constants.TASK_TYPE_TRAINING
+            else self.sm_client.list_processing_jobs
+        )
+        res = dict()
+        extra_args = dict()
+        while True:
+            self.api_calls += 1
+            resp = list_func(
+                CreationTimeAfter=datetime.fromtimestamp(since, timezone.utc),
+                MaxResults=100,
+                **extra_args,
+            )
+            for summary in resp[f"{task_type}JobSummaries"]:
+                if summary[f"{task_type}JobName"] in job_names:
+                    res[summary[f"{task_type}JobName"]] = summary
+            if len(res) == len(job_names) or "NextToken" not in resp:
+                return res
+            extra_args["NextToken"] = resp["NextToken"]
+
+
+def _isThrottling(error):
+    return error.response.get("Error", {}).get("Code") in (
+        "ThrottlingException",
+        "Throttling",
+        "TooManyRequestsException",
+    )
+
+
+def _isoTime(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
@@ -0,0 +1,152 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+
+class JobIndex:
+    f"""A local (SQLite) index of the jobs submitted from this machine, keyed by account, region, project and
+    task, used to find the last job of a task without scanning all the jobs in the account.
+    The index is a cache - its entries are expected to be revalidated against SageMaker, and any failure to
+    use it is logged and ignored.
+
+    :param account_id: The AWS account the jobs belong to
+    :type account_id: str
+    :param region_name: The AWS region the jobs belong to
+    :type region_name: str
+    :param path: The database file path, defaults to {constants.DEFAULT_JOB_INDEX_PATH}
+    :type path: str, optional
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, account_id, region_name, path=constants.DEFAULT_JOB_INDEX_PATH):
+        self.account_id = account_id
+        self.region_name = region_name
+        self.path = os.path.expanduser(path)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        # job names are unique per account and region only
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS account_jobs (
+                account_id TEXT NOT NULL,
+                region_name TEXT NOT NULL,
+                job_name TEXT NOT NULL,
+                project_name TEXT NOT NULL,
+                task_name TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                status TEXT,
+                creation_time REAL NOT NULL,
+                fingerprint TEXT,
+                PRIMARY KEY (account_id, region_name, job_name)
+            )"""
+        )
+        # indices created before the fingerprints were kept
+        columns = [x[1] for x in conn.execute("PRAGMA table_info(account_jobs)")]
+        if "fingerprint" not in columns:
+            conn.execute("ALTER TABLE account_jobs ADD COLUMN fingerprint TEXT")
+        conn.execute(
+            """CREATE INDEX IF NOT EXISTS account_jobs_by_task
+            ON account_jobs (account_id, region_name, project_name, task_name, creation_time)"""
+        )
+        return conn
+
+    def _execute(self, sql, params=()):
+        try:
+            with JobIndex._lock, closing(self._connect()) as conn, conn:
+                return conn.execute(sql, params).fetchall()
+        except (sqlite3.Error, OSError):
+            logger.warning(
+                f"Failed to access the job index at {self.path}", exc_info=True
+            )
+            return None
+
+    def add(
+        self,
+        project_name,
+        task_name,
+        job_name,
+        task_type,
+        status,
+        creation_time,
+        fingerprint=None,
+    ):
+        """Add (or replace) a job
+
+        :param creation_time: The job creation time, as a POSIX timestamp
+        :type creation_time: float
+        :param fingerprint: The job fingerprint (see :func:`fingerprint.getTaskFingerprint`), defaults to None
+        :type fingerprint: str, optional
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO account_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.account_id,
+                self.region_name,
+                job_name,
+                project_name,
+                task_name,
+                task_type,
+                status,
+                creation_time,
+                fingerprint,
+            ),
+        )
+
+    def setStatus(self, job_name, status):
+        self._execute(
+            "UPDATE account_jobs SET status = ? WHERE account_id = ? AND region_name = ? AND job_name = ?",
+            (status, self.account_id, self.region_name, job_name),
+        )
+
+    def remove(self, job_name):
+        self._execute(
+            "DELETE FROM account_jobs WHERE account_id = ? AND region_name = ? AND job_name = ?",
+            (self.account_id, self.region_name, job_name),
+        )
+
+    def getLast(self, project_name, task_name, task_type=None):
+        """Get the last known job of a task
+
+        return: (job name, task type, status), or None if the task has no known job
+        rtype: tuple
+        """
+        sql = (
+            "SELECT job_name, task_type, status FROM account_jobs "
+            "WHERE account_id = ? AND region_name = ? AND project_name = ? AND task_name = ?"
+        )
+        params = (self.account_id, self.region_name, project_name, task_name)
+        if task_type:
+            sql += " AND task_type = ?"
+            params += (task_type,)
+        rows = self._execute(sql + " ORDER BY creation_time DESC LIMIT 1", params)
+        return tuple(rows[0]) if rows else None
+
+    def getByFingerprint(self, project_name, task_name, task_type, fingerprint):
+        """Get the known jobs of a task that were run with the given fingerprint and didn't fail
+
+        return: a list of (job name, status) tuples, latest first
+        rtype: list
+        """
+        rows = self._execute(
+            "SELECT job_name, status FROM account_jobs "
+            "WHERE account_id = ? AND region_name = ? AND project_name = ? AND task_name = ? AND task_type = ? "
+            "AND fingerprint = ? AND (status IS NULL OR status NOT IN ('Failed', 'Stopped')) "
+            "ORDER BY creation_time DESC",
+            (
+                self.account_id,
+                self.region_name,
+                project_name,
+                task_name,
+                task_type,
+                fingerprint,
+            ),
+        )
+        return [tuple(x) for x in rows or list()]
@@ -0,0 +1,245 @@
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+from . import constants
+from .clients import getClient
+
+logger = logging.getLogger(__name__)
+
+
+class LogPositions:
+    """The positions (CloudWatch token + file offset) of the log streams downloaded to a directory,
+    persisted in a sidecar file, to allow fetching only new events on following fetches.
+    The positions belong to a single job. If the directory holds the logs of another job, e.g. of a previous
+    run of the task, its positions are reset and its `logs*` files are removed.
+
+    :param logs_path: The directory the logs are downloaded to
+    :type logs_path: str
+    :param job_name: The job whose logs are downloaded
+    :type job_name: str
+    """
+
+    def __init__(self, logs_path, job_name):
+        self.file_name = os.path.join(logs_path, constants.LOG_POSITIONS_FILE_NAME)
+        self.job_name = job_name
+        self._lock = threading.Lock()
+        self.positions = dict()
+        saved = dict()
+        if os.path.isfile(self.file_name):
+            with open(self.file_name, "rt") as f:
+                saved = json.load(f)
+        if saved.get("job_name") == job_name:
+            self.positions = saved["streams"]
+        else:
+            for file_name in os.listdir(logs_path):
+                if re.fullmatch(r"logs\d+", file_name):
+                    os.remove(os.path.join(logs_path, file_name))
+
+    def getIndices(self, stream_names):
+        """Get the file index of each stream, new streams are given new indices"""
+        indices = {
+            name: self.positions[name]["index"]
+            for name in stream_names
+            if name in self.positions
+        }
+        next_index = max([x["index"] + 1 for x in self.positions.values()], default=0)
+        for name in stream_names:
+            if name not in indices:
+                indices[name] = next_index
+                next_index += 1
+        return indices
+
+    def get(self, stream_name):
+        return self.positions.get(stream_name)
+
+    def set(self, stream_name, index, token, offset):
+        with self._lock:
+            self.positions[stream_name] = {
+                "index": index,
+                "token": token,
+                "offset": offset,
+            }
+            # write atomically, to always keep a consistent positions file
+            tmp_file_name = self.file_name + ".tmp"
+            with open(tmp_file_name, "wt") as f:
+                json.dump({"job_name": self.job_name, "streams": self.positions}, f)
+            os.replace(tmp_file_name, self.file_name)
+
+
+class LogsFetcher:
+    f"""Fetches the CloudWatch logs of a job, concurrently for all its log streams (i.e. instances).
+    Throttling is handled by the client side rate limiting of botocore's adaptive retry mode.
+
+    :param boto3_session: The boto3 session to be used
+    :param max_workers: Maximal number of streams to fetch concurrently,
+        defaults to {constants.DEFAULT_LOGS_MAX_WORKERS}
+    :type max_workers: int, optional
+    """
+
+    def __init__(self, boto3_session, max_workers=constants.DEFAULT_LOGS_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.logs_client = getClient(
+            boto3_session, "logs", max_pool_connections=max_workers
+        )
+
+    @staticmethod
+    def getLogGroup(task_type):
+        return f"/aws/sagemaker/{task_type}Jobs"
+
+    def getStreamNames(self, log_group, job_name):
+        """Get the (sorted) names of all the log streams of a job, one per instance"""
+        stream_names = list()
+        paginator = self.logs_client.get_paginator("describe_log_streams")
+        try:
+            for page in paginator.paginate(
+                logGroupName=log_group,
+                logStreamNamePrefix=job_name + "/",
+                orderBy="LogStreamName",
+            ):
+                stream_names.extend(x["logStreamName"] for x in page["logStreams"])
+        except self.logs_client.exceptions.ResourceNotFoundException:
+            logger.info(f"No logs were found for {job_name}")
+        return sorted(stream_names)
+
+    @staticmethod
+    def getHostName(stream_name):
+        """Get the host name from a stream name, e.g. "algo-1" from "[job name]/algo-1-1603000000" """
+        return stream_name.split("/", 1)[-1].rsplit("-", 1)[0]
+
+    def iterPages(self, log_group, stream_name, next_token=None):
+        """Iterate over the events of a log stream, page by page, starting from the beginning or from
+        `next_token`. Yields (events, next token) tuples.
+        """
+        extra_args = {"startFromHead": True}
+        if next_token:
+            extra_args["nextToken"] = next_token
+        while True:
+            resp = self.logs_client.get_log_events(
+                logGroupName=log_group, logStreamName=stream_name, **extra_args
+            )
+            yield resp["events"], resp["nextForwardToken"]
+            # the same token is returned once the end of the stream is reached
+            if resp["nextForwardToken"] == extra_args.get("nextToken"):
+                break
+            extra_args["nextToken"] = resp["nextForwardToken"]
+
+    def iterEvents(self, log_group, stream_name):
+        """Iterate over all the events of a log stream"""
+        for events, _ in self.iterPages(log_group, stream_name):
+            yield from events
+
+    def _fetchStreamToFile(
+        self, logs_path, positions, on_event, log_group, stream_name, index
+    ):
+        file_name = os.path.join(logs_path, f"logs{index}")
+        position = positions.get(stream_name)
+        next_token = None
+        if position and os.path.isfile(file_name):
+            next_token = position["token"]
+            # drop anything written after the last saved position
+            os.truncate(file_name, position["offset"])
+        count = 0
+        with open(file_name, "ab" if next_token else "wb") as f:
+            for events, next_token in self.iterPages(
+                log_group, stream_name, next_token
+            ):
+                for event in events:
+                    f.write(event["message"].encode("utf-8"))
+                    f.write(b"\n")
+                    if on_event:
+                        on_event(stream_name, event)
+                count += len(events)
+                f.flush()
+                positions.set(stream_name, index, next_token, f.tell())
+        logger.debug(f"Fetched {count} new events from {stream_name} to {file_name}")
+        return file_name
+
+    def _fetchStream(self, log_group, stream_name, index):
+        return [event["message"] for event in self.iterEvents(log_group, stream_name)]
+
+    def _fetchAll(self, job_name, task_type, func, positions=None):
+        log_group = LogsFetcher.getLogGroup(task_type)
+        stream_names = self.getStreamNames(log_group, job_name)
+        if not stream_names:
+            return dict()
+        if positions:
+            indices = positions.getIndices(stream_names)
+        else:
+            indices = {name: index for index, name in enumerate(stream_names)}
+        logger.debug(f"Fetching {len(stream_names)} log streams of {job_name}...")
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(stream_names))
+        ) as executor:
+            futures = {
+                index: executor.submit(func, log_group, stream_name, index)
+                for stream_name, index in indices.items()
+            }
+            return {index: future.result() for index, future in futures.items()}
+
+    def fetchToFiles(self, job_name, task_type, logs_path, on_event=None):
+        """Fetch the logs of all the instances of a job, writing each log stream directly to
+        a `logs[index]` file under `logs_path`. The stream positions are persisted along with the logs,
+        so following calls for the same job only fetch and append new events. The logs of another job that
+        were downloaded to `logs_path` are replaced.
+
+        :param on_event: A callback to be called as `on_event(stream_name, event)` for each new event.
+            Note that it's called concurrently for different streams.
+        :type on_event: callable, optional
+
+        return: a mapping from the stream index to the file name
+        rtype: dict
+        """
+        os.makedirs(logs_path, exist_ok=True)
+        positions = LogPositions(logs_path, job_name)
+        func = partial(self._fetchStreamToFile, logs_path, positions, on_event)
+        return self._fetchAll(job_name, task_type, func, positions)
+
+    def fetch(self, job_name, task_type):
+        """Fetch the logs of all the instances of a job into memory
+
+        return: a mapping from the stream index to a list of log lines
+        rtype: dict
+        """
+        return self._fetchAll(job_name, task_type, self._fetchStream)
+
+    def iterMerged(self, job_name, task_type):
+        """Iterate over the events of all the instances of a job, ordered by their timestamp.
+        The streams are merged page by page, so memory is bounded by a single page per stream.
+        Yields (host name, event) tuples.
+        """
+        log_group = LogsFetcher.getLogGroup(task_type)
+        stream_names = self.getStreamNames(log_group, job_name)
+
+        def iterStream(stream_name):
+            host_name = LogsFetcher.getHostName(stream_name)
+            for event in self.iterEvents(log_group, stream_name):
+                yield event["timestamp"], host_name, event
+
+        merged = heapq.merge(
+            *[iterStream(stream_name) for stream_name in stream_names],
+            key=lambda x: x[0],
+        )
+        for _, host_name, event in merged:
+            yield host_name, event
+
+    def writeMerged(self, job_name, task_type, output):
+        """Write the timestamp ordered events of all the instances of a job to a text stream,
+        each line prefixed by the event time and its host name
+
+        return: number of written events
+        rtype: int
+        """
+        count = 0
+        for host_name, event in self.iterMerged(job_name, task_type):
+            event_time = datetime.fromtimestamp(event["timestamp"] / 1000, timezone.utc)
+            event_time = event_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            output.write(f"{event_time} [{host_name}] {event['message']}\n")
+            count += 1
+        return count
@@ -0,0 +1,324 @@
+import collections
+import csv
+import logging
+import os
+import queue
+import time
+
+from sagemaker.processing import ProcessingInput
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+InputEdge = collections.namedtuple(
+    "InputEdge",
+    ["input_name", "task_name", "type", "distribution", "subdir", "input_mode"],
+)
+_INPUT_EDGE_DEFAULTS = {
+    "distribution": "FullyReplicated",
+    "subdir": "",
+    "input_mode": None,
+}
+
+
+def parseInputEdge(edge):
+    """Parse an input of a pipeline task taken from the output of another task, given either as a list,
+    similar to the `--input_task` CLI argument, e.g. ["data", "prep-task", "output"], or as a mapping with
+    the :class:`InputEdge` fields. The distribution, subdir and input mode are optional
+
+    :raises ValueError: If the input is malformed, e.g. has missing or unknown fields
+
+    return: the parsed input
+    rtype: :class:`InputEdge`
+    """
+    fields = len(InputEdge._fields)
+    required = fields - len(_INPUT_EDGE_DEFAULTS)
+    if isinstance(edge, dict):
+        missing = set(InputEdge._fields[:required]) - set(edge)
+        unknown = set(edge) - set(InputEdge._fields)
+        if missing or unknown:
+            raise ValueError(
+                f"Invalid input {edge}, missing fields: {sorted(missing)}, unknown fields: {sorted(unknown)}"
+            )
+        edge = InputEdge(**{**_INPUT_EDGE_DEFAULTS, **edge})
+    else:
+        if isinstance(edge, str) or not required <= len(edge) <= fields:
+            raise ValueError(
+                f"Invalid input {edge}, expected a list of {required} to {fields} items: {list(InputEdge._fields)}"
+            )
+        defaults = list(_INPUT_EDGE_DEFAULTS.values())
+        edge = InputEdge(*edge, *defaults[len(edge) - required :])
+    if edge.type not in ("model", "output", "state"):
+        raise ValueError(
+            f"Input type has to be one of model, output or state, got {edge}"
+        )
+    return edge
+
+
+def topologicalOrder(dependencies):
+    """Order the tasks of a DAG such that each task comes after all its dependencies (Kahn's algorithm)
+
+    :param dependencies: The tasks dependencies, as a {task name: set of task names} mapping
+    :type dependencies: dict
+
+    :raises AssertionError: If the dependencies have a cycle
+
+    return: the ordered task names
+    rtype: list
+    """
+    remaining = {task: len(deps) for task, deps in dependencies.items()}
+    dependents = {task: list() for task in dependencies}
+    for task, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(task)
+    ready = [task for task, count in remaining.items() if not count]
+    order = list()
+    while ready:
+        task = ready.pop(0)
+        order.append(task)
+        for dependent in dependents[task]:
+            remaining[dependent] -= 1
+            if not remaining[dependent]:
+                ready.append(dependent)
+    assert len(order) == len(
+        dependencies
+    ), f"The pipeline has a cycle between {sorted(set(dependencies) - set(order))}"
+    return order
+
+
+def criticalPath(durations, dependencies):
+    """Get the critical path of a DAG, i.e. the chain of dependent tasks with the longest total duration,
+    which bounds the pipeline duration regardless of the concurrency
+
+    :param durations: The tasks durations in seconds, as a {task name: seconds} mapping
+    :type durations: dict
+    :param dependencies: The tasks dependencies, as a {task name: set of task names} mapping
+    :type dependencies: dict
+
+    return: the critical path task names, and its total duration in seconds
+    rtype: tuple
+    """
+    finish = dict()
+    previous = dict()
+    for task in topologicalOrder(dependencies):
+        deps = [dep for dep in dependencies[task] if dep in finish]
+        previous[task] = max(deps, key=lambda x: finish[x]) if deps else None
+        start = finish[previous[task]] if previous[task] else 0
+        finish[task] = start + durations.get(task, 0)
+    if not finish:
+        return list(), 0
+    task = max(finish, key=lambda x: finish[x])
+    secs = finish[task]
+    path = list()
+    while task:
+        path.append(task)
+        task = previous[task]
+    return path[::-1], secs
+
+
+class Pipeline:
+    f"""A DAG of tasks of a project, derived from the tasks inputs that are outputs of other tasks.
+    A task is submitted as soon as all the tasks it depends on are completed, with up to `max_concurrent`
+    running jobs at a time. Tasks that were already completed aren't run again (see
+    :func:`SageMakerProject.runTask`), and tasks depending on a failed task are skipped.
+
+    :param sm_project: The project to run the tasks of
+    :type sm_project: :class:`SageMakerProject`
+    :param tasks: The pipeline tasks, as a {{task name: :func:`SageMakerProject.runTask` arguments}} mapping.
+        The `input_tasks` argument of a task is a list of its inputs that are outputs of other tasks
+        (see :func:`parseInputEdge`), the input tasks that aren't part of the pipeline have to be already
+        completed
+    :type tasks: dict
+    :param max_concurrent: Maximal number of concurrently running jobs,
+        defaults to {constants.DEFAULT_PIPELINE_MAX_CONCURRENT}
+    :type max_concurrent: int, optional
+    """
+
+    def __init__(
+        self,
+        sm_project,
+        tasks,
+        max_concurrent=constants.DEFAULT_PIPELINE_MAX_CONCURRENT,
+    ):
+        assert (
+            max_concurrent > 0
+        ), f"max_concurrent has to be positive, got {max_concurrent}"
+        self.sm_project = sm_project
+        self.max_concurrent = max_concurrent
+        self.tasks = dict()
+        self.inputs = dict()
+        self.dependencies = dict()
+        for task_name, task_args in tasks.items():
+            task_args = dict(task_args or dict())
+            self.inputs[task_name] = [
+                parseInputEdge(x) for x in task_args.pop("input_tasks", list())
+            ]
+            self.tasks[task_name] = task_args
+            self.dependencies[task_name] = {
+                x.task_name for x in self.inputs[task_name] if x.task_name in tasks
+            }
+        self.order = topologicalOrder(self.dependencies)
+
+    def _getInputArgs(self, task_name, task_args):
+        # the input configurations are taken once the input tasks are completed
+        task_args = dict(task_args)
+        task_type = task_args.get("task_type", constants.TASK_TYPE_TRAINING)
+        if task_type == constants.TASK_TYPE_TRAINING:
+            inputs = dict(task_args.get("additional_inputs", dict()))
+            for edge in self.inputs[task_name]:
+                inputs[edge.input_name] = self.sm_project.getInputConfig(
+                    edge.task_name,
+                    edge.type,
+                    distribution=edge.distribution,
+                    subdir=edge.subdir,
+                    input_mode=edge.input_mode,
+                )
+            task_args["additional_inputs"] = inputs
+        else:
+            inputs = list(task_args.get("inputs", list()))
+            env = dict(task_args.get("env") or dict())
+            for edge in self.inputs[task_name]:
+                s3_uri = self.sm_project.getInputConfig(
+                    edge.task_name,
+                    edge.type,
+                    distribution=edge.distribution,
+                    subdir=edge.subdir,
+                    return_s3uri=True,
+                )
+                local_path = f"/opt/ml/processing/input/data/{edge.input_name}"
+                inputs.append(
+                    ProcessingInput(
+                        s3_uri,
+                        local_path,
+                        edge.input_name,
+                        s3_data_distribution_type=edge.distribution,
+                        s3_input_mode=edge.input_mode or "File",
+                    )
+                )
+                env[f"SM_CHANNEL_{edge.input_name.upper()}"] = local_path
+            task_args["inputs"] = inputs
+            task_args["env"] = env
+        task_args["tags"] = dict(task_args.get("tags", dict()))
+        return task_args
+
+    def _prebuildImages(self):
+        instance_types = {
+            task_args.get(
+                "instance_type", self.sm_project.defaultInstanceParams.instance_type
+            )
+            for task_args in self.tasks.values()
+            if task_args.get("image_uri") is None
+        }
+        if instance_types:
+            self.sm_project.prebuildImages(sorted(instance_types))
+
+    def run(self):
+        """Run the pipeline, and wait for all its tasks to be done
+
+        return: the results table, a row per task (in a topological order) with its job name, status,
+            whether an already completed job was reused, and its start / end / duration in seconds
+            relative to the pipeline start
+        rtype: list of dict
+        """
+        self._prebuildImages()
+        logger.info(
+            f"===== Running a pipeline of {len(self.tasks)} tasks, up to {self.max_concurrent} "
+            f"concurrently: {self.order} ====="
+        )
+        start_time = time.time()
+        remaining = {task: len(deps) for task, deps in self.dependencies.items()}
+        ready = [task for task in self.order if not remaining[task]]
+        done = queue.Queue()
+        handles = dict()
+        times = dict()
+        statuses = dict()
+        running = 0
+        while ready or running:
+            while ready and running < self.max_concurrent:
+                task_name = ready.pop(0)
+                task_args = dict(self.tasks[task_name])
+                times[task_name] = [time.time() - start_time, None]
+                try:
+                    task_args = self._getInputArgs(task_name, task_args)
+                    handle = self.sm_project.submitTask(
+                        task_name,
+                        task_args.pop("image_uri", None),
+                        task_args.pop("hyperparameters", None),
+                        **task_args,
+                    )
+                except:  # noqa: E722
+                    logger.error(
+                        f"Failed to submit the task {task_name}", exc_info=True
+                    )
+                    times[task_name][1] = times[task_name][0]
+                    statuses[task_name] = "NotSubmitted"
+                    continue
+                handles[task_name] = handle
+                running += 1
+                handle.addDoneCallback(lambda x, name=task_name: done.put(name))
+
+            if not running:
+                break
+            task_name = done.get()
+            running -= 1
+            times[task_name][1] = time.time() - start_time
+            statuses[task_name] = handles[task_name].wait()
+            if statuses[task_name] != "Completed":
+                continue
+            for dependent in self.order:
+                if task_name in self.dependencies[dependent]:
+                    remaining[dependent] -= 1
+                    if not remaining[dependent]:
+                        ready.append(dependent)
+
+        results = list()
+        for task_name in self.order:
+            row = {
+                "task_name": task_name,
+                "job_name": None,
+                "status": statuses.get(task_name, "Skipped"),
+                "reused": False,
+                "start_secs": None,
+                "end_secs": None,
+                "secs": 0.0,
+            }
+            if task_name in handles:
+                handle = handles[task_name]
+                row["job_name"] = handle.job_name
+                row["reused"] = (
+                    handle.description["CreationTime"].timestamp() < start_time
+                )
+            if task_name in times:
+                row["start_secs"], row["end_secs"] = times[task_name]
+                row["secs"] = row["end_secs"] - row["start_secs"]
+            results.append(row)
+        self._logSummary(results, time.time() - start_time)
+        return results
+
+    def _logSummary(self, results, total_secs):
+        durations = {x["task_name"]: x["secs"] for x in results}
+        path, path_secs = criticalPath(durations, self.dependencies)
+        lines = [
+            f"  {x['task_name']:<30} {x['status']:<12} "
+            + ("reused" if x["reused"] else f"{x['secs']:>8.0f} secs")
+            for x in results
+        ]
+        logger.info(
+            f"===== Pipeline was done in {total_secs:.0f} secs (vs. {sum(durations.values()):.0f} secs "
+            f"if run serially), {sum(x['status'] == 'Completed' for x in results)} of {len(results)} "
+            f"tasks completed =====\n"
+            + "\n".join(lines)
+            + f"\nCritical path ({path_secs:.0f} secs): {' -> '.join(path)}"
+        )
+
+    @staticmethod
+    def saveResults(results, output_path):
+        f"""Save the results table of :func:`run` to [output_path]/{constants.PIPELINE_RESULTS_FILE_NAME}"""
+        os.makedirs(output_path, exist_ok=True)
+        file_name = os.path.join(output_path, constants.PIPELINE_RESULTS_FILE_NAME)
+        with open(file_name, "wt", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+        logger.info(f"Pipeline results were saved to {file_name}")
@@ -1,18 +1,73 @@
+import json
 import logging
 import os
 import sys
+import threading
+import time
 from bisect import bisect_left
 from hashlib import md5
 from pathlib import Path
 
 import boto3
 
+from . import constants
+from .archives import CountingReader, GzipStreamReader, buildTarIndex, extractStream
+from .clients import getClient
+
 logger = logging.getLogger(__name__)
 
 
+class TransferProgress:
+    """Thread safe progress of concurrent transfers, logged periodically
+
+    :param log_interval: Minimal number of seconds between progress log lines, defaults to 5
+    :type log_interval: int, optional
+    """
+
+    def __init__(self, log_interval=5):
+        self.log_interval = log_interval
+        self.total_files = 0
+        self.total_bytes = 0
+        self.done_files = 0
+        self.done_bytes = 0
+        self.start_time = time.time()
+        self.last_log_time = self.start_time
+        self._lock = threading.Lock()
+
+    def addTotal(self, files, size):
+        with self._lock:
+            self.total_files += files
+            self.total_bytes += size
+
+    def __call__(self, bytes_amount):
+        """A boto3 transfer callback"""
+        with self._lock:
+            self.done_bytes += bytes_amount
+            now = time.time()
+            if now - self.last_log_time < self.log_interval:
+                return
+            self.last_log_time = now
+        logger.info(self.progressLine())
+
+    def fileDone(self):
+        with self._lock:
+            self.done_files += 1
+
+    def progressLine(self):
+        elapsed = time.time() - self.start_time
+        mb_per_sec = self.done_bytes / 2**20 / elapsed if elapsed else 0
+        return (
+            f"Transferred {self.done_files}/{self.total_files} files, "
+            f"{self.done_bytes / 2**20:.1f}/{self.total_bytes / 2**20:.1f} MB "
+            f"in {elapsed:.1f} secs ({mb_per_sec:.2f} MB/s)"
+        )
+
+
 class S3Sync:
-    def __init__(self, boto3_sessions):
-        self.s3_client = boto3_sessions.client("s3")
+    def __init__(self, boto3_sessions, max_pool_connections=None):
+        self.s3_client = getClient(
+            boto3_sessions, "s3", max_pool_connections=max_pool_connections
+        )
 
     def syncFolderToS3(self, source: str, dest: str, prefix: str) -> [str]:
         paths = self.listFolderFiles(source)
@@ -49,6 +104,157 @@ class S3Sync:
             else:
                 logger.info(f"Skipping {file_name}")
 
+    def downloadPrefix(
+        self, bucket, prefix, path, pool=None, progress=None, extra_args=None
+    ):
+        """Download all the files under a prefix (or a single file) to a local directory.
+
+        :param pool: An executor to download the files concurrently on, the files are downloaded
+            one by one if not given
+        :type pool: :class:`concurrent.futures.Executor`, optional
+        :param progress: Progress to be updated with the transfers
+        :type progress: :class:`TransferProgress`, optional
+
+        return: the local paths of the downloaded files
+        rtype: list
+        """
+        objects = [
+            x for x in self.listS3Bucket(bucket, prefix) if not x["Key"].endswith("/")
+        ]
+        if progress:
+            progress.addTotal(len(objects), sum(x["Size"] for x in objects))
+
+        def download(key):
+            # similar to sagemaker.Session.download_data: a prefix with an extension is a single file
+            if os.path.splitext(prefix)[1]:
+                file_name = os.path.join(path, os.path.basename(key))
+            else:
+                file_name = os.path.join(path, os.path.relpath(key, prefix))
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+            self.s3_client.download_file(
+                bucket, key, file_name, ExtraArgs=extra_args, Callback=progress
+            )
+            if progress:
+                progress.fileDone()
+            return file_name
+
+        if pool is None:
+            return [download(x["Key"]) for x in objects]
+        futures = [pool.submit(download, x["Key"]) for x in objects]
+        return [future.result() for future in futures]
+
+    def extractTarGz(
+        self, bucket, key, path, members=None, progress=None, extra_args=None
+    ):
+        """Extract a gzipped tar S3 object directly from its body stream, without writing
+        the archive to the disk.
+
+        :param members: Extract only members matching these paths / glob patterns,
+            defaults to None (all members)
+        :type members: list, optional
+        :param progress: Progress to be updated with the transfer
+        :type progress: :class:`TransferProgress`, optional
+
+        return: the names of the extracted members
+        rtype: list
+        """
+        response = self.s3_client.get_object(
+            Bucket=bucket, Key=key, **(extra_args or {})
+        )
+        if progress:
+            progress.addTotal(1, response["ContentLength"])
+        body = CountingReader(response["Body"], progress)
+        try:
+            extracted = extractStream(body, path, members)
+        finally:
+            response["Body"].close()
+        if progress:
+            progress.fileDone()
+        return extracted
+
+    @staticmethod
+    def getIndexKey(key):
+        """Get the key of the index sidecar object of an archive, e.g. "model.tar.index.json" for
+        "model.tar.gz". The archive key isn't a prefix of it, so listing or downloading the archive by its key
+        doesn't include the index (a listing of their common folder does)
+        """
+        return os.path.splitext(key)[0] + constants.ARCHIVE_INDEX_SUFFIX
+
+    def getTarIndex(self, bucket, key, rebuild=False):
+        """Get the member index of a (gzipped) tar S3 object, see :func:`archives.buildTarIndex`.
+        The index is built by a single streaming pass over the archive on first use, and cached in a
+        sidecar object next to it. A cached index is used only if it matches the archive's ETag.
+
+        :param rebuild: Whether to rebuild the index even if a cached one exists, defaults to False
+        :type rebuild: bool, optional
+        """
+        etag = self.s3_client.head_object(Bucket=bucket, Key=key)["ETag"]
+        index_key = S3Sync.getIndexKey(key)
+        if not rebuild:
+            try:
+                response = self.s3_client.get_object(Bucket=bucket, Key=index_key)
+                index = json.loads(response["Body"].read())
+                if index.get("etag") == etag:
+                    return index
+                logger.info(f"The index of s3://{bucket}/{key} is outdated")
+            except self.s3_client.exceptions.NoSuchKey:
+                pass
+
+        logger.info(f"Indexing s3://{bucket}/{key}...")
+        response = self.s3_client.get_object(Bucket=bucket, Key=key, IfMatch=etag)
+        try:
+            index = buildTarIndex(response["Body"], key.endswith("gz"))
+        finally:
+            response["Body"].close()
+        index["etag"] = etag
+        self.s3_client.put_object(
+            Bucket=bucket, Key=index_key, Body=json.dumps(index).encode("utf-8")
+        )
+        logger.info(f"Indexed {len(index['members'])} members of s3://{bucket}/{key}")
+        return index
+
+    def getTarMember(self, bucket, key, member, index=None):
+        """Get the content of a single member of a (gzipped) tar S3 object using a ranged GET,
+        based on its index (see :func:`getTarIndex`).
+
+        Note: a member of an uncompressed tar is read by its exact byte range. The index of a gzipped archive
+        has no restart points (see :func:`archives.buildTarIndex`), so a member read downloads and decompresses
+        the archive from its start up to the end of the member, i.e. only the rest of the archive is skipped
+
+        return: the member content
+        rtype: bytes
+        """
+        if index is None:
+            index = self.getTarIndex(bucket, key)
+        member = member[2:] if member.startswith("./") else member
+        assert (
+            member in index["members"]
+        ), f"{member} wasn't found in s3://{bucket}/{key}"
+        entry = index["members"][member]
+        if not index["compressed"]:
+            if not entry["size"]:
+                return b""
+            byte_range = (
+                f"bytes={entry['offset']}-{entry['offset'] + entry['size'] - 1}"
+            )
+            response = self.s3_client.get_object(
+                Bucket=bucket, Key=key, Range=byte_range, IfMatch=index["etag"]
+            )
+            return response["Body"].read()
+
+        byte_range = f"bytes=0-{entry['compressed_end'] - 1}"
+        response = self.s3_client.get_object(
+            Bucket=bucket, Key=key, Range=byte_range, IfMatch=index["etag"]
+        )
+        try:
+            reader = GzipStreamReader(response["Body"])
+            reader.skip(entry["offset"])
+            data = reader.read(entry["size"])
+        finally:
+            response["Body"].close()
+        assert len(data) == entry["size"], f"Failed to read {member}"
+        return data
+
     def listS3Bucket(self, bucket, prefix):
         res = []
         try:
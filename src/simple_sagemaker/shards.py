@@ -0,0 +1,129 @@
+import hashlib
+import heapq
+import json
+import logging
+
+import sagemaker
+from sagemaker.inputs import TrainingInput
+
+from . import constants
+from .clients import getClient
+
+logger = logging.getLogger(__name__)
+
+
+def planShards(sizes, num_shards):
+    """Split objects into `num_shards` groups of balanced total sizes, using the greedy LPT (longest
+    processing time) heuristic - the objects are assigned from the largest one to the smallest, each to the
+    currently smallest group.
+
+    :param sizes: Object sizes, as an {object key: size in bytes} mapping
+    :type sizes: dict
+    :param num_shards: Number of groups
+    :type num_shards: int
+
+    return: a list of `num_shards` lists of keys
+    rtype: list
+    """
+    assert num_shards > 0, f"Number of shards has to be positive, got {num_shards}"
+    shards = [list() for _ in range(num_shards)]
+    heap = [(0, i) for i in range(num_shards)]
+    for key in sorted(sizes, key=lambda x: (-sizes[x], x)):
+        load, i = heapq.heappop(heap)
+        shards[i].append(key)
+        heapq.heappush(heap, (load + sizes[key], i))
+    return [sorted(x) for x in shards]
+
+
+def imbalanceReport(sizes, shards):
+    """Get a human readable report of the number of objects and bytes in each shard, along with the
+    imbalance, i.e. the ratio between the largest shard and the mean shard size
+
+    return: the report lines
+    rtype: list
+    """
+    totals = [sum(sizes[x] for x in shard) for shard in shards]
+    mean = sum(totals) / len(totals) if totals else 0
+    lines = [
+        f"Shard {i}: {len(shard)} objects, {total / 2**20:.1f} MB"
+        for i, (shard, total) in enumerate(zip(shards, totals))
+    ]
+    imbalance = max(totals) / mean if mean else 1.0
+    lines.append(
+        f"Imbalance (max / mean shard size): {imbalance:.3f}, "
+        f"the largest shard is {(max(totals) - mean) / 2**20:.1f} MB above the mean"
+    )
+    return lines
+
+
+def getBalancedInputs(
+    boto3_session, channel_name, uri, num_shards, shards_uri, input_mode=None
+):
+    """Get the configuration of an input channel whose objects are split between the instances by size,
+    instead of by key (as done by ShardedByS3Key).
+
+    The objects under `uri` are split into `num_shards` balanced groups (see :func:`planShards`), and a
+    manifest (in the SageMaker ManifestFile format) is written for each one to
+    `[shards_uri]/[manifests hash]/shard-[i].manifest`, i.e. runs with other inputs or instance counts don't overwrite
+    the manifests of a running job.
+    As SageMaker uses the same channel configuration for all instances, the data channel is fully
+    replicated. The manifests are given as an additional `[channel_name]_shards` channel, each instance reads
+    only the objects of its own manifest, see :func:`worker_lib.getShardFiles`.
+
+    The split saves transfers only if the data is read lazily, i.e. in the FastFile mode (the default). In the File
+    mode every instance still downloads all the data before the job starts (a warning is logged), and the Pipe mode
+    isn't supported, as it streams all the data to every instance, with no files to read by the manifests.
+
+    return: a {channel name: :class:`sagemaker.inputs.TrainingInput`} mapping of the data and manifests channels
+    rtype: dict
+    """
+    input_mode = input_mode or "FastFile"
+    assert (
+        input_mode != "Pipe"
+    ), f"{channel_name} can't be split by size in the Pipe input mode, use FastFile instead"
+    if input_mode != "FastFile":
+        logger.warning(
+            f"{channel_name} is split by size in the {input_mode} input mode, every instance downloads all "
+            "of its data. Use the FastFile mode to read only the files of each instance"
+        )
+    bucket, prefix = sagemaker.s3.parse_s3_url(uri)
+    prefix = prefix.rstrip("/") + "/" if prefix else ""
+    s3_client = getClient(boto3_session, "s3")
+    sizes = dict()
+    for page in s3_client.get_paginator("list_objects_v2").paginate(
+        Bucket=bucket, Prefix=prefix
+    ):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith("/"):
+                sizes[obj["Key"][len(prefix) :]] = obj["Size"]
+    assert sizes, f"No input objects were found under {uri}"
+
+    shards = planShards(sizes, num_shards)
+    report = imbalanceReport(sizes, shards)
+    logger.info(
+        f"Split {len(sizes)} objects of {uri} into {num_shards} shards:\n"
+        + "\n".join(report)
+    )
+
+    manifests = [
+        json.dumps([{"prefix": f"s3://{bucket}/{prefix}"}] + shard).encode("utf-8")
+        for shard in shards
+    ]
+    manifests_hash = hashlib.sha256(b"\0".join(manifests)).hexdigest()[:16]
+    shards_uri = sagemaker.s3.s3_path_join(shards_uri, manifests_hash)
+    shards_bucket, shards_prefix = sagemaker.s3.parse_s3_url(shards_uri)
+    for i, manifest in enumerate(manifests):
+        s3_client.put_object(
+            Bucket=shards_bucket,
+            Key=f"{shards_prefix}/{constants.SHARD_MANIFEST_NAME.format(i)}",
+            Body=manifest,
+        )
+
+    return {
+        channel_name: TrainingInput(
+            uri, distribution="FullyReplicated", input_mode=input_mode
+        ),
+        f"{channel_name}_shards": TrainingInput(
+            shards_uri, distribution="FullyReplicated"
+        ),
+    }
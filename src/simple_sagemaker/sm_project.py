@@ -1,11 +1,23 @@
 import collections
+import csv
+import itertools
 import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
 import sagemaker
 
 from . import constants, iam_utils
+from .clients import getClient, getSageMakerSession
 from .ecr_sync import ECRSync
+from .fingerprint import getTaskFingerprint
+from .job_handle import JobHandle, JobPoller
+from .pipeline import Pipeline
+from .shards import getBalancedInputs
 from .sm_task import SageMakerTask
 
 logger = logging.getLogger(__name__)
@@ -79,6 +91,9 @@ class SageMakerProject:
         self.local_mode = local_mode
         self.prefix = prefix or ""
         self.defaultCodeParams = None
+        # (base image uri, image params) -> image uri, see :func:`buildOrGetImage`
+        self.images = dict()
+        self.jobPoller = None
 
         if boto3_session is None:
             boto3_session = boto3.Session()
@@ -91,7 +106,7 @@ class SageMakerProject:
                 smSession = LocalSession(boto_session=boto3_session)
                 # smSession.config = {'local': {'local_code': True}}
             else:
-                smSession = sagemaker.Session(boto_session=boto3_session)
+                smSession = getSageMakerSession(boto3_session)
 
         self.smSession = smSession
 
@@ -203,7 +218,7 @@ class SageMakerProject:
         )
 
     def createBucket(self):
-        client = self.boto3_session.client("s3")
+        client = getClient(self.boto3_session, "s3")
 
         if "us-east-1" != self.boto3_session.region_name:
             location = {"LocationConstraint": self.boto3_session.region_name}
@@ -242,9 +257,25 @@ class SageMakerProject:
         assert task_name not in self.tasks, f"{task_name} already exists!"
         self.tasks[task_name] = smTask
 
+    def _getImageKey(self, instance_type, args):
+        # Images are built on top of a base image which depends on the instance type (e.g. CPU vs GPU),
+        #   instance types sharing the same base image also share the built image
+        baseimage_uri = ECRSync(self.boto3_session).getPrebuiltImage(
+            instance_type, args.framework, args.framework_version, args.py_version
+        )
+        return (baseimage_uri, args)
+
+    def _buildImage(self, instance_type, args):
+        dockerSync = ECRSync(self.boto3_session)
+        image_uri = dockerSync.buildAndPushDockerImage(
+            instance_type=instance_type, **(args._asdict())
+        )
+        return image_uri
+
     def buildOrGetImage(self, instance_type, **kwargs):
         """Get the image URI, according to the image params. If a custom image is used, i.e. when `docker_file_path_or_content` was
-        given, it's first built and pushed to ECS.
+        given, it's first built and pushed to ECS. Images that were already built by this project,
+        e.g. by :func:`prebuildImages`, are reused.
 
         :param instance_type: The EC2 instance type that is going to run that image
         :type instance_type: str
@@ -256,11 +287,66 @@ class SageMakerProject:
         rtype: str
         """
         args = self.defaultImageParams._replace(**kwargs)
-        dockerSync = ECRSync(self.boto3_session)
-        image_uri = dockerSync.buildAndPushDockerImage(
-            instance_type=instance_type, **(args._asdict())
-        )
-        return image_uri
+        key = self._getImageKey(instance_type, args)
+        if key not in self.images:
+            self.images[key] = self._buildImage(instance_type, args)
+        else:
+            logger.debug(f"Using the already built image for {instance_type}")
+        return self.images[key]
+
+    def prebuildImages(self, instance_types, max_workers=None, **kwargs):
+        """Concurrently build (or get) the images for all the given instance types, up front.
+        Instance types sharing the same base image are built once. Following calls to :func:`buildOrGetImage`
+        (and :func:`runTask` without an `image_uri`) reuse the built images.
+
+        :param instance_types: The EC2 instance types that are going to be used
+        :type instance_types: list of str
+        :param max_workers: Maximal number of concurrent builds, defaults to the number of needed images
+        :type max_workers: int, optional
+
+        :Keyword Arguments:
+            Paramaters to overwrite the default image params.
+
+        return: a mapping from instance type to image URI
+        rtype: dict
+        """
+        args = self.defaultImageParams._replace(**kwargs)
+        keys = {
+            instance_type: self._getImageKey(instance_type, args)
+            for instance_type in instance_types
+        }
+        # deduplicate identical builds
+        pending = dict()
+        for instance_type, key in keys.items():
+            if key not in self.images and key not in pending:
+                pending[key] = instance_type
+
+        if pending:
+            logger.info(
+                f"Building {len(pending)} image(s) for {list(pending.values())}..."
+            )
+            # different base images are tagged differently, to avoid overwriting one another
+            tag_variants = args.docker_file_path_or_content and (
+                len({key[0] for key in keys.values()}) > 1
+            )
+            with ThreadPoolExecutor(
+                max_workers=max_workers or len(pending)
+            ) as executor:
+                futures = dict()
+                for key, instance_type in pending.items():
+                    build_args = args
+                    if tag_variants:
+                        base_tag = key[0].rsplit(":", 1)[-1]
+                        build_args = args._replace(
+                            image_tag=f"{args.image_tag}-{base_tag}"
+                        )
+                    futures[key] = executor.submit(
+                        self._buildImage, instance_type, build_args
+                    )
+                for key, future in futures.items():
+                    self.images[key] = future.result()
+
+        return {instance_type: self.images[key] for instance_type, key in keys.items()}
 
     def runTask(
         self,
@@ -274,13 +360,18 @@ class SageMakerProject:
         metric_definitions=dict(),
         enable_sagemaker_metrics=False,
         task_type=constants.TASK_TYPE_TRAINING,
+        wait=True,
         **kwargs,
     ):
         """Run a new task for this project.
+        The task isn't run again if it was already completed with the same fingerprint, i.e. the same code, image,
+        hyperparameters, instance configuration, inputs content and outputs (see :func:`fingerprint.getTaskFingerprint`),
+        the completed job is used instead. The fingerprint is kept in the job tags.
 
         :param task_name: Name for the task
         :type task_name: str
-        :param image_uri: The URI of the image to be used for that task, usually the output of :func:`buildOrGetImage`
+        :param image_uri: The URI of the image to be used for that task, usually the output of :func:`buildOrGetImage`.
+            If None, the image is taken from :func:`buildOrGetImage` for the task instance type
         :type image_uri: str
         :param hyperparameters: Hyperparameters for this tasks
         :type hyperparameters: dict
@@ -291,8 +382,8 @@ class SageMakerProject:
             it will be running again if set, otherwise its current output will be taken without running it again.,
             defaults to False
         :type clean_state: bool, optional
-        :param force_running: Whether to force running the task even if it was already completed (but without
-            clearing the current state), defaults to False
+        :param force_running: Whether to force running the task even if it was already completed with the same
+            fingerprint (but without clearing the current state), defaults to False
         :type force_running: bool, optional
         :param force_running: Tags to be attached to the jobs executed for this task, e.g. {"TagName": "TagValue"}.
         :type force_running: dict, optional
@@ -302,18 +393,33 @@ class SageMakerProject:
         :type metric_definitions: dict, optional
         :param enable_sagemaker_metrics: Enables SageMaker Metrics Time Series, defaults
         :type enable_sagemaker_metrics: bool, optional
+        :param wait: Whether to wait for the task to be completed, otherwise return right after its job was
+            created. See :func:`submitTask`, defaults to True
+        :type wait: bool, optional
 
         :Keyword Arguments:
             Paramaters to overwrite the default code or instance params.
             :param distribution: Tensorflows' distribution policy, see
                 https://sagemaker.readthedocs.io/en/stable/frameworks/tensorflow/using_tf.html#distributed-training.
             :type distribution: dict
+            :param input_distribution: The input data distribution, either ShardedByS3Key, FullyReplicated or
+                ShardedBySize (split by size between the instances, training tasks only, see
+                :func:`shards.getBalancedInputs`)
+            :type input_distribution: str
+            :param input_mode: The input data channel mode - File (downloaded before the job starts), FastFile
+                (mounted and read lazily, training tasks only) or Pipe (streamed to a FIFO, see
+                :func:`worker_lib.readPipe`). Defaults to None (File)
+            :type input_mode: str
 
         return: the image URI
         rtype: str
         """
         self.createIAMRole()
         assert task_name not in self.tasks, f"{task_name} already exists!"
+        if image_uri is None:
+            image_uri = self.buildOrGetImage(
+                kwargs.get("instance_type", self.defaultInstanceParams.instance_type)
+            )
         smTask = SageMakerTask(
             self.boto3_session,
             task_name,
@@ -326,9 +432,13 @@ class SageMakerProject:
         )
         if input_data_path:
             smTask.uploadOrSetInputData(input_data_path)
-        args = (
-            dict() if not self.defaultCodeParams else self.defaultCodeParams._asdict()
-        )
+        args = dict()
+        if task_type == constants.TASK_TYPE_TRAINING:
+            # the code params are given to training jobs even if no defaults were set, e.g. by a pipeline
+            code_params = self.defaultCodeParams or SageMakerProject.CodeParams(
+                None, None, list()
+            )
+            args.update(code_params._asdict())
         args.update(self.defaultInstanceParams._asdict())
 
         args.update(kwargs)
@@ -341,23 +451,31 @@ class SageMakerProject:
         if clean_state:
             smTask.clean_state()
 
+        image_id = ECRSync(self.boto3_session).getImageDigest(image_uri) or image_uri
+        fingerprint = getTaskFingerprint(
+            self.boto3_session,
+            task_type,
+            image_id,
+            hyperparameters,
+            args,
+            smTask.inputS3Uri,
+        )
+        tags[constants.FINGERPRINT_TAG_NAME] = fingerprint
+
         job_name = None
-        if not force_running:
-            job_name_last, task_type_last, status = SageMakerTask.getLastJob(
+        if not force_running and not clean_state:
+            job_name = SageMakerTask.getJobByFingerprint(
                 self.boto3_session,
                 self.project_name,
                 task_name,
                 task_type,
+                fingerprint,
             )
-            if job_name_last and status == "Completed":
-                assert (
-                    task_type == task_type_last
-                ), f"Mismatch task {task_name} type (new {task_type} vs. old {task_type_last}) - {job_name, status}"
-                job_name = job_name_last
 
         if job_name:
             logger.info(
-                f"===== Task {task_name} is already completed by {job_name} ====="
+                f"===== Task {task_name} is already completed by {job_name}, with the same fingerprint "
+                f"{fingerprint} ====="
             )
             smTask.bindToLastJob(job_name, task_type)
         else:
@@ -369,6 +487,7 @@ class SageMakerProject:
                     tags=tags,
                     metric_definitions=metric_definitions,
                     enable_sagemaker_metrics=enable_sagemaker_metrics,
+                    wait=wait,
                     **args,
                 )
             elif task_type == constants.TASK_TYPE_PROCESSING:
@@ -377,15 +496,223 @@ class SageMakerProject:
                 job_name = smTask.runProcessing(
                     role_name=self.role_name,
                     tags=tags,
+                    wait=wait,
                     **args,
                 )
 
         self.addTask(task_name, smTask)
         return smTask, job_name
 
+    def submitTask(self, task_name, image_uri, hyperparameters, **kwargs):
+        """Submit a new task for this project, without waiting for it to be completed.
+        Accepts the same arguments as :func:`runTask`. Many tasks can be submitted this way, and joined later
+        using the returned handles (e.g. by :func:`waitTasks`).
+
+        return: a handle to the task job
+        rtype: :class:`JobHandle`
+        """
+        smTask, job_name = self.runTask(
+            task_name, image_uri, hyperparameters, wait=False, **kwargs
+        )
+        submitted = job_name in smTask.handles
+        handle = smTask.getJobHandle()
+        if not submitted:
+            # an already completed job, which is too old to be found by the poller
+            handle.refresh()
+        self.getJobPoller().add(handle)
+        return handle
+
+    def getJobPoller(self):
+        """Get the poller tracking the status of all the jobs submitted by :func:`submitTask`
+
+        return: the poller
+        rtype: :class:`JobPoller`
+        """
+        if self.jobPoller is None:
+            self.jobPoller = JobPoller(getClient(self.boto3_session, "sagemaker"))
+        return self.jobPoller
+
+    def waitTasks(self, task_names=None, timeout=None):
+        """Wait for the last job of the given tasks of this project
+
+        :param task_names: The names of the tasks to wait for, defaults to all the tasks
+        :type task_names: list of str, optional
+        :param timeout: Maximal number of seconds to wait, defaults to wait forever
+        :type timeout: float, optional
+
+        return: a mapping from job name to its status
+        rtype: dict
+        """
+        if task_names is None:
+            task_names = self.tasks.keys()
+        handles = [self.tasks[task_name].getJobHandle() for task_name in task_names]
+        return JobHandle.waitAll(handles, timeout)
+
+    def sweep(
+        self,
+        task_name_template,
+        trials,
+        image_uri=None,
+        hyperparameters=None,
+        max_concurrent=constants.DEFAULT_SWEEP_MAX_CONCURRENT,
+        output_path=None,
+        **kwargs,
+    ):
+        f"""Run a hyperparameter sweep - a training task per trial, with up to `max_concurrent` running jobs
+        at a time. The image, code and input data are resolved once and shared by all the trials (a local
+        `input_data_path` is uploaded to the input of the first trial), the jobs are tracked
+        by a single poller (see :func:`getJobPoller`), and a new job is submitted as soon as a running one is
+        done. As with :func:`runTask`, trials that were already completed aren't run again.
+
+        :param task_name_template: The trials task names template, formatted with the trial index (`i`) and
+            its parameters, e.g. "lr-sweep-{{i}}". The index is appended if the template has no fields
+        :type task_name_template: str
+        :param trials: Either a grid, as a {{hyperparameter: list of values}} mapping whose product is
+            taken, or a list of trials (e.g. random samples), each a {{hyperparameter: value}} mapping
+        :type trials: dict or list
+        :param image_uri: The image URI, defaults to None (resolved by :func:`buildOrGetImage`)
+        :type image_uri: str, optional
+        :param hyperparameters: Hyperparameters shared by all the trials, defaults to None
+        :type hyperparameters: dict, optional
+        :param max_concurrent: Maximal number of concurrently running jobs,
+            defaults to {constants.DEFAULT_SWEEP_MAX_CONCURRENT}
+        :type max_concurrent: int, optional
+        :param output_path: A local directory to save the results table to (as
+            {constants.SWEEP_RESULTS_FILE_NAME}), defaults to None
+        :type output_path: str, optional
+
+        :Keyword Arguments:
+            Additional :func:`runTask` arguments, shared by all the trials
+
+        return: the results table, a row per trial with its task name, job name, status, parameters and
+            final metrics (see the `metric_definitions` param of :func:`runTask`)
+        rtype: list of dict
+        """
+        assert (
+            kwargs.get("task_type", constants.TASK_TYPE_TRAINING)
+            == constants.TASK_TYPE_TRAINING
+        ), "Only training tasks can be swept"
+        if isinstance(trials, dict):
+            names = list(trials.keys())
+            trials = [
+                dict(zip(names, values))
+                for values in itertools.product(*trials.values())
+            ]
+        if "{" not in task_name_template:
+            task_name_template += "-{i}"
+        task_names = [
+            re.sub(r"[^a-zA-Z0-9-]", "-", task_name_template.format(i=i, **params))
+            for i, params in enumerate(trials)
+        ]
+        assert len(set(task_names)) == len(
+            task_names
+        ), f"Task names of the trials have to be unique, got {task_names}"
+        if image_uri is None:
+            image_uri = self.buildOrGetImage(
+                kwargs.get("instance_type", self.defaultInstanceParams.instance_type)
+            )
+        input_data_path = kwargs.get("input_data_path")
+        if input_data_path and not input_data_path.lower().startswith("s3://"):
+            smTask = SageMakerTask(
+                self.boto3_session,
+                task_names[0],
+                image_uri,
+                self.prefix + self.project_name,
+                self.bucket_name,
+                smSession=self.smSession,
+                local_mode=self.local_mode,
+            )
+            smTask.uploadOrSetInputData(input_data_path)
+            kwargs["input_data_path"] = smTask.inputS3Uri
+        tags = kwargs.pop("tags", dict())
+
+        logger.info(
+            f"===== Sweeping {len(trials)} trials, up to {max_concurrent} concurrently ====="
+        )
+        start_time = time.time()
+        slots = threading.Semaphore(max_concurrent)
+        handles = dict()
+        for task_name, params in zip(task_names, trials):
+            slots.acquire()
+            try:
+                handle = self.submitTask(
+                    task_name,
+                    image_uri,
+                    {**(hyperparameters or dict()), **params},
+                    tags=dict(tags),
+                    **kwargs,
+                )
+            except:  # noqa: E722
+                logger.error(f"Failed to submit the trial {task_name}", exc_info=True)
+                slots.release()
+                continue
+            handle.addDoneCallback(lambda _: slots.release())
+            handles[task_name] = handle
+
+        results = list()
+        for task_name, params in zip(task_names, trials):
+            row = {"task_name": task_name, "job_name": None, "status": "NotSubmitted"}
+            row.update(params)
+            if task_name in handles:
+                handle = handles[task_name]
+                row["job_name"] = handle.job_name
+                row["status"] = handle.wait()
+                for metric in handle.description.get("FinalMetricDataList", []):
+                    row[metric["MetricName"]] = metric["Value"]
+            results.append(row)
+        logger.info(
+            f"===== Sweep of {len(trials)} trials was done in {time.time() - start_time:.0f} secs, "
+            f"{sum(x['status'] == 'Completed' for x in results)} completed ====="
+        )
+
+        if output_path:
+            os.makedirs(output_path, exist_ok=True)
+            file_name = os.path.join(output_path, constants.SWEEP_RESULTS_FILE_NAME)
+            fields = list(dict.fromkeys(k for row in results for k in row))
+            with open(file_name, "wt", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(results)
+            logger.info(f"Sweep results were saved to {file_name}")
+        return results
+
+    def runPipeline(
+        self,
+        tasks,
+        max_concurrent=constants.DEFAULT_PIPELINE_MAX_CONCURRENT,
+        output_path=None,
+    ):
+        f"""Run a pipeline of tasks, i.e. a DAG derived from the tasks inputs that are outputs of other tasks.
+        Ready tasks (whose input tasks are completed) are run concurrently, with up to `max_concurrent`
+        running jobs at a time, see :class:`pipeline.Pipeline`. As with :func:`runTask`, tasks that were
+        already completed aren't run again. The critical path, i.e. the chain of dependent tasks that bounds
+        the pipeline duration, is logged once it's done.
+
+        :param tasks: The pipeline tasks, as a {{task name: :func:`runTask` arguments}} mapping. The inputs of
+            a task that are outputs of other tasks are given by an `input_tasks` list, each either a
+            [name, task name, output type, [distribution, [subdir, [input mode]]]] list (as the `--input_task`
+            CLI argument) or a mapping with these fields (see :func:`pipeline.parseInputEdge`)
+        :type tasks: dict
+        :param max_concurrent: Maximal number of concurrently running jobs,
+            defaults to {constants.DEFAULT_PIPELINE_MAX_CONCURRENT}
+        :type max_concurrent: int, optional
+        :param output_path: A local directory to save the results table to (as
+            {constants.PIPELINE_RESULTS_FILE_NAME}), defaults to None
+        :type output_path: str, optional
+
+        return: the results table, a row per task with its job name, status, whether it was reused and its
+            timing
+        rtype: list of dict
+        """
+        pipeline = Pipeline(self, tasks, max_concurrent)
+        results = pipeline.run()
+        if output_path:
+            Pipeline.saveResults(results, output_path)
+        return results
+
     def cleanFolder(self):
         """Clean the project folder on the S3 bucket"""
-        s3c = self.boto3_session.client("s3")
+        s3c = getClient(self.boto3_session, "s3")
         for file in self.smSession.list_s3_files(
             self.bucket_name, self.prefix + self.project_name
         ):
@@ -403,7 +730,7 @@ class SageMakerProject:
         )
         return smTask.clean_state()
 
-    def _getOrBindTask(self, task_name):
+    def _getOrBindTask(self, task_name, completed=True):
         if task_name in self.tasks:
             smTask = self.tasks[task_name]
         else:
@@ -418,8 +745,9 @@ class SageMakerProject:
             job_name, task_type, status = SageMakerTask.getLastJob(
                 self.boto3_session, self.project_name, task_name
             )
+            assert job_name, f"Task {task_name} doesn't have any job!"
             assert (
-                status == "Completed"
+                not completed or status == "Completed"
             ), f"Task {task_name} isn't completed but job {job_name} is {status}!"
             smTask.bindToLastJob(job_name, task_type)
             # self.tasks[task_name] = smTask
@@ -432,6 +760,7 @@ class SageMakerProject:
         distribution="FullyReplicated",
         subdir="",
         return_s3uri=False,
+        input_mode=None,
     ):
         """Get the class:`sagemaker.inputs.TrainingInput` configuration for an output of a task from this
         project to be used as an input for another task.
@@ -442,6 +771,8 @@ class SageMakerProject:
         :type task_name: str
         :param distribution: Either ShardedByS3Key or FullyReplicated, defaults to FullyReplicated
         :type task_name: str
+        :param input_mode: The channel input mode, one of File, FastFile or Pipe, defaults to None (File)
+        :type input_mode: str, optional
         """
         # state is global for the task
         if "state" == output_type:
@@ -456,7 +787,47 @@ class SageMakerProject:
         else:
             smTask = self._getOrBindTask(task_name)
         return smTask.getInputConfig(
-            output_type, distribution, subdir, return_s3uri=return_s3uri
+            output_type,
+            distribution,
+            subdir,
+            return_s3uri=return_s3uri,
+            input_mode=input_mode,
+        )
+
+    def getBalancedInputConfig(
+        self, task_name, input_name, s3_uri, instance_count, input_mode=None
+    ):
+        """Get the configuration of an additional input of a task, whose objects are split by size between
+        the task instances. See :func:`shards.getBalancedInputs`.
+
+        :param task_name: The name of the task the input is for
+        :type task_name: str
+        :param input_name: The input channel name
+        :type input_name: str
+        :param s3_uri: The input data S3 URI
+        :type s3_uri: str
+        :param instance_count: Number of instances of the task
+        :type instance_count: int
+        :param input_mode: The input channel mode, defaults to None (FastFile)
+        :type input_mode: str, optional
+
+        return: the input channels, to be added to the task `additional_inputs`
+        rtype: dict
+        """
+        shards_uri = sagemaker.s3.s3_path_join(
+            SageMakerTask.getBaseTaskS3Uri(
+                self.bucket_name, self.prefix + self.project_name, task_name
+            ),
+            "shards",
+            input_name,
+        )
+        return getBalancedInputs(
+            self.boto3_session,
+            input_name,
+            s3_uri,
+            instance_count,
+            shards_uri,
+            input_mode,
         )
 
     def downloadResults(
@@ -468,8 +839,13 @@ class SageMakerProject:
         model=True,
         output=True,
         source=False,
+        members=None,
+        extract_archives=False,
+        extract_workers=None,
+        utilization=True,
     ):
-        """Download the result of a task to a local directory
+        f"""Download the result of a task to a local directory. The model and output archives are
+        extracted while being downloaded.
 
         :param task_name: The name of the task whose output is needed
         :type task_name: str
@@ -485,6 +861,19 @@ class SageMakerProject:
         :type output: str, optional
         :param source: Whether source should be downloaded, defaults to False
         :type task_name: str, optional
+        :param members: Extract only these paths / glob patterns (e.g. "metrics.json", "checkpoints"
+            or "*.json") from the model and output archives, defaults to None (everything)
+        :type members: list, optional
+        :param extract_archives: Whether to extract the .tar.gz archives inside the downloaded output and
+            state directories (e.g. written by a processing task), in parallel, defaults to False
+        :type extract_archives: bool, optional
+        :param extract_workers: Maximal number of archives to extract concurrently, defaults to None
+            (number of cores)
+        :type extract_workers: int, optional
+        :param utilization: Whether to save the per-host resource utilization metrics (as
+            {constants.UTILIZATION_FILE_NAME}) and their summary (as {constants.UTILIZATION_SUMMARY_FILE_NAME}),
+            see :func:`getUtilization`, defaults to True
+        :type utilization: bool, optional
         """
         smTask = self._getOrBindTask(task_name)
         return smTask.downloadResults(
@@ -494,4 +883,83 @@ class SageMakerProject:
             model=model,
             output=output,
             source=source,
+            members=members,
+            extractAllTars=extract_archives,
+            extract_workers=extract_workers,
+            utilization=utilization,
         )
+
+    def getResultMember(self, task_name, member, archive="model"):
+        """Get the content of a single file from the model / output archive of a task, e.g.
+        "metrics.json", without downloading the archive past that file. An index of the archive members is
+        built on first use, and cached in S3 next to the archive.
+
+        :param task_name: The name of the task
+        :type task_name: str
+        :param member: The path of the file inside the archive
+        :type member: str
+        :param archive: The archive to get the file from, "model" or "output", defaults to "model"
+        :type archive: str, optional
+
+        return: the file content
+        rtype: bytes
+        """
+        assert archive in ("model", "output"), f"Unknown archive {archive}"
+        smTask = self._getOrBindTask(task_name)
+        return smTask.getArchiveMember(member, archive)
+
+    def getTimeline(self, task_name):
+        """Get the per-phase timeline of the last job of a task, i.e. how much time went to waiting for capacity,
+        launching the instances, downloading the data, training / processing and uploading the artifacts.
+        See :func:`timeline.getJobTimeline`.
+
+        :param task_name: The task name
+        :type task_name: str
+
+        return: the timeline
+        rtype: dict
+        """
+        # the timeline of a failed / running job is just as interesting
+        smTask = self._getOrBindTask(task_name, completed=False)
+        return smTask.getTimeline()
+
+    def getUtilization(self, task_name):
+        """Get the per-host resource utilization metrics (CPU, memory, disk, GPU and GPU memory) of the last job
+        of a task, e.g. to right-size its instances. See :func:`utilization.getUtilization`.
+
+        :param task_name: The task name
+        :type task_name: str
+
+        return: a row per host and timestamp
+        rtype: list of dict
+        """
+        smTask = self._getOrBindTask(task_name, completed=False)
+        return smTask.getUtilization()
+
+    def downloadLogs(self, task_name, output_base=None, follow=False, merged=False):
+        """Download the logs of the last job of a task (which doesn't have to be completed) to
+        `[output_base]/logs`. Only new log events are fetched if the logs were already downloaded there.
+
+        :param task_name: The name of the task whose logs are needed
+        :type task_name: str
+        :param output_base: the output directory path, has to be given unless `merged` is set
+        :type output_base: str, optional
+        :param follow: Whether to keep tailing the logs (and printing them) until the job is done,
+            defaults to False
+        :type follow: bool, optional
+        :param merged: Whether to write the logs of all instances, merged and ordered by time, into a single
+            `[output_base]/logs_merged` file (or to stdout if `output_base` isn't given) instead, defaults to False
+        :type merged: bool, optional
+        """
+        assert not (follow and merged), "Merged logs can't be followed"
+        assert output_base or merged, "output_base has to be given"
+        smTask = self._getOrBindTask(task_name, completed=False)
+        if merged:
+            if output_base:
+                os.makedirs(output_base, exist_ok=True)
+                return smTask.writeMergedLogs(os.path.join(output_base, "logs_merged"))
+            return smTask.writeMergedLogs()
+        logs_path = os.path.join(output_base, "logs")
+        if follow:
+            return smTask.followLogs(logs_path)
+        return smTask.downloadLogs(logs_path)
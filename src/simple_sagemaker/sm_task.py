@@ -1,11 +1,16 @@
+import json
 import logging
 import os
 import random
 import string
-import tarfile
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from time import gmtime, strftime
 
 import sagemaker
+from botocore.exceptions import ClientError
 from sagemaker.debugger import TensorBoardOutputConfig
 from sagemaker.inputs import TrainingInput
 from sagemaker.processing import (
@@ -18,7 +23,16 @@ from sagemaker.pytorch.estimator import PyTorch
 from sagemaker.tensorflow.estimator import TensorFlow
 
 from . import VERSION, constants
-from .s3_sync import S3Sync
+from .archives import extractFiles
+from .clients import getClient, getRegistry, getSageMakerSession
+from .code_artifacts import CodeArtifacts
+from .job_handle import JobHandle
+from .job_index import JobIndex
+from .logs_fetcher import LogsFetcher
+from .s3_sync import S3Sync, TransferProgress
+from .shards import getBalancedInputs
+from .timeline import getJobTimeline
+from .utilization import getUtilization, saveUtilization, summarizeUtilization
 
 logger = logging.getLogger(__name__)
 
@@ -52,18 +66,19 @@ class SageMakerTask:
         Data is maintained on [bucket_name]/[task_name]
         """
         self.boto3_session = boto3_session
-        self.sm_client = boto3_session.client("sagemaker")
+        self.sm_client = getClient(boto3_session, "sagemaker")
         self.task_name = task_name
         self.image_uri = image_uri
         self.estimators = list()
         self.jobNames = list()
         self.descriptions = list()
+        self.handles = dict()
         self.local_mode = local_mode
         self.task_type = task_type
         self.prefix = prefix
 
         if smSession is None:
-            smSession = sagemaker.Session(boto_session=boto3_session)
+            smSession = getSageMakerSession(boto3_session)
         self.smSession = smSession
 
         if not bucket_name:
@@ -81,6 +96,10 @@ class SageMakerTask:
             )
             self.stateLocalPath = constants.LOCAL_STATE_PATH
         self.inputS3Uri = None
+        # code artifacts are shared by all the tasks of the project
+        self.codeS3Uri = sagemaker.s3.s3_path_join(
+            "s3://", bucket_name, prefix, constants.CODE_ARTIFACTS_DIR
+        )
 
         self.internalDependencies = [
             os.path.abspath(os.path.join(os.path.split(__file__)[0], "worker_toolkit"))
@@ -118,7 +137,9 @@ class SageMakerTask:
         max_run_mins=constants.DEFAULT_MAX_RUN,
         tags=dict(),
         input_distribution="FullyReplicated",
+        input_mode=None,
         dependencies=list(),
+        wait=True,
     ):
         logger.info(
             f"===== Running a processing job {self.task_name} entrypoint={entrypoint} "
@@ -163,14 +184,20 @@ class SageMakerTask:
         # dependencies
 
         # append the internal dependencies
-        dependencies.extend(self.internalDependencies)
+        dependencies = dependencies + self.internalDependencies
+        codeArtifacts = None
+        if not self.local_mode:
+            # upload the dependencies and code only once, by their content
+            codeArtifacts = CodeArtifacts(self.boto3_session, self.codeS3Uri)
+            if code and not code.lower().startswith("s3://"):
+                code = codeArtifacts.getPathUri(code)
         for dep in dependencies:
             dep = os.path.abspath(dep)
             basename = os.path.basename(dep)
             local_path = f"/opt/ml/processing/input/code/{basename}"
             inputs.append(
                 ProcessingInput(
-                    dep,
+                    codeArtifacts.getPathUri(dep) if codeArtifacts else dep,
                     local_path,
                     "DEP_" + basename,
                     s3_data_distribution_type="FullyReplicated",
@@ -179,6 +206,12 @@ class SageMakerTask:
 
         # input data
         if self.inputS3Uri:
+            assert (
+                input_mode != "FastFile"
+            ), "The FastFile input mode isn't supported by processing jobs"
+            assert (
+                input_distribution != constants.INPUT_DISTRIBUTION_BY_SIZE
+            ), f"The {constants.INPUT_DISTRIBUTION_BY_SIZE} distribution isn't supported by processing jobs"
             data_path = "/opt/ml/processing/data"
             inputs.append(
                 ProcessingInput(
@@ -186,12 +219,15 @@ class SageMakerTask:
                     data_path,
                     "data",
                     s3_data_distribution_type=input_distribution,
+                    s3_input_mode=input_mode or "File",
                 )
             )
             env["SM_CHANNEL_DATA"] = data_path
 
         tags["SimpleSagemakerTask"] = self.task_name
         tags["SimpleSagemakerVersion"] = VERSION
+        project_name = tags.get("SimpleSagemakerProject")
+        fingerprint = tags.get(constants.FINGERPRINT_TAG_NAME)
         tags = [{"Key": k, "Value": v} for k, v in tags.items()]
 
         additional_args = dict()
@@ -217,32 +253,28 @@ class SageMakerTask:
             env=env,
             **additional_args,
         )
-        if code:
-            processor.run(
-                code=code,
-                inputs=inputs,
-                outputs=outputs,
-                arguments=arguments,
-                job_name=job_name,
-            )
-        else:
-            processor.run(
-                inputs=inputs,
-                outputs=outputs,
-                arguments=arguments,
-                job_name=job_name,
-            )
-
-        proecessing_job_description = self.smSession.describe_processing_job(job_name)
+        run_args = {"code": code} if code else dict()
+        job_index = self._indexJob(
+            job_name, constants.TASK_TYPE_PROCESSING, project_name, fingerprint
+        )
+        processor.run(
+            inputs=inputs,
+            outputs=outputs,
+            arguments=arguments,
+            job_name=job_name,
+            wait=wait,
+            logs=wait,
+            **run_args,
+        )
 
         self.estimators.append(processor)
         self.jobNames.append(job_name)
-        self.descriptions.append(proecessing_job_description)
-        # print(proecessing_job_description)
-        # if "Completed" != proecessing_job_description["TrainingJobStatus"]:
-        #    logger.error(
-        #        f"Task failed with status: {proecessing_job_description['TrainingJobStatus']}"
-        #    )
+        self._addJobHandle(
+            job_name,
+            constants.TASK_TYPE_PROCESSING,
+            wait,
+            job_index,
+        )
         return job_name
 
     def runTrainingJob(
@@ -263,8 +295,11 @@ class SageMakerTask:
         max_run_mins=constants.DEFAULT_MAX_RUN,
         tags=dict(),
         input_distribution="FullyReplicated",
+        input_mode=None,
         metric_definitions=dict(),
         enable_sagemaker_metrics=False,
+        wait=True,
+        code_delta=False,
         **additionalEstimatorArgs,
     ):
         """
@@ -278,7 +313,15 @@ class SageMakerTask:
             instance_type -
             instance_count -
             model_uri - local/s3
+            input_distribution - either ShardedByS3Key, FullyReplicated or ShardedBySize (split by size
+                between the instances, see :func:`shards.getBalancedInputs`)
+            input_mode - the input data channel mode, File, FastFile (mounted, read lazily) or Pipe (streamed
+                to a FIFO, see :func:`worker_lib.readPipe`), defaults to None (File)
             ...
+            wait - whether to wait for the job, otherwise return right after it was created,
+                see :func:`getJobHandle`
+            code_delta - upload only the code changes relative to the previously uploaded code, as an overlay
+                that the worker toolkit applies before running the entry point
 
         Returns estimator object
         """
@@ -289,10 +332,24 @@ class SageMakerTask:
         job_name = self._getJobName()
 
         # append the internal dependencies
-        dependencies.extend(self.internalDependencies)
+        dependencies = dependencies + self.internalDependencies
+
+        if (
+            not self.local_mode
+            and entry_point
+            and not (source_dir and source_dir.lower().startswith("s3://"))
+        ):
+            # package and upload the code only once, by its content
+            source_dir, entry_point = CodeArtifacts(
+                self.boto3_session, self.codeS3Uri
+            ).getSourceDirUri(entry_point, source_dir, dependencies, code_delta)
+            # the dependencies are already packaged
+            dependencies = list()
 
         tags["SimpleSagemakerTask"] = self.task_name
         tags["SimpleSagemakerVersion"] = VERSION
+        project_name = tags.get("SimpleSagemakerProject")
+        fingerprint = tags.get(constants.FINGERPRINT_TAG_NAME)
         tags = [{"Key": k, "Value": v} for k, v in tags.items()]
 
         metric_definitions = [
@@ -346,31 +403,90 @@ class SageMakerTask:
             **additionalEstimatorArgs,
         )
         inputs = dict()
-        if self.inputS3Uri:
+        if (
+            self.inputS3Uri
+            and input_distribution == constants.INPUT_DISTRIBUTION_BY_SIZE
+        ):
+            inputs.update(
+                getBalancedInputs(
+                    self.boto3_session,
+                    "data",
+                    self.inputS3Uri,
+                    instance_count,
+                    sagemaker.s3.s3_path_join(
+                        self.baseTaskS3Uri, job_name, "shards", "data"
+                    ),
+                    input_mode,
+                )
+            )
+        elif self.inputS3Uri:
             inputs.update(
                 {
                     "data": TrainingInput(
-                        self.inputS3Uri, distribution=input_distribution
+                        self.inputS3Uri,
+                        distribution=input_distribution,
+                        input_mode=input_mode,
                     )
                 }
             )
         if additional_inputs:
             inputs.update(additional_inputs)
 
-        estimator.fit(inputs=inputs if inputs else None, job_name=job_name)
-        # training_job_description = estimator.latest_training_job.describe()
-        # logging.info(f"Job is done: {training_job_description}")
-        training_job_description = self.smSession.describe_training_job(job_name)
+        job_index = self._indexJob(
+            job_name, constants.TASK_TYPE_TRAINING, project_name, fingerprint
+        )
+        estimator.fit(inputs=inputs if inputs else None, job_name=job_name, wait=wait)
 
         self.estimators.append(estimator)
         self.jobNames.append(job_name)
-        self.descriptions.append(training_job_description)
-        if "Completed" != training_job_description["TrainingJobStatus"]:
-            logger.error(
-                f"Task failed with status: {training_job_description['TrainingJobStatus']}"
-            )
+        self._addJobHandle(
+            job_name,
+            constants.TASK_TYPE_TRAINING,
+            wait,
+            job_index,
+        )
         return job_name
 
+    def _indexJob(self, job_name, task_type, project_name, fingerprint):
+        # the job is recorded before it's created, so it's known even if waiting for it is interrupted. A job that
+        #   failed to be created is removed once its entry is revalidated, see :func:`getLastJob`
+        if not project_name or self.local_mode:
+            return None
+        job_index = SageMakerTask.getJobIndex(self.boto3_session)
+        job_index.add(
+            project_name,
+            self.task_name,
+            job_name,
+            task_type,
+            None,
+            time.time(),
+            fingerprint,
+        )
+        return job_index
+
+    def _addJobHandle(self, job_name, task_type, wait, job_index=None):
+        handle = JobHandle(self, job_name, task_type)
+        self.handles[job_name] = handle
+        if job_index:
+            # keep the status of the job in the local job index up to date
+            handle.addDoneCallback(
+                lambda handle: job_index.setStatus(job_name, handle.status())
+            )
+        if wait:
+            # the job is already done, get its description
+            handle.refresh()
+        return handle
+
+    def getJobHandle(self, job_name=None):
+        """
+        Get the :class:`JobHandle` for a given / the last job
+        """
+        if job_name is None:
+            job_name = self.jobNames[-1]
+        if job_name not in self.handles:
+            self.handles[job_name] = JobHandle(self, job_name, self.task_type)
+        return self.handles[job_name]
+
     def _getJobByName(self, name_contains):
         funcs_type = (
             (
@@ -436,10 +552,48 @@ class SageMakerTask:
 
     @staticmethod
     def getLastProcessingJob(boto3_session, sm_client, project_name, task_name):
+        # The search API doesn't support processing jobs. As job names start with the task name,
+        #   the last jobs whose name contains it are listed by a single request, and their tags
+        #   are checked (a few at most).
+        max_candidates = constants.PROCESSING_JOB_MAX_CANDIDATES
+        resp = sm_client.list_processing_jobs(
+            NameContains=task_name,
+            MaxResults=max_candidates,
+            SortBy="CreationTime",
+            SortOrder="Descending",
+        )
+        for job_summary in resp["ProcessingJobSummaries"]:
+            if not job_summary["ProcessingJobName"].startswith(task_name + "-"):
+                continue
+            tags = sm_client.list_tags(ResourceArn=job_summary["ProcessingJobArn"])
+            tags = {x["Key"]: x["Value"] for x in tags["Tags"]}
+            if (
+                tags.get("SimpleSagemakerProject", None) == project_name
+                and tags.get("SimpleSagemakerTask", None) == task_name
+            ):
+                return (
+                    job_summary["ProcessingJobName"],
+                    job_summary["ProcessingJobStatus"],
+                    job_summary["CreationTime"],
+                )
+        if "NextToken" not in resp:
+            # all the candidates were checked
+            return None, None, None
+
+        # many later jobs of other projects have the same task name, fall back to a full scan
+        logger.info(
+            f"Task {task_name} wasn't found in the last {max_candidates} jobs, scanning all the jobs"
+        )
+        return SageMakerTask._scanLastProcessingJob(
+            boto3_session, sm_client, project_name, task_name
+        )
+
+    @staticmethod
+    def _scanLastProcessingJob(boto3_session, sm_client, project_name, task_name):
         # look for processing jobs
         extra_args = {}
         arn_tags = {}
-        rt_client = boto3_session.client("resourcegroupstaggingapi")
+        rt_client = getClient(boto3_session, "resourcegroupstaggingapi")
         while True:
             resp = rt_client.get_resources(
                 ResourcesPerPage=100,
@@ -497,13 +651,46 @@ class SageMakerTask:
         return None, None, None
 
     @staticmethod
-    def getLastJob(boto3_session, project_name, task_name, task_type=None):
-        # Look for training job first and return it if it's there
-        from botocore.config import Config
+    def _describeJobStatus(sm_client, job_name, task_type):
+        try:
+            if task_type == constants.TASK_TYPE_TRAINING:
+                return sm_client.describe_training_job(TrainingJobName=job_name)[
+                    "TrainingJobStatus"
+                ]
+            return sm_client.describe_processing_job(ProcessingJobName=job_name)[
+                "ProcessingJobStatus"
+            ]
+        except ClientError:
+            logger.debug(f"Couldn't describe {job_name}", exc_info=True)
+            return None
 
-        config = Config(retries={"max_attempts": 10, "mode": "standard"})
-        client = boto3_session.client("sagemaker", config=config)
+    @staticmethod
+    def getJobIndex(boto3_session):
+        """Get the local job index of the account and region of a boto3 session"""
+        return JobIndex(
+            getRegistry(boto3_session).getAccountId(), boto3_session.region_name
+        )
 
+    @staticmethod
+    def getLastJob(
+        boto3_session, project_name, task_name, task_type=None, job_index=None
+    ):
+        client = getClient(boto3_session, "sagemaker")
+
+        # Look in the local job index first, revalidating the job with a single describe call
+        if job_index is None:
+            job_index = SageMakerTask.getJobIndex(boto3_session)
+        last_job = job_index.getLast(project_name, task_name, task_type)
+        if last_job:
+            name, job_type, status = last_job
+            current_status = SageMakerTask._describeJobStatus(client, name, job_type)
+            if current_status:
+                if current_status != status:
+                    job_index.setStatus(name, current_status)
+                return name, job_type, current_status
+            job_index.remove(name)
+
+        # Then scan - look for training job first and return it if it's there
         name, status, job_type = None, None, None
 
         if not task_type or task_type == constants.TASK_TYPE_TRAINING:
@@ -522,8 +709,106 @@ class SageMakerTask:
                     name, status, time = name2, status2, time2
                     job_type = constants.TASK_TYPE_PROCESSING
 
+        if name:
+            job_index.add(
+                project_name, task_name, name, job_type, status, time.timestamp()
+            )
         return name, job_type, status
 
+    @staticmethod
+    def getJobByFingerprint(
+        boto3_session, project_name, task_name, task_type, fingerprint, job_index=None
+    ):
+        """Get the last completed job of a task that was run with the given fingerprint (see
+        :func:`fingerprint.getTaskFingerprint`), i.e. whose results can be reused.
+        The jobs submitted from this machine are looked up in the local job index first (see :class:`JobIndex`),
+        revalidated by a describe call. Otherwise, training jobs are found by a single search query, and processing
+        jobs (which the search API doesn't support) by their tags, i.e. without scanning the task jobs.
+
+        return: the job name, or None if there's no such job
+        rtype: str
+        """
+        client = getClient(boto3_session, "sagemaker")
+
+        if job_index is None:
+            job_index = SageMakerTask.getJobIndex(boto3_session)
+        for name, status in job_index.getByFingerprint(
+            project_name, task_name, task_type, fingerprint
+        ):
+            current_status = SageMakerTask._describeJobStatus(client, name, task_type)
+            if not current_status:
+                job_index.remove(name)
+                continue
+            if current_status != status:
+                job_index.setStatus(name, current_status)
+            if current_status == "Completed":
+                return name
+
+        if task_type == constants.TASK_TYPE_TRAINING:
+            search_res = client.search(
+                Resource="TrainingJob",
+                SearchExpression={
+                    "Filters": [
+                        {
+                            "Name": f"Tags.{constants.FINGERPRINT_TAG_NAME}",
+                            "Operator": "Equals",
+                            "Value": fingerprint,
+                        },
+                        {
+                            "Name": "Tags.SimpleSagemakerTask",
+                            "Operator": "Equals",
+                            "Value": task_name,
+                        },
+                        {
+                            "Name": "Tags.SimpleSagemakerProject",
+                            "Operator": "Equals",
+                            "Value": project_name,
+                        },
+                        {
+                            "Name": "TrainingJobStatus",
+                            "Operator": "Equals",
+                            "Value": "Completed",
+                        },
+                    ]
+                },
+                SortBy="CreationTime",
+                SortOrder="Descending",
+                MaxResults=1,
+            )
+            if search_res["Results"]:
+                return search_res["Results"][0]["TrainingJob"]["TrainingJobName"]
+            return None
+
+        rt_client = getClient(boto3_session, "resourcegroupstaggingapi")
+        pages = rt_client.get_paginator("get_resources").paginate(
+            TagFilters=[
+                {"Key": constants.FINGERPRINT_TAG_NAME, "Values": [fingerprint]},
+                {"Key": "SimpleSagemakerProject", "Values": [project_name]},
+                {"Key": "SimpleSagemakerTask", "Values": [task_name]},
+            ],
+            ResourceTypeFilters=["sagemaker:processing-job"],
+        )
+        last_job = None
+        for page in pages:
+            for res_tags in page["ResourceTagMappingList"]:
+                try:
+                    description = client.describe_processing_job(
+                        ProcessingJobName=res_tags["ResourceARN"].split("/")[-1]
+                    )
+                except ClientError:
+                    logger.debug(
+                        f"Couldn't describe {res_tags['ResourceARN']}", exc_info=True
+                    )
+                    continue
+                if description["ProcessingJobStatus"] == "Completed" and (
+                    not last_job or description["CreationTime"] > last_job[1]
+                ):
+                    last_job = (
+                        description["ProcessingJobName"],
+                        description["CreationTime"],
+                    )
+        return last_job[0] if last_job else None
+
     def bindToLastJob(self, job_name, task_type):
         self.task_type = task_type
         self.jobNames.append(job_name)
@@ -531,7 +816,7 @@ class SageMakerTask:
     def clean_state(self):
         uri = self.getOutputTargetUri(state=True)
         bucket, prefix = sagemaker.s3.parse_s3_url(uri)
-        s3c = self.boto3_session.client("s3")
+        s3c = getClient(self.boto3_session, "s3")
         for file in self.smSession.list_s3_files(bucket, prefix):
             s3c.delete_object(Bucket=bucket, Key=file)
 
@@ -556,11 +841,12 @@ class SageMakerTask:
                 sagemaker.s3.parse_s3_url(self.inputS3Uri)[1],
             )
 
-    def _downloadData(self, path, uri, extra_args):
+    def _downloadData(self, path, uri, extra_args, sync=None, pool=None, progress=None):
         bucket, prefix = sagemaker.s3.parse_s3_url(uri)
+        if sync is None:
+            sync = S3Sync(self.boto3_session)
         try:
-            if self.smSession.list_s3_files(bucket, prefix):
-                self.smSession.download_data(path, bucket, prefix, extra_args)
+            sync.downloadPrefix(bucket, prefix, path, pool, progress, extra_args)
         except:  # noqa: E722
             logger.info(f"Couldn't download from {uri}", exc_info=True)
 
@@ -572,16 +858,25 @@ class SageMakerTask:
             job_name = self.jobNames[-1]
         return sagemaker.s3.s3_path_join(self.baseTaskS3Uri, job_name)
 
-    def _extractTars(self, path):
-        if not os.path.isdir(path):
-            return
-        for file_name in os.listdir(path):
-            if file_name.endswith(".tar.gz"):
-                tarFileName = os.path.join(path, file_name)
-                if os.path.isfile(tarFileName):
-                    tar = tarfile.open(tarFileName)
-                    tar.extractall(path)
-                    os.remove(tarFileName)
+    def _extractData(self, path, uri, extra_args, sync, progress=None, members=None):
+        bucket, key = sagemaker.s3.parse_s3_url(uri)
+        try:
+            sync.extractTarGz(bucket, key, path, members, progress, extra_args)
+        except sync.s3_client.exceptions.NoSuchKey:
+            logger.debug(f"{uri} doesn't exist")
+        except:  # noqa: E722
+            logger.info(f"Couldn't download and extract {uri}", exc_info=True)
+
+    def _extractTars(self, paths, max_workers=None):
+        # extract all the archives under the given paths in parallel, each into its own directory
+        tarFileNames = [
+            os.path.join(root, file_name)
+            for path in paths
+            for root, _, file_names in os.walk(path)
+            for file_name in file_names
+            if file_name.endswith(".tar.gz")
+        ]
+        extractFiles(tarFileNames, max_workers)
 
     def getOutputTargetUri(self, model=False, output=False, state=False, source=False):
         assert (
@@ -604,20 +899,43 @@ class SageMakerTask:
         elif state:
             uri = self.stateS3Uri
         elif source:
-            uri = sagemaker.s3.s3_path_join(
-                self.getOutputUri(), "source", "source_dir.tar.gz"
-            )
+            uri = self.getSourceUri()
         return uri
 
+    def getSourceUri(self, job_name=None):
+        """
+        Get the S3 uri of the code a given / the last job was run with, as it's kept under its content
+        hash (see :class:`CodeArtifacts`), or None if the job wasn't given any code
+        """
+        handle = self.getJobHandle(job_name)
+        handle.refresh()
+        description = handle.description
+        if handle.task_type == constants.TASK_TYPE_TRAINING:
+            submit_dir = description.get("HyperParameters", dict()).get(
+                "sagemaker_submit_directory"
+            )
+            # hyperparameter values are JSON encoded
+            return json.loads(submit_dir) if submit_dir else None
+        for processing_input in description.get("ProcessingInputs", list()):
+            if processing_input["InputName"] == "code":
+                return processing_input["S3Input"]["S3Uri"]
+        return None
+
     def getInputConfig(
-        self, output_type, distribution="FullyReplicated", subdir="", return_s3uri=False
+        self,
+        output_type,
+        distribution="FullyReplicated",
+        subdir="",
+        return_s3uri=False,
+        input_mode=None,
     ):
         uri = self.getOutputTargetUri(**{output_type: True})
+        assert uri, f"The last job of {self.task_name} has no {output_type}"
         if subdir:
             uri = sagemaker.s3.s3_path_join(uri, subdir)
         if return_s3uri:
             return uri
-        return TrainingInput(uri, distribution=distribution)
+        return TrainingInput(uri, distribution=distribution, input_mode=input_mode)
 
     def downloadResults(
         self,
@@ -629,88 +947,216 @@ class SageMakerTask:
         source=True,
         extractTars=True,
         extra_args=None,
+        members=None,
+        extractAllTars=False,
+        extract_workers=None,
+        utilization=True,
     ):
         logger.info(f"Downloading results to {output_base}")
         os.makedirs(output_base, exist_ok=True)
+        self._saveTimeline(output_base)
+        if utilization:
+            self._saveUtilization(output_base)
+
+        # download logs, and download and extract state, output, model, source - concurrently
+        artifacts = [
+            argName
+            for (shouldDownload, argName) in zip(
+                [state, model, output, source], ["state", "model", "output", "source"]
+            )
+            if shouldDownload
+        ]
+        max_workers = constants.DEFAULT_DOWNLOAD_MAX_WORKERS
+        sync = S3Sync(self.boto3_session, max_pool_connections=max_workers)
+        progress = TransferProgress()
+        # each artifact is listed, downloaded and extracted by its own thread, while
+        #   the files themselves are transferred by a shared pool
+        with ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as transfer_pool, ThreadPoolExecutor(
+            max_workers=len(artifacts) + 1
+        ) as artifacts_pool:
+            futures = list()
+            if logs:
+                # get and save the logs
+                futures.append(
+                    artifacts_pool.submit(
+                        self.downloadLogs, os.path.join(output_base, "logs")
+                    )
+                )
+            for argName in artifacts:
+                futures.append(
+                    artifacts_pool.submit(
+                        self._downloadArtifact,
+                        argName,
+                        output_base,
+                        extractTars,
+                        extra_args,
+                        sync,
+                        transfer_pool,
+                        progress,
+                        members if argName in ("model", "output") else None,
+                    )
+                )
+            for future in futures:
+                future.result()
+        logger.info(progress.progressLine())
+
+        if extractAllTars:
+            # archives inside the downloaded directories, e.g. written by processing tasks
+            self._extractTars(
+                [
+                    os.path.join(output_base, x)
+                    for x in ("state", "output")
+                    if x in artifacts
+                ],
+                extract_workers,
+            )
+
+    def _downloadArtifact(
+        self,
+        argName,
+        output_base,
+        extractTars,
+        extra_args,
+        sync,
+        pool,
+        progress,
+        members=None,
+    ):
+        output_path = os.path.join(output_base, argName)
+        uri = self.getOutputTargetUri(**{argName: True})
+        if not uri:
+            logger.info(f"The job has no {argName} to download")
+            return
+        logger.debug(f"Downloading {argName} from {uri} to {output_path}")
+        if extractTars and uri.endswith(".tar.gz"):
+            # extract while downloading, the archive itself is never written
+            self._extractData(output_path, uri, extra_args, sync, progress, members)
+        else:
+            self._downloadData(output_path, uri, extra_args, sync, pool, progress)
+
+    def getArchiveMember(self, member, archive="model"):
+        """
+        Get the content of a single member of the model / output archive of the last job, without
+        downloading the archive past that member. A member index of the archive is built and cached in S3 on first use.
+        """
+        uri = self.getOutputTargetUri(**{archive: True})
+        assert uri.endswith(".tar.gz"), f"The {archive} of this task isn't an archive"
+        bucket, key = sagemaker.s3.parse_s3_url(uri)
+        return S3Sync(self.boto3_session).getTarMember(bucket, key, member)
+
+    def getTimeline(self, job_name=None):
+        """
+        Get the per-phase timeline of a given / the last job, see :func:`timeline.getJobTimeline`
+        """
+        handle = self.getJobHandle(job_name)
+        handle.refresh()
+        return getJobTimeline(handle.description, handle.task_type)
+
+    def _saveTimeline(self, output_base):
+        try:
+            timeline = self.getTimeline()
+        except:  # noqa: E722
+            logger.warning("Failed to get the job timeline", exc_info=True)
+            return
+        with open(os.path.join(output_base, constants.TIMELINE_FILE_NAME), "wt") as f:
+            json.dump(timeline, f, indent=2)
+
+    def getUtilization(self, job_name=None):
+        """
+        Get the per-host resource utilization metrics of a given / the last job, see
+        :func:`utilization.getUtilization`
+        """
+        handle = self.getJobHandle(job_name)
+        handle.refresh()
+        return getUtilization(
+            getClient(self.boto3_session, "cloudwatch"),
+            handle.description,
+            handle.task_type,
+        )
+
+    def _saveUtilization(self, output_base):
+        try:
+            rows = self.getUtilization()
+        except:  # noqa: E722
+            logger.warning("Failed to get the job utilization metrics", exc_info=True)
+            return
+        if not rows:
+            logger.info("No utilization metrics were found")
+            return
+        saveUtilization(
+            rows, os.path.join(output_base, constants.UTILIZATION_FILE_NAME)
+        )
+        with open(
+            os.path.join(output_base, constants.UTILIZATION_SUMMARY_FILE_NAME), "wt"
+        ) as f:
+            json.dump(summarizeUtilization(rows), f, indent=2)
 
-        if logs:
-            # get and save the logs
-            logs = self.getLogs()
-            logsPath = os.path.join(output_base, "logs")
-            os.makedirs(logsPath, exist_ok=True)
-            for channel_name in logs.keys():
-                ff = open(os.path.join(logsPath, f"logs{channel_name}"), "wt")
-                for line in logs[channel_name]:
-                    ff.write(line)
-                    ff.write("\n")
-                ff.close()
-
-        # download and extract state, output, model, source
-
-        for (shouldDownload, argName) in zip(
-            [state, model, output, source], ["state", "model", "output", "source"]
-        ):
-            if shouldDownload:
-                output_path = os.path.join(output_base, argName)
-                uri = self.getOutputTargetUri(**{argName: True})
-                logger.debug(f"Downloading {argName} from {uri} to {output_path}")
-                self._downloadData(output_path, uri, extra_args)
-                if extractTars:
-                    if uri.endswith(".tar.gz"):
-                        self._extractTars(output_path)
-
-    # Based on logs_for_job in https://github.com/aws/sagemaker-python-sdk/blob/master/src/sagemaker/session.py
     def getLogs(self, job_name=None):
         """
-        Get the logs for a given / the last job
+        Get the logs for a given / the last job, as a mapping from the instance index to a list of lines
         """
         if job_name is None:
             job_name = self.jobNames[-1]
-        wait = False
-
-        class logsWrapper(object):
-            def __init__(self):
-                self.logsChannels = dict()
-
-            def __call__(self, index, s):
-                self.logsChannels.setdefault(index, list()).append(s)
-
-            def getChannels(self):
-                return self.logsChannels.keys()
-
-            def getLogsForChannel(self, channel):
-                return self.logsChannels[channel]
-
-        if self.task_type == constants.TASK_TYPE_TRAINING:
-            description = self.smSession.describe_training_job(job_name)
-        elif self.task_type == constants.TASK_TYPE_PROCESSING:
-            description = self.smSession.describe_processing_job(job_name)
-        (
-            instance_count,
-            stream_names,
-            positions,
-            client,
-            log_group,
-            dot,
-            color_wrap,
-        ) = sagemaker.session._logs_init(
-            self.smSession, description, job=self.task_type
-        )
-        lw = logsWrapper()  # raplace with our own class
-        state = sagemaker.session._get_initial_job_state(  # noqa: F841
-            description, f"{self.task_type}JobStatus", wait
-        )
-        sagemaker.session._flush_log_streams(
-            stream_names,
-            instance_count,
-            client,
-            log_group,
-            job_name,
-            positions,
-            dot,
-            lw,
+        return LogsFetcher(self.boto3_session).fetch(job_name, self.task_type)
+
+    def downloadLogs(self, logs_path, job_name=None):
+        """
+        Download the logs for a given / the last job, each instance log is streamed directly
+        to a logs[index] file under logs_path. Only new log events are fetched if the logs were
+        already downloaded to logs_path.
+        """
+        if job_name is None:
+            job_name = self.jobNames[-1]
+        return LogsFetcher(self.boto3_session).fetchToFiles(
+            job_name, self.task_type, logs_path
         )
-        return lw.logsChannels
+
+    def writeMergedLogs(self, output=sys.stdout, job_name=None):
+        """
+        Write the logs of all the instances of a given / the last job, merged and ordered by their
+        timestamp, to `output` (a file path or a text stream), each line prefixed by its host name
+        """
+        if job_name is None:
+            job_name = self.jobNames[-1]
+        fetcher = LogsFetcher(self.boto3_session)
+        if isinstance(output, str):
+            with open(output, "wt") as f:
+                return fetcher.writeMerged(job_name, self.task_type, f)
+        return fetcher.writeMerged(job_name, self.task_type, output)
+
+    def followLogs(
+        self,
+        logs_path,
+        job_name=None,
+        poll_secs=constants.DEFAULT_LOGS_POLL_SECS,
+        output=sys.stdout,
+    ):
+        """
+        Tail the logs of all the instances of a given / the last job until it's done. New log events
+        are appended to the logs[index] files under logs_path (see :func:`downloadLogs`), and printed
+        to `output` prefixed by their host name.
+        """
+        if job_name is None:
+            job_name = self.jobNames[-1]
+        handle = self.getJobHandle(job_name)
+        fetcher = LogsFetcher(self.boto3_session)
+        print_lock = threading.Lock()
+
+        def printEvent(stream_name, event):
+            host_name = LogsFetcher.getHostName(stream_name)
+            with print_lock:
+                print(f"[{host_name}] {event['message']}", file=output, flush=True)
+
+        while True:
+            # check the status first, to make sure the last events are fetched
+            done = handle.done()
+            fetcher.fetchToFiles(job_name, self.task_type, logs_path, printEvent)
+            if done:
+                break
+            time.sleep(poll_secs)
+        return handle.status()
 
 
 def main():
@@ -0,0 +1,119 @@
+import logging
+from datetime import datetime, timezone
+
+from . import constants
+from .job_handle import JobHandle
+
+logger = logging.getLogger(__name__)
+
+
+def _phase(name, start, end, message=""):
+    return {
+        "name": name,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "secs": max(0.0, (end - start).total_seconds()),
+        "message": message,
+    }
+
+
+def getJobTimeline(description, task_type):
+    """Break a job down into its phases, i.e. where its time went, based on its description.
+    For training jobs, the phases are the secondary status transitions (e.g. "Starting", which includes
+    waiting for spot capacity and launching the instances, "Downloading", "Training", which starts with
+    pulling the image, and "Uploading"). For processing jobs, they are "Starting" (until the processing
+    started), "Processing" and "Finalizing" (e.g. uploading the outputs). Time between the job creation
+    and its first phase is reported as "Queued".
+
+    :param description: The job description, i.e. the output of `describe_[training/processing]_job`
+    :type description: dict
+    :param task_type: The job type, either "Training" or "Processing"
+    :type task_type: str
+
+    return: the timeline, with the phases and total, billable and overhead (not training / processing)
+        seconds
+    rtype: dict
+    """
+    now = datetime.now(timezone.utc)
+    creation_time = description["CreationTime"]
+    phases = list()
+    if task_type == constants.TASK_TYPE_TRAINING:
+        main_phase = "Training"
+        status = description["TrainingJobStatus"]
+        end_time = description.get("TrainingEndTime")
+        if status in JobHandle.TERMINAL_STATUSES:
+            end_time = end_time or description.get("LastModifiedTime")
+        # the terminal transitions are points in time
+        transitions = [
+            x
+            for x in description.get("SecondaryStatusTransitions", [])
+            if x["Status"] not in JobHandle.TERMINAL_STATUSES
+        ]
+        if transitions and transitions[0]["StartTime"] > creation_time:
+            phases.append(_phase("Queued", creation_time, transitions[0]["StartTime"]))
+        for transition in transitions:
+            phases.append(
+                _phase(
+                    transition["Status"],
+                    transition["StartTime"],
+                    transition.get("EndTime") or end_time or now,
+                    transition.get("StatusMessage", ""),
+                )
+            )
+        billable_secs = description.get("BillableTimeInSeconds")
+    else:
+        main_phase = "Processing"
+        status = description["ProcessingJobStatus"]
+        start_time = description.get("ProcessingStartTime")
+        processing_end_time = description.get("ProcessingEndTime")
+        last_modified = description.get("LastModifiedTime")
+        end_time = processing_end_time
+        if status in JobHandle.TERMINAL_STATUSES:
+            end_time = end_time or last_modified
+        if start_time:
+            phases.append(_phase("Starting", creation_time, start_time))
+            phases.append(_phase("Processing", start_time, end_time or now))
+            if (
+                processing_end_time
+                and last_modified
+                and last_modified > processing_end_time
+            ):
+                phases.append(_phase("Finalizing", processing_end_time, last_modified))
+                end_time = last_modified
+        else:
+            phases.append(_phase("Starting", creation_time, end_time or now))
+        billable_secs = None
+
+    total_secs = ((end_time or now) - creation_time).total_seconds()
+    main_secs = sum(x["secs"] for x in phases if x["name"] == main_phase)
+    return {
+        "job_name": description[f"{task_type}JobName"],
+        "task_type": task_type,
+        "status": status,
+        "phases": phases,
+        "total_secs": total_secs,
+        "billable_secs": billable_secs,
+        "overhead_secs": total_secs - main_secs,
+    }
+
+
+def formatTimeline(timeline):
+    """Format a timeline (see :func:`getJobTimeline`) as a human readable table
+
+    return: the table lines
+    rtype: list
+    """
+    total_secs = timeline["total_secs"] or 1
+    lines = [
+        f"{timeline['job_name']} ({timeline['status']}): {timeline['total_secs']:.0f} secs in total, "
+        f"{timeline['overhead_secs']:.0f} secs ({100 * timeline['overhead_secs'] / total_secs:.1f}%) "
+        f"of them aren't {timeline['task_type'].lower()}"
+    ]
+    if timeline["billable_secs"] is not None:
+        lines[0] += f", {timeline['billable_secs']} billable secs"
+    for phase in timeline["phases"]:
+        lines.append(
+            f"  {phase['name']:<12} {phase['start'][11:19]} {phase['secs']:>8.0f} secs "
+            f"{100 * phase['secs'] / total_secs:>5.1f}%  {phase['message']}"
+        )
+    return lines
@@ -0,0 +1,159 @@
+import csv
+import logging
+from datetime import datetime, timedelta, timezone
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+
+UTILIZATION_METRICS = (
+    "CPUUtilization",
+    "MemoryUtilization",
+    "DiskUtilization",
+    "GPUUtilization",
+    "GPUMemoryUtilization",
+)
+# maximal number of queries of a single get_metric_data call
+MAX_METRIC_QUERIES = 500
+
+
+def _getInstanceCount(description, task_type):
+    if task_type == constants.TASK_TYPE_TRAINING:
+        return description["ResourceConfig"]["InstanceCount"]
+    return description["ProcessingResources"]["ClusterConfig"]["InstanceCount"]
+
+
+def _getTimeRange(description, task_type):
+    end_time = (
+        description.get(f"{task_type}EndTime")
+        or description.get("LastModifiedTime")
+        or datetime.now(timezone.utc)
+    )
+    # the metrics are published per minute, make sure the edges are covered
+    return (
+        description["CreationTime"] - timedelta(minutes=1),
+        end_time + timedelta(minutes=1),
+    )
+
+
+def getUtilization(cw_client, description, task_type, period=60):
+    """Get the resource utilization metrics (CPU, memory, disk, GPU and GPU memory) of all the instances of a
+    job, as published by SageMaker to CloudWatch. All the metrics of all the instances are fetched by batched
+    `get_metric_data` calls.
+
+    :param cw_client: A CloudWatch boto3 client
+    :param description: The job description, i.e. the output of `describe_[training/processing]_job`
+    :type description: dict
+    :param task_type: The job type, either "Training" or "Processing"
+    :type task_type: str
+    :param period: The metrics granularity in seconds, defaults to 60
+    :type period: int, optional
+
+    return: a row per host and timestamp, with the host name, timestamp and a column per metric (missing
+        metrics, e.g. GPU ones of CPU instances, are None), sorted by the host and timestamp
+    rtype: list of dict
+    """
+    job_name = description[f"{task_type}JobName"]
+    hosts = [f"algo-{i + 1}" for i in range(_getInstanceCount(description, task_type))]
+    queries = [
+        {
+            "Id": f"m{i}",
+            "Label": f"{host} {metric}",
+            "MetricStat": {
+                "Metric": {
+                    "Namespace": f"/aws/sagemaker/{task_type}Jobs",
+                    "MetricName": metric,
+                    "Dimensions": [{"Name": "Host", "Value": f"{job_name}/{host}"}],
+                },
+                "Period": period,
+                "Stat": "Average",
+            },
+        }
+        for i, (host, metric) in enumerate(
+            (host, metric) for host in hosts for metric in UTILIZATION_METRICS
+        )
+    ]
+    start_time, end_time = _getTimeRange(description, task_type)
+
+    # (host, timestamp) -> row
+    rows = dict()
+    for i in range(0, len(queries), MAX_METRIC_QUERIES):
+        extra_args = dict()
+        while True:
+            resp = cw_client.get_metric_data(
+                MetricDataQueries=queries[i : i + MAX_METRIC_QUERIES],
+                StartTime=start_time,
+                EndTime=end_time,
+                **extra_args,
+            )
+            for result in resp["MetricDataResults"]:
+                host, metric = result["Label"].split(" ")
+                for timestamp, value in zip(result["Timestamps"], result["Values"]):
+                    key = (host, timestamp)
+                    if key not in rows:
+                        rows[key] = {"host": host, "timestamp": timestamp.isoformat()}
+                        rows[key].update({x: None for x in UTILIZATION_METRICS})
+                    rows[key][metric] = value
+            if "NextToken" not in resp:
+                break
+            extra_args["NextToken"] = resp["NextToken"]
+    return [rows[key] for key in sorted(rows)]
+
+
+def summarizeUtilization(rows):
+    """Summarize utilization rows (see :func:`getUtilization`) by the average and peak of each metric per host
+
+    return: a {host: {metric: {"avg": average, "peak": peak}}} mapping, of the metrics that have values
+    rtype: dict
+    """
+    summary = dict()
+    for host in sorted({x["host"] for x in rows}):
+        summary[host] = dict()
+        for metric in UTILIZATION_METRICS:
+            values = [
+                x[metric] for x in rows if x["host"] == host and x[metric] is not None
+            ]
+            if values:
+                summary[host][metric] = {
+                    "avg": sum(values) / len(values),
+                    "peak": max(values),
+                }
+    return summary
+
+
+def formatUtilizationSummary(summary):
+    """Format a utilization summary (see :func:`summarizeUtilization`) as a human readable table.
+    Note: CPU utilization is summed over the cores, e.g. up to 400% for 4 cores.
+
+    return: the table lines
+    rtype: list
+    """
+    metrics = [
+        metric
+        for metric in UTILIZATION_METRICS
+        if any(metric in x for x in summary.values())
+    ]
+    lines = [
+        "host     "
+        + "".join(f"{metric.replace('Utilization', ''):>22}" for metric in metrics),
+        "         " + "".join(f"{'avg / peak %':>22}" for _ in metrics),
+    ]
+    for host, host_summary in summary.items():
+        cells = [
+            f"{host_summary[metric]['avg']:.1f} / {host_summary[metric]['peak']:.1f}"
+            if metric in host_summary
+            else "-"
+            for metric in metrics
+        ]
+        lines.append(f"{host:<9}" + "".join(f"{x:>22}" for x in cells))
+    return lines
+
+
+def saveUtilization(rows, file_name):
+    """Save utilization rows (see :func:`getUtilization`) as a CSV file"""
+    with open(file_name, "wt", newline="") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=["host", "timestamp"] + list(UTILIZATION_METRICS)
+        )
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,61 @@
+"""The entry point of a job whose code was uploaded as a delta overlay (see `code_delta`).
+The overlay (changed files only) is already extracted to the code directory. This script extracts
+the rest of the files from the base code archive, drops the deleted ones, and runs the actual entry point.
+"""
+import json
+import logging
+import os
+import runpy
+import sys
+import tarfile
+from urllib.parse import urlparse
+
+import boto3
+
+DELTA_FILE_NAME = ".ssm_delta.json"
+
+logger = logging.getLogger(__name__)
+
+
+def applyDelta(code_dir):
+    """Apply the delta overlay in `code_dir` onto its base
+
+    return: the delta description, see `CodeArtifacts.getSourceDirUri`
+    rtype: dict
+    """
+    with open(os.path.join(code_dir, DELTA_FILE_NAME), "rt") as f:
+        delta = json.load(f)
+    skipped = set(delta["overlay"]) | set(delta["deleted"])
+    url = urlparse(delta["base"])
+    logger.info(f"Applying the code overlay onto {delta['base']}")
+    response = boto3.client("s3").get_object(
+        Bucket=url.netloc, Key=url.path.lstrip("/")
+    )
+    count = 0
+    with tarfile.open(fileobj=response["Body"], mode="r|gz") as tar:
+        for member in tar:
+            if os.path.normpath(member.name) in skipped:
+                continue
+            tar.extract(member, code_dir)
+            count += 1
+    logger.info(
+        f"Extracted {count} base members, {len(delta['overlay'])} files were overlaid "
+        f"and {len(delta['deleted'])} deleted"
+    )
+    return delta
+
+
+def main():
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    delta = applyDelta(code_dir)
+
+    # run the actual entry point, as if it was run directly
+    entry_point = os.path.join(code_dir, delta["entry_point"])
+    sys.argv[0] = entry_point
+    sys.path.insert(0, os.path.dirname(entry_point))
+    runpy.run_path(entry_point, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import argparse
+import atexit
+import errno
 import json
 import logging
 import multiprocessing
 import os
+import pickle
 import shlex
 import shutil
 import sys
+import tempfile
+import threading
+import time
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -20,6 +26,203 @@ def _bind(instance, func, as_name):
     setattr(instance, as_name, func.__get__(instance, instance.__class__))
 
 
+def readPipe(channel_name="data", epoch=0, chunk_size=2**20, lines=False, timeout=60):
+    """Iterate over the data of a Pipe mode input channel. SageMaker streams the channel data to a FIFO
+    named `[channel path]_[epoch]`, where a new FIFO (the next epoch) is created each time the previous
+    one is fully read, i.e. every epoch streams the whole channel data again. The data of all the
+    channel files is streamed back to back.
+
+    :param channel_name: The input channel name, defaults to "data"
+    :type channel_name: str, optional
+    :param epoch: The epoch to read, starting from 0
+    :type epoch: int, optional
+    :param chunk_size: Number of bytes to read at once, defaults to 1MB
+    :type chunk_size: int, optional
+    :param lines: Iterate over lines instead of fixed size chunks, defaults to False
+    :type lines: bool, optional
+    :param timeout: Number of seconds to wait for the FIFO to be created, defaults to 60
+    :type timeout: int, optional
+
+    return: an iterator of the data chunks / lines
+    rtype: iterator of bytes
+    """
+    input_dir = os.environ.get("SM_INPUT_DIR", "/opt/ml/input")
+    fifo_path = Path(input_dir) / "data" / f"{channel_name}_{epoch}"
+    start_time = time.time()
+    while not fifo_path.exists():
+        assert (
+            time.time() - start_time < timeout
+        ), f"{fifo_path} doesn't exist, is {channel_name} a Pipe mode input channel?"
+        time.sleep(0.1)
+
+    logger.info(f"Reading epoch {epoch} of {channel_name} from {fifo_path}")
+    with open(fifo_path, "rb") as f:
+        if lines:
+            yield from f
+        else:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+
+def getShardFiles(channel_name="data"):
+    """Get the files of the current instance, for an input channel that is split between the instances by size
+    (the ShardedBySize distribution). The files are read lazily if the channel uses the FastFile mode, in the File
+    mode all the channel files were already downloaded. The Pipe mode isn't supported, as it has no files.
+
+    :param channel_name: The input channel name, defaults to "data"
+    :type channel_name: str, optional
+
+    return: the local paths of the files
+    rtype: list
+    """
+    input_config = json.loads(os.environ.get("SM_INPUT_DATA_CONFIG", "{}"))
+    assert (
+        input_config.get(channel_name, dict()).get("TrainingInputMode") != "Pipe"
+    ), f"{channel_name} is a Pipe mode channel, its files can't be read by the shard manifest"
+    channel_path = os.environ[f"SM_CHANNEL_{channel_name.upper()}"]
+    shards_path = os.environ[f"SM_CHANNEL_{channel_name.upper()}_SHARDS"]
+    hosts = json.loads(os.environ["SM_HOSTS"])
+    host_rank = hosts.index(os.environ["SM_CURRENT_HOST"])
+    with open(os.path.join(shards_path, f"shard-{host_rank}.manifest"), "rt") as f:
+        # the first entry is the common prefix
+        keys = json.load(f)[1:]
+    logger.info(f"Instance {host_rank} got {len(keys)} files of {channel_name}")
+    return [os.path.join(channel_path, key) for key in keys]
+
+
+class CheckpointWriter:
+    """Writes checkpoints to a directory that is continuously uploaded (i.e. the state), in a background thread.
+    Each checkpoint is serialized to a temporary file outside of the directory, and atomically renamed into it once
+    complete, so the uploader never sees a partial file. A checkpoint that is saved again before its previous
+    save was started replaces it, i.e. rapid successive saves are coalesced.
+
+    Note: the saved object is serialized in the background, so it shouldn't be modified after being saved, e.g.
+    save a copy of a model's state (`copy.deepcopy(model.state_dict())`) rather than the live one.
+
+    :param path: The directory to write the checkpoints to
+    :type path: str
+    :param tmp_path: The directory to serialize the checkpoints into, preferably on the same file system as `path`
+        (for the rename to be atomic), defaults to None (the staging directory, see `synced_path`)
+    :type tmp_path: str, optional
+    :param synced_path: The continuously uploaded directory that contains `path`, defaults to None (`path`).
+        Checkpoints serialized on another file system are copied into a staging directory next to it,
+        `.[synced_path]_tmp`, before being renamed into `path`
+    :type synced_path: str, optional
+    """
+
+    def __init__(self, path, tmp_path=None, synced_path=None):
+        self.path = path
+        synced_path = os.path.abspath(synced_path or path)
+        self.staging_path = os.path.join(
+            os.path.dirname(synced_path), f".{os.path.basename(synced_path)}_tmp"
+        )
+        self.tmp_path = tmp_path or self.staging_path
+        try:
+            os.makedirs(self.tmp_path, exist_ok=True)
+        except OSError:
+            self.tmp_path = tempfile.mkdtemp(prefix="ssm_checkpoints_")
+        self.num_saved = 0
+        self.num_coalesced = 0
+        # checkpoint name -> (object, save function), in the order of saving
+        self._pending = dict()
+        self._writing = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def save(self, name, obj, save_func=pickle.dump):
+        """Save a checkpoint, without waiting for it to be written
+
+        :param name: The checkpoint file name, relative to the checkpoints directory
+        :type name: str
+        :param obj: The object to be saved
+        :param save_func: The serialization function, called as `save_func(obj, file)`, e.g. `torch.save`,
+            defaults to `pickle.dump`
+        :type save_func: callable, optional
+        """
+        with self._cond:
+            self._raiseError()
+            if name in self._pending:
+                self.num_coalesced += 1
+                logger.debug(f"Replacing the pending checkpoint {name}")
+            self._pending[name] = (obj, save_func)
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def wait(self):
+        """Wait for all the saved checkpoints to be written, and raise the error of a failed one (if any)"""
+        with self._cond:
+            while self._pending or self._writing:
+                self._cond.wait()
+            self._raiseError()
+
+    def _raiseError(self):
+        if self._error:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                name = next(iter(self._pending))
+                obj, save_func = self._pending.pop(name)
+                self._writing = True
+            try:
+                start_time = time.time()
+                self._write(name, obj, save_func)
+                self.num_saved += 1
+                logger.debug(
+                    f"Checkpoint {name} was written in {time.time() - start_time:.1f} secs"
+                )
+            except Exception as e:
+                logger.exception(f"Failed to write the checkpoint {name}")
+                self._error = e
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, name, obj, save_func):
+        target = os.path.join(self.path, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_file_name = tempfile.mkstemp(
+            dir=self.tmp_path, prefix=os.path.basename(name) + "."
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                save_func(obj, f)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.replace(tmp_file_name, target)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # a different file system, copy it to the staging directory (which isn't uploaded) first
+                self._stage(tmp_file_name, target)
+                os.remove(tmp_file_name)
+        except:  # noqa: E722
+            if os.path.exists(tmp_file_name):
+                os.remove(tmp_file_name)
+            raise
+
+    def _stage(self, file_name, target):
+        os.makedirs(self.staging_path, exist_ok=True)
+        fd, staged_file_name = tempfile.mkstemp(
+            dir=self.staging_path, prefix=os.path.basename(target) + "."
+        )
+        os.close(fd)
+        try:
+            shutil.copyfile(file_name, staged_file_name)
+            os.replace(staged_file_name, target)
+        except:  # noqa: E722
+            os.remove(staged_file_name)
+            raise
+
+
 class WorkerConfig:
     def __init__(self, per_instance_state=True, set_debug_level=True, update_argv=True):
         """Initialize the WorkerConfig object.
@@ -29,6 +232,7 @@ class WorkerConfig:
         :param set_debug_level: Whether to call :func:`setDebugLevel` on initialization, defaults to True
         :type set_debug_level: bool, optional
         """
+        self._checkpointWriter = None
         if set_debug_level:
             self.setDebugLevel()
         self.parseArgs()
@@ -244,3 +448,32 @@ class WorkerConfig:
         self._deleteOtherInstancesState()
         self.config.instance_state = self._getInstanceStatePath()
         os.environ["SSM_INSTANCE_STATE"] = self.config.instance_state
+
+    def saveCheckpoint(self, name, obj, save_func=pickle.dump):
+        """Save a checkpoint to the (instance) state, asynchronously and atomically, see :class:`CheckpointWriter`.
+        All the saved checkpoints are written before the process exits, or use :func:`waitCheckpoints`.
+
+        :param name: The checkpoint file name, relative to the (instance) state directory
+        :type name: str
+        :param obj: The object to be saved, shouldn't be modified once saved
+        :param save_func: The serialization function, called as `save_func(obj, file)`, e.g. `torch.save`,
+            defaults to `pickle.dump`
+        :type save_func: callable, optional
+        """
+        if not self._checkpointWriter:
+            state_path = (
+                self.config.instance_state
+                if self.per_instance_state
+                else self.config.state
+            )
+            # the checkpoints are staged outside of the state, which is continuously uploaded
+            self._checkpointWriter = CheckpointWriter(
+                state_path, synced_path=self.config.state
+            )
+            atexit.register(self.waitCheckpoints)
+        self._checkpointWriter.save(name, obj, save_func)
+
+    def waitCheckpoints(self):
+        """Wait for all the checkpoints saved by :func:`saveCheckpoint` to be written"""
+        if self._checkpointWriter:
+            self._checkpointWriter.wait()
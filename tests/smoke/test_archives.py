@@ -0,0 +1,123 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+from unittest import mock
+
+import pytest
+
+from simple_sagemaker import s3_sync
+from simple_sagemaker.archives import buildTarIndex
+from simple_sagemaker.s3_sync import S3Sync
+
+
+def _buildArchive(compressed, count=51, size=4096):
+    # random, i.e. incompressible, content makes the gzipped archive span several read chunks
+    contents = {f"dir/member-{i}.bin": os.urandom(size + i) for i in range(count)}
+    contents["empty"] = b""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz" if compressed else "w") as tar:
+        for name, data in contents.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        dir_info = tarfile.TarInfo("dir")
+        dir_info.type = tarfile.DIRTYPE
+        tar.addfile(dir_info)
+    return buffer.getvalue(), contents
+
+
+class NoSuchKey(Exception):
+    pass
+
+
+class FakeS3:
+    exceptions = type("exceptions", (), {"NoSuchKey": NoSuchKey})
+
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.read_bytes = 0
+
+    def _etag(self, key):
+        return f'"{hash(self.objects[key])}"'
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": self._etag(Key)}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        if Key not in self.objects:
+            raise NoSuchKey(Key)
+        assert IfMatch in (None, self._etag(Key)), "PreconditionFailed"
+        data = self.objects[Key]
+        if Range:
+            start, end = Range[len("bytes=") :].split("-")
+            data = data[int(start) : int(end) + 1]
+        self.read_bytes += len(data)
+        return {"Body": io.BytesIO(data)}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = Body
+
+
+@pytest.mark.parametrize("compressed", [True, False])
+def test_build_tar_index(compressed):
+    archive, contents = _buildArchive(compressed)
+    index = buildTarIndex(io.BytesIO(archive), compressed)
+    assert index["compressed"] == compressed
+    assert sorted(index["members"]) == sorted(contents)
+    raw = gzip.decompress(archive) if compressed else archive
+    for name, data in contents.items():
+        entry = index["members"][name]
+        assert raw[entry["offset"] : entry["offset"] + entry["size"]] == data
+        if compressed:
+            assert 0 <= entry["compressed_end"] <= len(archive)
+
+
+@pytest.mark.parametrize("compressed", [True, False])
+def test_get_tar_member(compressed):
+    archive, contents = _buildArchive(compressed)
+    key = "task/output/model.tar.gz" if compressed else "task/output/model.tar"
+    s3_client = FakeS3({key: archive})
+    with mock.patch.object(s3_sync, "getClient", return_value=s3_client):
+        sync = S3Sync(None)
+
+    assert (
+        sync.getTarMember("bucket", key, "./dir/member-0.bin")
+        == contents["dir/member-0.bin"]
+    )
+    # the index is cached in a sidecar object, along with the ETag of the archive
+    index_key = S3Sync.getIndexKey(key)
+    assert index_key == os.path.splitext(key)[0] + ".index.json"
+    index = json.loads(s3_client.objects[index_key])
+    assert index["etag"] == s3_client._etag(key)
+
+    # only the beginning of the archive is read to get its first member
+    s3_client.read_bytes = 0
+    assert (
+        sync.getTarMember("bucket", key, "dir/member-0.bin", index)
+        == contents["dir/member-0.bin"]
+    )
+    assert s3_client.read_bytes < len(archive) / 2
+    for name, data in contents.items():
+        assert sync.getTarMember("bucket", key, name, index) == data
+    with pytest.raises(AssertionError, match="wasn't found"):
+        sync.getTarMember("bucket", key, "dir", index)
+
+
+def test_tar_index_outdated():
+    archive, contents = _buildArchive(True, count=3)
+    s3_client = FakeS3({"model.tar.gz": archive})
+    with mock.patch.object(s3_sync, "getClient", return_value=s3_client):
+        sync = S3Sync(None)
+    sync.getTarIndex("bucket", "model.tar.gz")
+
+    # a changed archive is re-indexed
+    archive, contents = _buildArchive(True, count=5)
+    s3_client.objects["model.tar.gz"] = archive
+    index = sync.getTarIndex("bucket", "model.tar.gz")
+    assert sorted(index["members"]) == sorted(contents)
+    assert (
+        sync.getTarMember("bucket", "model.tar.gz", "dir/member-4.bin")
+        == contents["dir/member-4.bin"]
+    )
@@ -58,6 +58,18 @@ def test_cli_data_help():
     _testCliInternal("ssm data -h")
 
 
+def test_cli_logs_help():
+    _testCliInternal("ssm logs -h")
+
+
+def test_cli_sweep_help():
+    _testCliInternal("ssm sweep -h")
+
+
+def test_cli_pipeline_help():
+    _testCliInternal("ssm pipeline run -h")
+
+
 def _internalTestCli(test_path, caplog, tmp_path):
     caplog.set_level(logging.INFO)
     print("Temp path:", tmp_path)
@@ -0,0 +1,93 @@
+import errno
+import os
+import pickle
+import threading
+from unittest import mock
+
+import pytest
+
+from simple_sagemaker.worker_toolkit import worker_lib
+from simple_sagemaker.worker_toolkit.worker_lib import CheckpointWriter
+
+
+def _load(file_name):
+    with open(file_name, "rb") as f:
+        return pickle.load(f)
+
+
+def test_checkpoint_coalescing(tmp_path):
+    state_path = os.path.join(tmp_path, "state")
+    writer = CheckpointWriter(os.path.join(state_path, "checkpoints"))
+    started, release = threading.Event(), threading.Event()
+
+    def blockingSave(obj, f):
+        started.set()
+        release.wait()
+        pickle.dump(obj, f)
+
+    writer.save("model.pkl", 0, blockingSave)
+    assert started.wait(10)
+    # the first save is being written, the next ones are coalesced into the last one
+    for i in range(1, 4):
+        writer.save("model.pkl", i)
+    writer.save("sub/opt.pkl", "opt")
+    assert writer.num_coalesced == 2
+
+    # a partial checkpoint is never visible in the checkpoints directory
+    target = os.path.join(state_path, "checkpoints", "model.pkl")
+    assert not os.path.exists(target)
+    assert os.listdir(writer.tmp_path)
+    release.set()
+    writer.wait()
+
+    assert writer.num_saved == 3
+    assert _load(target) == 3
+    assert _load(os.path.join(state_path, "checkpoints", "sub", "opt.pkl")) == "opt"
+    assert os.listdir(writer.tmp_path) == []
+    # the temporary files are kept outside of the checkpoints / the given synced directory
+    assert writer.tmp_path == os.path.join(state_path, ".checkpoints_tmp")
+    writer = CheckpointWriter(
+        os.path.join(state_path, "checkpoints"), synced_path=state_path
+    )
+    assert writer.tmp_path == os.path.join(tmp_path, ".state_tmp")
+
+
+def test_checkpoint_error(tmp_path):
+    writer = CheckpointWriter(os.path.join(tmp_path, "checkpoints"))
+
+    def failingSave(obj, f):
+        f.write(b"partial")
+        raise ValueError("Failed")
+
+    writer.save("model.pkl", 0, failingSave)
+    with pytest.raises(ValueError, match="Failed"):
+        writer.wait()
+    assert not os.path.exists(os.path.join(tmp_path, "checkpoints", "model.pkl"))
+    assert os.listdir(writer.tmp_path) == []
+
+    # the error is raised once, later checkpoints are still written
+    writer.save("model.pkl", 1)
+    writer.wait()
+    assert _load(os.path.join(tmp_path, "checkpoints", "model.pkl")) == 1
+
+
+def test_checkpoint_cross_device(tmp_path):
+    tmp_dir = os.path.join(tmp_path, "local")
+    writer = CheckpointWriter(os.path.join(tmp_path, "checkpoints"), tmp_dir)
+    replace = os.replace
+
+    def crossDeviceReplace(src, dst):
+        # a rename from the temporary directory crosses file systems
+        if os.path.dirname(src) == tmp_dir:
+            raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+        replace(src, dst)
+
+    with mock.patch.object(worker_lib.os, "replace", crossDeviceReplace):
+        writer.save("model.pkl", {"step": 1})
+        writer.wait()
+
+    assert _load(os.path.join(tmp_path, "checkpoints", "model.pkl")) == {"step": 1}
+    # staged next to the checkpoints directory, and cleaned up
+    assert os.listdir(writer.staging_path) == []
+    assert writer.staging_path == os.path.join(tmp_path, ".checkpoints_tmp")
+    assert os.listdir(tmp_dir) == []
@@ -0,0 +1,165 @@
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from simple_sagemaker import constants
+from simple_sagemaker.job_handle import JobHandle, JobPoller
+
+TRAINING = constants.TASK_TYPE_TRAINING
+PROCESSING = constants.TASK_TYPE_PROCESSING
+
+
+def _clientError(code, operation):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeSageMaker:
+    """A stub of the SageMaker client and session, processing jobs aren't searchable"""
+
+    def __init__(self, page_size=2):
+        self.jobs = dict()
+        self.page_size = page_size
+        self.throttled = False
+        self.calls = list()
+
+    def setJob(self, task_type, job_name, status, secondary_status=None):
+        job = {f"{task_type}JobName": job_name, f"{task_type}JobStatus": status}
+        if secondary_status:
+            job["SecondaryStatus"] = secondary_status
+        self.jobs[job_name] = (task_type, job)
+
+    def _page(self, task_type, NextToken=None):
+        jobs = [job for (t, job) in self.jobs.values() if t == task_type]
+        start = int(NextToken or 0)
+        resp = {"Jobs": jobs[start : start + self.page_size]}
+        if start + self.page_size < len(jobs):
+            resp["NextToken"] = str(start + self.page_size)
+        return resp
+
+    def search(self, Resource, SearchExpression, NextToken=None, **kwargs):
+        self.calls.append("search")
+        if self.throttled:
+            raise _clientError("ThrottlingException", "Search")
+        if Resource != "TrainingJob":
+            raise _clientError("ValidationException", "Search")
+        resp = self._page(TRAINING, NextToken)
+        resp["Results"] = [{"TrainingJob": job} for job in resp.pop("Jobs")]
+        return resp
+
+    def list_processing_jobs(self, CreationTimeAfter, NextToken=None, **kwargs):
+        self.calls.append("list_processing_jobs")
+        resp = self._page(PROCESSING, NextToken)
+        resp["ProcessingJobSummaries"] = resp.pop("Jobs")
+        return resp
+
+    def _describe(self, job_name):
+        self.calls.append("describe")
+        return {**self.jobs[job_name][1], "Description": "full"}
+
+    describe_training_job = _describe
+    describe_processing_job = _describe
+
+
+class FakeTask:
+    def __init__(self, sm):
+        self.smSession = sm
+        self.sm_client = sm
+        self.descriptions = list()
+
+
+def _track(poller, task, job_names, task_type):
+    handles = list()
+    for job_name in job_names:
+        handle = JobHandle(task, job_name, task_type)
+        handle.poller = poller
+        poller.handles[job_name] = (handle, time.time())
+        handles.append(handle)
+    return handles
+
+
+def test_poll_batches():
+    sm = FakeSageMaker()
+    task = FakeTask(sm)
+    poller = JobPoller(sm, min_secs=1, max_secs=10)
+    poller.interval = 4
+    for i in range(5):
+        sm.setJob(TRAINING, f"train-{i}", "InProgress", "Training")
+    for i in range(3):
+        sm.setJob(PROCESSING, f"proc-{i}", "InProgress")
+    trains = _track(poller, task, [f"train-{i}" for i in range(5)], TRAINING)
+    procs = _track(poller, task, [f"proc-{i}" for i in range(3)], PROCESSING)
+    done = list()
+    trains[0].addDoneCallback(lambda h: done.append(h.job_name))
+
+    # the first poll is a transition for all the jobs
+    assert poller.poll() == 1
+    assert [h.status() for h in trains + procs] == ["InProgress"] * 8
+    # paged search of the training jobs, processing jobs are listed instead
+    assert sm.calls.count("search") == 3 + 1
+    assert sm.calls.count("list_processing_jobs") == 2
+    assert sm.calls.count("describe") == 0
+    assert poller._use_search == {TRAINING: True, PROCESSING: False}
+
+    # no changes - the interval grows
+    poller.interval = 4
+    sm.calls.clear()
+    assert poller.poll() == 4 * JobPoller.BACKOFF_FACTOR
+    assert sm.calls.count("describe") == 0
+    poller.interval = 8
+    assert poller.poll() == 10
+
+    # a done job is fully described once, and removed from the next polls
+    sm.setJob(TRAINING, "train-0", "Completed", "Completed")
+    sm.calls.clear()
+    assert poller.poll() == 1
+    assert sm.calls.count("describe") == 1
+    assert trains[0].done() and trains[0].description["Description"] == "full"
+    assert done == ["train-0"] and task.descriptions == [trains[0].description]
+    assert [h.job_name for (h, _) in poller._outstanding()] == [
+        x.job_name for x in trains[1:] + procs
+    ]
+
+
+def test_poll_short_phases_and_throttling():
+    sm = FakeSageMaker()
+    poller = JobPoller(sm, min_secs=1, max_secs=10)
+    sm.setJob(TRAINING, "train", "InProgress", "Starting")
+    (handle,) = _track(poller, FakeTask(sm), ["train"], TRAINING)
+    transitions = list()
+    handle.addStatusCallback(lambda h, prev, state: transitions.append(state))
+    poller.poll()
+
+    # a job in a short phase is polled again soon
+    poller.interval = 8
+    assert poller.poll() == 2
+    sm.setJob(TRAINING, "train", "InProgress", "Training")
+    assert poller.poll() == 1
+    assert transitions == [("InProgress", "Starting"), ("InProgress", "Training")]
+
+    # throttling doubles the interval, up to max_secs
+    sm.throttled = True
+    poller.interval = 3
+    assert poller.poll() == 6
+    poller.interval = 6
+    assert poller.poll() == 10
+    assert poller._use_search[TRAINING]
+
+
+def test_poller_thread():
+    sm = FakeSageMaker()
+    task = FakeTask(sm)
+    poller = JobPoller(sm, min_secs=0.01, max_secs=0.05)
+    sm.setJob(PROCESSING, "proc", "InProgress")
+    handle = JobHandle(task, "proc", PROCESSING)
+    poller.add(handle)
+    with pytest.raises(TimeoutError):
+        handle.wait(timeout=0.1)
+    sm.setJob(PROCESSING, "proc", "Failed")
+    assert handle.wait(timeout=5) == "Failed"
+    assert handle.exception().status == "Failed"
+    # the thread exits once no jobs are left
+    deadline = time.time() + 5
+    while poller._thread is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert poller._thread is None and not poller.handles
@@ -0,0 +1,164 @@
+import io
+import os
+from unittest import mock
+
+from simple_sagemaker import constants, logs_fetcher
+from simple_sagemaker.logs_fetcher import LogPositions, LogsFetcher
+
+
+def test_log_positions(tmp_path):
+    positions = LogPositions(tmp_path, "job-1")
+    indices = positions.getIndices(["job-1/algo-1-1", "job-1/algo-2-1"])
+    assert indices == {"job-1/algo-1-1": 0, "job-1/algo-2-1": 1}
+    positions.set("job-1/algo-1-1", 0, "token-a", 10)
+    positions.set("job-1/algo-2-1", 1, "token-b", 20)
+    assert os.listdir(tmp_path) == [constants.LOG_POSITIONS_FILE_NAME]
+
+    # the positions of the same job are loaded, a new stream gets a new index
+    positions = LogPositions(tmp_path, "job-1")
+    assert positions.get("job-1/algo-2-1") == {
+        "index": 1,
+        "token": "token-b",
+        "offset": 20,
+    }
+    assert positions.getIndices(["job-1/algo-0-1", "job-1/algo-2-1"]) == {
+        "job-1/algo-0-1": 2,
+        "job-1/algo-2-1": 1,
+    }
+
+
+def test_log_positions_other_job(tmp_path):
+    positions = LogPositions(tmp_path, "job-1")
+    positions.set("job-1/algo-1-1", 0, "token", 10)
+    for file_name in ("logs0", "logs1", "logs_merged.txt"):
+        (tmp_path / file_name).write_text("job-1 logs")
+
+    # the logs of another job are removed, the positions start over
+    positions = LogPositions(tmp_path, "job-2")
+    assert positions.get("job-1/algo-1-1") is None
+    assert positions.getIndices(["job-2/algo-1-1"]) == {"job-2/algo-1-1": 0}
+    assert sorted(os.listdir(tmp_path)) == [
+        constants.LOG_POSITIONS_FILE_NAME,
+        "logs_merged.txt",
+    ]
+
+
+class ResourceNotFoundException(Exception):
+    pass
+
+
+class FakeLogs:
+    """A stub of the CloudWatch logs client, each page holds `page_size` events"""
+
+    exceptions = type(
+        "exceptions", (), {"ResourceNotFoundException": ResourceNotFoundException}
+    )
+
+    def __init__(self, page_size=2):
+        self.streams = dict()
+        self.page_size = page_size
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, logGroupName, logStreamNamePrefix, orderBy):
+        if logGroupName not in self.streams:
+            raise ResourceNotFoundException(logGroupName)
+        names = [
+            x for x in self.streams[logGroupName] if x.startswith(logStreamNamePrefix)
+        ]
+        yield {"logStreams": [{"logStreamName": name} for name in sorted(names)]}
+
+    def get_log_events(
+        self, logGroupName, logStreamName, startFromHead, nextToken=None
+    ):
+        events = self.streams[logGroupName][logStreamName]
+        start = int(nextToken or 0)
+        end = min(start + self.page_size, len(events))
+        return {"events": events[start:end], "nextForwardToken": str(end)}
+
+
+def _fetcher(logs_client):
+    with mock.patch.object(logs_fetcher, "getClient", return_value=logs_client):
+        return LogsFetcher(None, max_workers=2)
+
+
+def _events(host, timestamps):
+    return [{"timestamp": t, "message": f"{host} {t}"} for t in timestamps]
+
+
+def test_fetch_to_files(tmp_path):
+    logs_client = FakeLogs()
+    log_group = LogsFetcher.getLogGroup(constants.TASK_TYPE_TRAINING)
+    streams = {
+        "job-1/algo-1-100": _events("algo-1", [1, 2, 3]),
+        "job-1/algo-2-100": _events("algo-2", [2]),
+        "job-10/algo-1-100": _events("other", [1]),
+    }
+    logs_client.streams[log_group] = streams
+    fetcher = _fetcher(logs_client)
+
+    fetched = list()
+    files = fetcher.fetchToFiles(
+        "job-1",
+        constants.TASK_TYPE_TRAINING,
+        tmp_path,
+        lambda stream_name, event: fetched.append(event["message"]),
+    )
+    assert files == {
+        0: os.path.join(tmp_path, "logs0"),
+        1: os.path.join(tmp_path, "logs1"),
+    }
+    assert (tmp_path / "logs0").read_text() == "algo-1 1\nalgo-1 2\nalgo-1 3\n"
+    assert sorted(fetched) == ["algo-1 1", "algo-1 2", "algo-1 3", "algo-2 2"]
+
+    # only the new events are fetched and appended, a partial write past the saved position is dropped
+    streams["job-1/algo-1-100"] += _events("algo-1", [4])
+    with open(tmp_path / "logs0", "at") as f:
+        f.write("partial")
+    fetched.clear()
+    fetcher.fetchToFiles(
+        "job-1",
+        constants.TASK_TYPE_TRAINING,
+        tmp_path,
+        lambda stream_name, event: fetched.append(event["message"]),
+    )
+    assert fetched == ["algo-1 4"]
+    assert (
+        tmp_path / "logs0"
+    ).read_text() == "algo-1 1\nalgo-1 2\nalgo-1 3\nalgo-1 4\n"
+    assert (tmp_path / "logs1").read_text() == "algo-2 2\n"
+
+    # missing logs
+    assert (
+        fetcher.fetchToFiles("job-1", constants.TASK_TYPE_PROCESSING, tmp_path)
+        == dict()
+    )
+
+
+def test_merged_logs():
+    logs_client = FakeLogs()
+    log_group = LogsFetcher.getLogGroup(constants.TASK_TYPE_PROCESSING)
+    logs_client.streams[log_group] = {
+        "job/algo-1-100": _events("algo-1", [1, 4, 5, 9]),
+        "job/algo-2-100": _events("algo-2", [2, 3, 6]),
+    }
+    fetcher = _fetcher(logs_client)
+    assert fetcher.fetch("job", constants.TASK_TYPE_PROCESSING) == {
+        0: ["algo-1 1", "algo-1 4", "algo-1 5", "algo-1 9"],
+        1: ["algo-2 2", "algo-2 3", "algo-2 6"],
+    }
+
+    output = io.StringIO()
+    assert fetcher.writeMerged("job", constants.TASK_TYPE_PROCESSING, output) == 7
+    lines = output.getvalue().splitlines()
+    assert [line.split(" ", 2)[2] for line in lines] == [
+        "[algo-1] algo-1 1",
+        "[algo-2] algo-2 2",
+        "[algo-2] algo-2 3",
+        "[algo-1] algo-1 4",
+        "[algo-1] algo-1 5",
+        "[algo-2] algo-2 6",
+        "[algo-1] algo-1 9",
+    ]
+    assert lines[0].startswith("1970-01-01 00:00:00.001 ")
@@ -0,0 +1,163 @@
+import argparse
+import inspect
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+import yaml
+
+from simple_sagemaker import cli, sm_project
+from simple_sagemaker.pipeline import criticalPath, parseInputEdge, topologicalOrder
+from simple_sagemaker.sm_task import SageMakerTask
+
+file_path = os.path.split(__file__)[0]
+readme_path = os.path.abspath(os.path.join(file_path, "..", "..", "README.md"))
+
+
+def test_parse_input_edge():
+    edge = parseInputEdge(["data", "prep", "output"])
+    assert edge.input_name == "data" and edge.task_name == "prep"
+    assert edge.distribution == "FullyReplicated" and edge.input_mode is None
+    edge = parseInputEdge(["data", "prep", "model", "ShardedByS3Key", "sub", "Pipe"])
+    assert edge.subdir == "sub" and edge.input_mode == "Pipe"
+    edge = parseInputEdge({"input_name": "d", "task_name": "prep", "type": "state"})
+    assert edge.type == "state" and edge.subdir == ""
+
+
+@pytest.mark.parametrize(
+    "edge",
+    [
+        ["data", "prep"],
+        ["data", "prep", "output", "FullyReplicated", "", None, "extra"],
+        "data prep output",
+        ["data", "prep", "logs"],
+        {"input_name": "data", "task_name": "prep"},
+        {"input_name": "data", "task_name": "prep", "type": "output", "size": 1},
+    ],
+)
+def test_parse_input_edge_errors(edge):
+    with pytest.raises(ValueError):
+        parseInputEdge(edge)
+
+
+def test_topological_order():
+    dependencies = {"train": {"prep-a", "prep-b"}, "prep-a": set(), "prep-b": set()}
+    order = topologicalOrder(dependencies)
+    assert order.index("train") == 2 and set(order[:2]) == {"prep-a", "prep-b"}
+    with pytest.raises(AssertionError, match="cycle"):
+        topologicalOrder({"a": {"b"}, "b": {"c"}, "c": {"a"}, "d": set()})
+
+
+def test_critical_path():
+    dependencies = {"a": set(), "b": set(), "c": {"a", "b"}, "d": {"c"}, "e": set()}
+    durations = {"a": 10, "b": 30, "c": 5, "d": 1, "e": 20}
+    assert criticalPath(durations, dependencies) == (["b", "c", "d"], 36)
+    assert criticalPath(dict(), dict()) == (list(), 0)
+
+
+class FakeHandle:
+    def __init__(self, job_name):
+        self.job_name = job_name
+        self.description = {"CreationTime": datetime.now(timezone.utc)}
+        self._done_event = threading.Event()
+        self._done_event.set()
+
+    def addDoneCallback(self, callback):
+        callback(self)
+
+    def refresh(self):
+        return "Completed"
+
+    def wait(self, timeout=None):
+        return "Completed"
+
+
+class FakeTask:
+    """A :class:`SageMakerTask` that validates the job arguments instead of running the jobs"""
+
+    training_jobs = dict()
+
+    def __init__(self, boto3_session, task_name, image_uri, *args, **kwargs):
+        self.task_name = task_name
+        self.inputS3Uri = None
+        self.handles = dict()
+
+    @staticmethod
+    def getJobByFingerprint(*args):
+        return None
+
+    def runTrainingJob(self, *args, **kwargs):
+        inspect.signature(SageMakerTask.runTrainingJob).bind(self, *args, **kwargs)
+        job_name = f"{self.task_name}-job"
+        FakeTask.training_jobs[self.task_name] = kwargs
+        self.handles[job_name] = FakeHandle(job_name)
+        return job_name
+
+    def getJobHandle(self):
+        return list(self.handles.values())[-1]
+
+    def getInputConfig(self, output_type, *args, **kwargs):
+        return f"s3://bucket/{self.task_name}/{output_type}"
+
+
+@pytest.mark.parametrize("use_cli", [True, False])
+def test_readme_pipeline(tmp_path, monkeypatch, use_cli):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with open(readme_path, "rt") as f:
+        readme = f.read()
+    pipeline_yaml = re.search(r"```yaml\n(max_concurrent:.*?)```", readme, re.S)[1]
+    file_name = os.path.join(tmp_path, "pipeline.yaml")
+    with open(file_name, "wt") as f:
+        f.write(pipeline_yaml)
+    args = argparse.Namespace(
+        file=file_name,
+        project_name="ssm-ex",
+        bucket_name="bucket",
+        prefix=None,
+        max_concurrent=None,
+        output_path=None,
+    )
+
+    FakeTask.training_jobs.clear()
+    with mock.patch.object(sm_project, "SageMakerTask", FakeTask), mock.patch.object(
+        sm_project, "ECRSync"
+    ) as ecr_sync, mock.patch.object(
+        sm_project, "getTaskFingerprint", return_value="fingerprint"
+    ), mock.patch.object(
+        sm_project, "getSageMakerSession"
+    ), mock.patch.object(
+        sm_project.SageMakerProject, "createIAMRole"
+    ), mock.patch.object(
+        sm_project.SageMakerProject, "prebuildImages"
+    ), mock.patch.object(
+        sm_project.SageMakerProject, "buildOrGetImage", return_value="image"
+    ):
+        ecr_sync.return_value.getImageDigest.return_value = None
+        if use_cli:
+            cli.pipelineHandler(args, {"external_hps": []})
+        else:
+            # no default code params are set
+            config = yaml.safe_load(pipeline_yaml)
+            project = sm_project.SageMakerProject("ssm-ex", bucket_name="bucket")
+            project.setDefaultImageParams()
+            project.setDefaultInstanceParams(**config["instance"])
+            tasks = {
+                name: {**config["defaults"], **task_args}
+                for name, task_args in config["tasks"].items()
+            }
+            results = project.runPipeline(tasks, config["max_concurrent"])
+            assert [x["status"] for x in results] == ["Completed"] * 3
+
+    # the train task is submitted only once both prep tasks were submitted and completed
+    assert sorted(FakeTask.training_jobs) == ["prep-a", "prep-b", "train"]
+    assert FakeTask.training_jobs["prep-a"]["entry_point"] == "worker.py"
+    assert FakeTask.training_jobs["prep-b"]["hyperparameters"] == {"split": "b"}
+    train = FakeTask.training_jobs["train"]
+    assert train["instance_type"] == "ml.p3.2xlarge"
+    assert train["additional_inputs"] == {
+        "a": "s3://bucket/prep-a/model",
+        "b": "s3://bucket/prep-b/model",
+    }
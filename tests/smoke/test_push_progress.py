@@ -0,0 +1,85 @@
+import logging
+
+from simple_sagemaker import ecr_sync
+from simple_sagemaker.ecr_sync import PushProgress
+
+MB = 2**20
+
+# A decoded `docker push` stream, as yielded by docker's `images.push(..., stream=True, decode=True)`
+PUSH_STREAM = [
+    {
+        "status": "The push refers to repository [123.dkr.ecr.us-east-1.amazonaws.com/repo]"
+    },
+    {"status": "Preparing", "progressDetail": {}, "id": "aaa"},
+    {"status": "Preparing", "progressDetail": {}, "id": "bbb"},
+    {"status": "Preparing", "progressDetail": {}, "id": "ccc"},
+    {"status": "Layer already exists", "progressDetail": {}, "id": "ccc"},
+    {
+        "status": "Pushing",
+        "progressDetail": {"current": MB, "total": 4 * MB},
+        "id": "aaa",
+    },
+    {
+        "status": "Pushing",
+        "progressDetail": {"current": 3 * MB, "total": 4 * MB},
+        "id": "aaa",
+    },
+    {
+        "status": "Pushing",
+        "progressDetail": {"current": MB, "total": 2 * MB},
+        "id": "bbb",
+    },
+    # the last progress line of a layer usually doesn't reach its total
+    {"status": "Pushed", "progressDetail": {}, "id": "aaa"},
+    {"status": "latest: digest: sha256:abc size: 1234"},
+    {
+        "progressDetail": {},
+        "aux": {"Tag": "latest", "Digest": "sha256:abc", "Size": 1234},
+    },
+]
+
+
+def test_push_progress():
+    progress = PushProgress(log_interval=3600)
+    for line in PUSH_STREAM:
+        progress.update(line)
+    summary = progress.summary()
+    assert {
+        k: summary[k] for k in summary if k not in ("elapsed_secs", "mb_per_sec")
+    } == {
+        "layers": 3,
+        "pushed_layers": 1,
+        "skipped_layers": 1,
+        "pushed_bytes": 5 * MB,
+        "total_bytes": 6 * MB,
+        "digest": "sha256:abc",
+        "errors": [],
+    }
+    assert progress.layers["bbb"] == {
+        "status": "Pushing",
+        "current": MB,
+        "total": 2 * MB,
+    }
+    assert progress.progressLine().startswith(
+        "Pushing: 2/3 layers done (1 already exist), 5.0/6.0 MB, "
+    )
+
+
+def test_push_progress_logging(caplog):
+    caplog.set_level(logging.INFO, logger=ecr_sync.__name__)
+    progress = PushProgress(log_interval=60)
+    for line in PUSH_STREAM[1:4]:
+        progress.update(line)
+    # a single progress line for the 4 updates, once the log interval passed
+    progress.last_log_time -= 60
+    progress.update(PUSH_STREAM[4])
+    progress_lines = [
+        r.message for r in caplog.records if r.message.startswith("Pushing:")
+    ]
+    assert progress_lines == [
+        "Pushing: 1/3 layers done (1 already exist), 0.0/0.0 MB, 0.00 MB/s"
+    ]
+
+    progress.update({"errorDetail": {"message": "denied"}, "error": "denied"})
+    assert progress.summary()["errors"] == ["denied"]
+    assert "Push error: denied" in caplog.text
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+from unittest import mock
+
+import pytest
+
+from simple_sagemaker import shards
+from simple_sagemaker.worker_toolkit import worker_lib
+
+
+def test_plan_shards():
+    sizes = {"a": 7, "b": 6, "c": 5, "d": 4, "e": 3, "f": 3}
+    planned = shards.planShards(sizes, 3)
+    assert sorted(sum(planned, [])) == sorted(sizes)
+    # LPT: the largest objects are assigned first, each to the currently smallest shard
+    assert sorted(sum(sizes[x] for x in shard) for shard in planned) == [9, 9, 10]
+    assert planned == [sorted(x) for x in planned]
+
+
+def test_plan_shards_more_shards_than_objects():
+    planned = shards.planShards({"a": 1, "b": 2}, 4)
+    assert len(planned) == 4 and sorted(sum(planned, [])) == ["a", "b"]
+    with pytest.raises(AssertionError):
+        shards.planShards({"a": 1}, 0)
+
+
+def test_imbalance_report():
+    report = shards.imbalanceReport({"a": 2**20, "b": 3 * 2**20}, [["a"], ["b"]])
+    assert report[0] == "Shard 0: 1 objects, 1.0 MB"
+    assert "Imbalance (max / mean shard size): 1.500" in report[-1]
+
+
+class FakeS3:
+    def __init__(self, objects):
+        self.objects = objects
+        self.puts = dict()
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {
+            "Contents": [
+                {"Key": key, "Size": size}
+                for key, size in self.objects.items()
+                if key.startswith(Prefix)
+            ]
+        }
+
+    def put_object(self, Bucket, Key, Body):
+        self.puts[Key] = json.loads(Body)
+
+
+def _getBalancedInputs(s3_client, input_mode=None, num_shards=2):
+    with mock.patch.object(shards, "getClient", return_value=s3_client):
+        return shards.getBalancedInputs(
+            None,
+            "data",
+            "s3://bucket/in",
+            num_shards,
+            "s3://bucket/task/shards/data",
+            input_mode,
+        )
+
+
+def test_balanced_inputs():
+    s3_client = FakeS3({"in/a": 3, "in/b": 2, "in/sub/c": 1, "in/dir/": 0, "in2/d": 9})
+    inputs = _getBalancedInputs(s3_client)
+    assert inputs["data"].config["InputMode"] == "FastFile"
+    data_source = inputs["data"].config["DataSource"]["S3DataSource"]
+    assert data_source["S3DataDistributionType"] == "FullyReplicated"
+
+    shards_uri = inputs["data_shards"].config["DataSource"]["S3DataSource"]["S3Uri"]
+    assert shards_uri.startswith("s3://bucket/task/shards/data/")
+    prefix = shards_uri[len("s3://bucket/") :]
+    assert sorted(s3_client.puts) == [
+        f"{prefix}/shard-0.manifest",
+        f"{prefix}/shard-1.manifest",
+    ]
+    manifests = [s3_client.puts[f"{prefix}/shard-{i}.manifest"] for i in range(2)]
+    assert all(x[0] == {"prefix": "s3://bucket/in/"} for x in manifests)
+    assert sorted(manifests[0][1:] + manifests[1][1:]) == ["a", "b", "sub/c"]
+
+    # the manifests are kept under their content hash
+    assert (
+        _getBalancedInputs(s3_client)["data_shards"].config
+        == inputs["data_shards"].config
+    )
+    other = _getBalancedInputs(s3_client, num_shards=3)
+    assert other["data_shards"].config != inputs["data_shards"].config
+
+
+def test_balanced_inputs_modes(caplog):
+    s3_client = FakeS3({"in/a": 3})
+    with pytest.raises(AssertionError, match="Pipe"):
+        _getBalancedInputs(s3_client, "Pipe")
+    caplog.set_level(logging.WARNING)
+    inputs = _getBalancedInputs(s3_client, "File")
+    assert inputs["data"].config["InputMode"] == "File"
+    assert "every instance downloads all of its data" in caplog.text
+
+
+def test_get_shard_files(tmp_path, monkeypatch):
+    shards_path = os.path.join(tmp_path, "data_shards")
+    os.makedirs(shards_path)
+    for i, keys in enumerate([["a", "sub/c"], ["b"]]):
+        with open(os.path.join(shards_path, f"shard-{i}.manifest"), "wt") as f:
+            json.dump([{"prefix": "s3://bucket/in/"}] + keys, f)
+    monkeypatch.setenv("SM_CHANNEL_DATA", "/opt/ml/input/data/data")
+    monkeypatch.setenv("SM_CHANNEL_DATA_SHARDS", shards_path)
+    monkeypatch.setenv("SM_HOSTS", json.dumps(["algo-1", "algo-2"]))
+    monkeypatch.setenv("SM_CURRENT_HOST", "algo-1")
+    monkeypatch.setenv(
+        "SM_INPUT_DATA_CONFIG", json.dumps({"data": {"TrainingInputMode": "FastFile"}})
+    )
+    assert worker_lib.getShardFiles() == [
+        "/opt/ml/input/data/data/a",
+        "/opt/ml/input/data/data/sub/c",
+    ]
+    monkeypatch.setenv("SM_CURRENT_HOST", "algo-2")
+    assert worker_lib.getShardFiles() == ["/opt/ml/input/data/data/b"]
+
+    monkeypatch.setenv(
+        "SM_INPUT_DATA_CONFIG", json.dumps({"data": {"TrainingInputMode": "Pipe"}})
+    )
+    with pytest.raises(AssertionError, match="Pipe"):
+        worker_lib.getShardFiles()
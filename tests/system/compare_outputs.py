@@ -147,7 +147,15 @@ def _isAsExpected(output_path, expected_path):
     logs_diff_info = dict()
 
     # compare the two list of output files, except for the source directory and tars
-    filters = ["source/", ".tar.gz", ".sagemaker-uploading"]
+    filters = [
+        "source/",
+        ".tar.gz",
+        ".sagemaker-uploading",
+        ".log_positions",
+        constants.TIMELINE_FILE_NAME,
+        constants.UTILIZATION_FILE_NAME,
+        constants.UTILIZATION_SUMMARY_FILE_NAME,
+    ]
     outputFiles = getSortedFileList(output_path, filters)
     expectedFiles = getSortedFileList(expected_path, filters)
     if expectedFiles != outputFiles:
@@ -194,7 +202,16 @@ class OutputComparison:
         res = []
         logs_diff_info = {}
 
-        filters = ["source/", ".tar.gz", ".sagemaker-uploading", ".extracted"]
+        filters = [
+            "source/",
+            ".tar.gz",
+            ".sagemaker-uploading",
+            ".extracted",
+            ".log_positions",
+            constants.TIMELINE_FILE_NAME,
+            constants.UTILIZATION_FILE_NAME,
+            constants.UTILIZATION_SUMMARY_FILE_NAME,
+        ]
         files1 = OutputComparison.getSortedFileList(root_path1, filters)
         files2 = OutputComparison.getSortedFileList(root_path2, filters)
         if files1 != files2: